@@ -0,0 +1,114 @@
+"""
+Import-time benchmark for the backend worker.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and fails when the
+module's cumulative import time exceeds the budget, or when it eagerly imports one of the
+heavy SDKs that the provider layer (src/providers.py) is meant to load on first use.
+
+Usage (from the repository root):
+    python -m backend.import_benchmark
+    python -m backend.import_benchmark --module backend.worker --budget-ms 250 --top 15
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULE = "backend.worker"
+
+# Cumulative import time worker processes must stay under
+DEFAULT_BUDGET_MS = 250
+
+# SDKs that must not be imported until a run actually needs them
+LAZY_MODULES = ("google.genai", "openai", "agentql", "playwright", "browserbase", "tiktoken", "thefuzz")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+REPO_ROOT = Path(__file__).parent.parent
+
+
+def measure_imports(module: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        Tuple of (cumulative microseconds per imported module, self microseconds per imported module)
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative: Dict[str, int] = {}
+    self_times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            name = match.group(3)
+            self_times[name] = int(match.group(1))
+            cumulative[name] = int(match.group(2))
+    return cumulative, self_times
+
+
+def check_budget(module: str, budget_ms: float, top: int) -> List[str]:
+    """
+    Measure a module's import time and return the list of budget violations.
+
+    Args:
+        module: Dotted module name to import
+        budget_ms: Maximum cumulative import time in milliseconds
+        top: Number of slowest imports to print
+
+    Returns:
+        Violation messages (empty when the module is within budget)
+    """
+    cumulative, self_times = measure_imports(module)
+    total_ms = cumulative.get(module, 0) / 1000
+
+    print(f"⏱️ import {module}: {total_ms:.1f} ms cumulative (budget {budget_ms:.0f} ms)")
+    print(f"\nSlowest {top} imports by self time:")
+    for name, micros in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    violations = []
+    if total_ms > budget_ms:
+        violations.append(f"{module} takes {total_ms:.1f} ms to import, budget is {budget_ms:.0f} ms")
+    eager = sorted({lazy for lazy in LAZY_MODULES for name in cumulative if name == lazy or name.startswith(lazy + ".")})
+    for root in eager:
+        violations.append(f"{module} eagerly imports {root}; resolve it lazily through the provider layer")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the backend worker against a budget.")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Cumulative import time budget in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to show")
+    args = parser.parse_args()
+
+    try:
+        violations = check_budget(args.module, args.budget_ms, args.top)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if violations:
+        print()
+        for violation in violations:
+            print(f"❌ {violation}")
+        sys.exit(1)
+    print("\n✅ Import budget met")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from typing import Optional
+import json
 import uuid
-import os
-import shutil
 import asyncio
 from pathlib import Path
 
 # Import the worker
 from .worker import JobWorker, jobs
+from .resume_store import ResumeStore
+from .session_pool import SessionPool, create_session_pool
+# Flat import (src is on sys.path via the worker) so this is the same registry the agents use
+from clients import get_clients
 
 app = FastAPI(title="Project Kyro API")
 
@@ -25,35 +28,67 @@ app.add_middleware(
 UPLOAD_DIR = Path("resume")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# Content-addressed resume storage (one file per distinct resume)
+resume_store = ResumeStore(UPLOAD_DIR)
+
 # Global semaphore for worker concurrency
 # max 4 urls concurrently across ALL jobs (or per job? User said "deploy that many worker based on the number of urls at max deploy 4 workers")
 # Assuming global limit of 4 active browsers for resource safety.
 MAX_WORKERS = 8
 semaphore = asyncio.Semaphore(MAX_WORKERS)
 
+# Pre-warmed browser sessions shared by all jobs, created on first use (BROWSER_SESSIONS=local for local Chromium)
+session_pool: Optional[SessionPool] = None
+session_pool_lock = asyncio.Lock()
+
+async def get_session_pool() -> Optional[SessionPool]:
+    """Return the shared session pool, or None if it cannot be created (applicants then create their own)."""
+    global session_pool
+    # Concurrent first requests must not each build a pool
+    async with session_pool_lock:
+        if session_pool is None:
+            try:
+                session_pool = await asyncio.to_thread(create_session_pool)
+            except Exception as e:
+                print(f"Session pool unavailable, sessions are created per application: {e}")
+        return session_pool
+
+@app.on_event("shutdown")
+async def close_clients():
+    """Release shared LLM connections, provider-side prompt caches and warm browser sessions."""
+    await asyncio.to_thread(get_clients().close)
+    if session_pool is not None:
+        await session_pool.close()
+
 async def process_job(job_id: str):
     """Background task to run the job with semaphore"""
     if job_id in jobs:
         await jobs[job_id].run(semaphore)
+    
+    # Drop resumes no pending or running job still needs, off the event loop
+    in_use = [
+        worker.resume_path for worker in jobs.values()
+        if any(status in ("pending", "running") for status in worker.status.values())
+    ]
+    removed = await asyncio.to_thread(resume_store.collect_garbage, in_use)
+    if removed:
+        print(f"Removed {removed} unused resumes")
 
 @app.post("/apply")
 async def apply_to_jobs(
     background_tasks: BackgroundTasks,
     resume: UploadFile = File(...),
-    urls: str = Form(...)
+    urls: str = Form(...),
+    profile: Optional[UploadFile] = File(None)
 ):
     """
     Submit a resume and list of URLs to apply to.
     urls: comma or newline separated string of URLs.
+    profile: optional user_info-style JSON profile for this job (defaults to the server's user_info.json).
     """
     # Generate Job ID
     job_id = str(uuid.uuid4())
     
-    # Save Resume
-    resume_path = UPLOAD_DIR / f"{job_id}_{resume.filename}"
-    with open(resume_path, "wb") as buffer:
-        shutil.copyfileobj(resume.file, buffer)
-    
     # Parse URLs
     # Split by newline or comma and strip whitespace
     url_list = [u.strip() for u in urls.replace(',', '\n').split('\n') if u.strip()]
@@ -61,8 +96,21 @@ async def apply_to_jobs(
     if not url_list:
         raise HTTPException(status_code=400, detail="No valid URLs provided")
     
+    # Parse the optional per-job profile up front so bad uploads are rejected immediately
+    profile_data = None
+    if profile is not None:
+        try:
+            profile_data = json.loads(await profile.read())
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Profile is not valid JSON: {e}")
+        if not isinstance(profile_data, dict):
+            raise HTTPException(status_code=400, detail="Profile must be a JSON object")
+    
+    # Save Resume (streamed, hashed and deduplicated in a worker thread)
+    resume_path = await resume_store.save_upload(resume.filename, resume.file)
+    
     # Create Worker
-    worker = JobWorker(job_id, str(resume_path.absolute()), url_list)
+    worker = JobWorker(job_id, str(resume_path), url_list, profile_data=profile_data, session_pool=await get_session_pool())
     jobs[job_id] = worker
     
     # Start Background Task
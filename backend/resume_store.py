@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable, BinaryIO
+
+# Read uploads in 1 MiB chunks while hashing
+CHUNK_SIZE = 1024 * 1024
+
+# Stored resumes unused for this long are removed by garbage collection
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+
+class ResumeStore:
+    """
+    Content-addressed resume storage.
+
+    Each distinct resume is stored once under <root>/<sha256>/, so repeated uploads of the
+    same file are deduplicated. Every upload gets a path ending in its own original filename
+    (ATS forms show it to recruiters): a duplicate uploaded under a new name is hard-linked to
+    the stored copy under that name. All disk work runs in a worker thread so the request
+    path never blocks on it.
+    """
+
+    def __init__(self, root: Path, max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS):
+        self.root = Path(root)
+        self.max_age_seconds = max_age_seconds
+        self.incoming_dir = self.root / ".incoming"
+        self.incoming_dir.mkdir(parents=True, exist_ok=True)
+
+    async def save_upload(self, filename: str, source: BinaryIO) -> Path:
+        """
+        Stream an upload into the store, hashing it on the way.
+
+        Args:
+            filename: The uploaded file's original name
+            source: The file object of the upload
+
+        Returns:
+            Absolute path of the stored resume, ending in this upload's filename
+        """
+        return await asyncio.to_thread(self._store, filename, source)
+
+    def _store(self, filename: str, source: BinaryIO) -> Path:
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.incoming_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+
+            content_dir = self.root / digest.hexdigest()
+            target = content_dir / (Path(filename or "resume.pdf").name or "resume.pdf")
+            if content_dir.is_dir():
+                existing = next((p for p in content_dir.iterdir() if p.is_file()), None)
+                if existing is not None:
+                    # Duplicate upload - reuse the stored copy (under this upload's name) and mark it as recently used
+                    if not target.exists():
+                        self._link(existing, target)
+                    os.utime(target)
+                    return target.absolute()
+
+            content_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, target)
+            tmp_name = None
+            return target.absolute()
+        finally:
+            if tmp_name and os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    @staticmethod
+    def _link(existing: Path, target: Path) -> None:
+        """Give a stored resume a second name, copying where hard links are not supported."""
+        try:
+            os.link(existing, target)
+        except OSError:
+            shutil.copy2(existing, target)
+
+    def collect_garbage(self, in_use: Iterable[str] = ()) -> int:
+        """
+        Remove stored resumes that have not been used for max_age_seconds.
+
+        Args:
+            in_use: Resume paths of jobs that are still pending or running (never removed)
+
+        Returns:
+            Number of stored resumes removed
+        """
+        keep = {str(Path(p).absolute()) for p in in_use}
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+
+        for content_dir in self.root.iterdir():
+            if not content_dir.is_dir() or content_dir == self.incoming_dir:
+                continue
+            files = [p for p in content_dir.iterdir() if p.is_file()]
+            if any(str(p.absolute()) in keep for p in files):
+                continue
+            if files and max(p.stat().st_mtime for p in files) >= cutoff:
+                continue
+            shutil.rmtree(content_dir, ignore_errors=True)
+            removed += 1
+        return removed
@@ -0,0 +1,287 @@
+"""
+Pre-warmed, recycled remote browser sessions.
+
+Every application used to create its Browserbase session synchronously and then fetch the
+live view URL, all before navigation started. `SessionPool` creates sessions ahead of
+queued work (each with its live view URL, fetched concurrently across sessions), tracks
+their expiry, and hands keep-alive sessions back out for the next application instead of
+releasing them. `LocalCDPProvider` launches local Chromium processes with a CDP endpoint
+so the pool can be exercised without Browserbase (BROWSER_SESSIONS=local).
+"""
+
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Browserbase default session lifetime, used when the API does not report an expiry
+DEFAULT_SESSION_TTL_SECONDS = 15 * 60
+
+# Sessions this close to expiry are not handed out
+EXPIRY_MARGIN_SECONDS = 120
+
+# Applications run in one session before it is released
+DEFAULT_MAX_USES = 5
+
+DEFAULT_POOL_SIZE = 4
+
+
+@dataclass
+class PooledSession:
+    """A remote browser session ready to connect to over CDP."""
+    id: str
+    connect_url: str
+    expires_at: float
+    live_view_url: Optional[str] = None
+    reusable: bool = False  # Whether the session survives a disconnect (keep-alive)
+    uses: int = 0
+    handle: object = field(default=None, repr=False)  # Provider-specific state (e.g. a local process)
+
+    def expires_within(self, seconds: float) -> bool:
+        return time.time() >= self.expires_at - seconds
+
+
+class BrowserbaseProvider:
+    """Creates and releases Browserbase sessions. All methods block; the pool runs them in threads."""
+
+    def __init__(self, keep_alive: bool = True):
+        # Imported here so importing the backend does not load the SDK
+        from browserbase import Browserbase
+        self.bb = Browserbase(api_key=os.getenv("BROWSERBASE_API_KEY"))
+        self.project_id = os.getenv("BROWSERBASE_PROJECT_ID")
+        self.keep_alive = keep_alive
+
+    def create(self) -> PooledSession:
+        session = self.bb.sessions.create(project_id=self.project_id, keep_alive=self.keep_alive)
+        expires_at = getattr(session, "expires_at", None)
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+        pooled = PooledSession(
+            id=session.id,
+            connect_url=session.connect_url,
+            expires_at=expires_at.timestamp() if isinstance(expires_at, datetime) else time.time() + DEFAULT_SESSION_TTL_SECONDS,
+            reusable=self.keep_alive,
+        )
+        try:
+            pooled.live_view_url = self.bb.sessions.debug(session.id).debugger_fullscreen_url
+        except Exception as e:
+            print(f"Error fetching live view URL for session {session.id}: {e}")
+        return pooled
+
+    def release(self, session: PooledSession) -> None:
+        try:
+            self.bb.sessions.update(session.id, project_id=self.project_id, status="REQUEST_RELEASE")
+        except Exception as e:
+            print(f"Could not release Browserbase session {session.id}: {e}")
+
+
+class LocalCDPProvider:
+    """
+    Local stand-in for BrowserbaseProvider: one headless Chromium process per session,
+    reachable over CDP like a remote session.
+    """
+
+    def __init__(self, executable_path: Optional[str] = None, ttl_seconds: int = DEFAULT_SESSION_TTL_SECONDS):
+        self.executable_path = executable_path or os.getenv("LOCAL_CHROMIUM_PATH") or self._playwright_chromium()
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _playwright_chromium() -> str:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as playwright:
+            return playwright.chromium.executable_path
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def create(self) -> PooledSession:
+        port = self._free_port()
+        user_data_dir = tempfile.mkdtemp(prefix="kyro-cdp-")
+        process = subprocess.Popen(
+            [
+                self.executable_path,
+                "--headless=new",
+                f"--remote-debugging-port={port}",
+                f"--user-data-dir={user_data_dir}",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "about:blank",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        # Wait for the DevTools endpoint to accept connections
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            process.kill()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise RuntimeError(f"Local Chromium did not open its CDP port {port}")
+
+        endpoint = f"http://127.0.0.1:{port}"
+        return PooledSession(
+            id=f"local-{process.pid}",
+            connect_url=endpoint,
+            expires_at=time.time() + self.ttl_seconds,
+            live_view_url=endpoint,
+            reusable=True,
+            handle=(process, user_data_dir),
+        )
+
+    def release(self, session: PooledSession) -> None:
+        process, user_data_dir = session.handle
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+class SessionPool:
+    """
+    Keeps warm browser sessions ready for queued applications.
+
+    Used from the event loop only; provider calls run in worker threads. Sessions handed
+    out by acquire() are tracked until released, so close() releases them too.
+    """
+
+    def __init__(self, provider, size: int = DEFAULT_POOL_SIZE, max_uses: int = DEFAULT_MAX_USES):
+        """
+        Args:
+            provider: BrowserbaseProvider or LocalCDPProvider
+            size: Maximum number of idle sessions kept warm
+            max_uses: Applications run in one session before it is released
+        """
+        self.provider = provider
+        self.size = size
+        self.max_uses = max_uses
+        self.idle: List[PooledSession] = []
+        self.in_use: Dict[str, PooledSession] = {}
+        self.closed = False
+        self._creating = 0
+        self.created = 0
+        self.reused = 0
+
+    async def _create(self, to_idle: bool = False) -> Optional[PooledSession]:
+        self._creating += 1
+        try:
+            session = await asyncio.to_thread(self.provider.create)
+            self.created += 1
+            if to_idle:
+                # Idle before _creating drops, so a waiting acquire() always sees it
+                self.idle.append(session)
+            return session
+        except Exception as e:
+            print(f"❌ Error creating browser session: {e}")
+            return None
+        finally:
+            self._creating -= 1
+
+    async def warm(self, count: Optional[int] = None) -> int:
+        """
+        Create sessions ahead of work, concurrently, up to the pool size.
+
+        Args:
+            count: Sessions the queued work needs (defaults to the pool size)
+
+        Returns:
+            Number of sessions created
+        """
+        wanted = min(self.size, count if count is not None else self.size)
+        missing = wanted - len(self.idle) - self._creating
+        if missing <= 0:
+            return 0
+        sessions = await asyncio.gather(*(self._create(to_idle=True) for _ in range(missing)))
+        warmed = [session for session in sessions if session is not None]
+        if warmed:
+            print(f"📦 Pre-warmed {len(warmed)} browser session(s), {len(self.idle)} idle")
+        return len(warmed)
+
+    async def acquire(self) -> PooledSession:
+        """
+        Take a warm session, or create one if none is ready.
+
+        Raises:
+            RuntimeError: If the pool is closed or no session could be created
+        """
+        if self.closed:
+            raise RuntimeError("Session pool is closed")
+
+        # Sessions already being warmed are faster than starting a new one
+        while not self.idle and self._creating > 0:
+            await asyncio.sleep(0.1)
+
+        while self.idle:
+            session = self.idle.pop(0)
+            if not session.expires_within(EXPIRY_MARGIN_SECONDS):
+                if session.uses:
+                    self.reused += 1
+                session.uses += 1
+                self.in_use[session.id] = session
+                return session
+            await asyncio.to_thread(self.provider.release, session)
+
+        session = await self._create()
+        if session is None:
+            raise RuntimeError("Could not create a browser session")
+        session.uses += 1
+        self.in_use[session.id] = session
+        return session
+
+    async def release(self, session: PooledSession, healthy: bool = True) -> None:
+        """
+        Return a session after an application.
+
+        Healthy keep-alive sessions with uses and lifetime left go back to the pool;
+        everything else is released at the provider.
+        """
+        if self.in_use.pop(session.id, None) is None:
+            # Already released by close()
+            return
+        recyclable = (
+            not self.closed
+            and healthy
+            and session.reusable
+            and session.uses < self.max_uses
+            and not session.expires_within(EXPIRY_MARGIN_SECONDS)
+            and len(self.idle) < self.size
+        )
+        if recyclable:
+            self.idle.append(session)
+            return
+        await asyncio.to_thread(self.provider.release, session)
+
+    async def close(self) -> None:
+        """Release every idle and checked-out session; later acquire() calls fail."""
+        self.closed = True
+        sessions = self.idle + list(self.in_use.values())
+        self.idle, self.in_use = [], {}
+        await asyncio.gather(*(asyncio.to_thread(self.provider.release, session) for session in sessions))
+
+    def metrics(self) -> dict:
+        return {"idle": len(self.idle), "in_use": len(self.in_use), "created": self.created, "reused": self.reused}
+
+
+def create_session_pool(size: int = DEFAULT_POOL_SIZE) -> SessionPool:
+    """
+    Build the pool for this process. BROWSER_SESSIONS=local uses local Chromium over CDP
+    instead of Browserbase.
+    """
+    if os.getenv("BROWSER_SESSIONS", "browserbase").lower() == "local":
+        return SessionPool(LocalCDPProvider(), size=size)
+    return SessionPool(BrowserbaseProvider(), size=size)
@@ -1,151 +1,118 @@
 import asyncio
-import contextvars
-import os
-import shutil
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
 # Add src to python path to allow imports
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 sys.path.append(str(Path(__file__).parent.parent / "src"))
 
-from src.one_pager import OnePagerApplicant
-from src.workday_pager import WorkdayPager
-from src.action_agent import ApplicationActionAgent, QuestionElement, WebElement, QuestionResponse
-from src.async_action_agent import AsyncApplicationActionAgent
+# Flat imports, as the agents use, so each module is loaded once (not also as src.<module>)
+from resume_artifact import ResumeArtifact
+from profile_artifact import ProfileArtifact, load_profile
+# Pagers (and the SDKs behind them) are resolved by name on first use
+from providers import resolve
 
-# ContextVar to store the resume path for the current task context
-# This allows us to handle concurrent requests with different resumes
-current_resume_path = contextvars.ContextVar("current_resume_path", default=None)
-
-# Store original method to call it if context var is not set (backwards compatibility)
-_original_get_default_resume_path = ApplicationActionAgent._get_default_resume_path
-
-def patched_get_default_resume_path(self) -> str:
-    """
-    Patched version of _get_default_resume_path that checks the ContextVar first.
-    """
-    custom_path = current_resume_path.get()
-    if custom_path:
-        if os.path.exists(custom_path):
-            return custom_path
-        else:
-            print(f"Warning: Custom resume path {custom_path} does not exist. Falling back to default.")
-    
-    return _original_get_default_resume_path(self)
-
-# Apply the patch
-ApplicationActionAgent._get_default_resume_path = patched_get_default_resume_path
-AsyncApplicationActionAgent._get_default_resume_path = patched_get_default_resume_path
+if TYPE_CHECKING:
+    from .session_pool import SessionPool
 
 class JobWorker:
-    def __init__(self, job_id: str, resume_path: str, urls: List[str]):
+    def __init__(self, job_id: str, resume_path: str, urls: List[str], profile_data: Optional[Dict[str, Any]] = None, session_pool: Optional["SessionPool"] = None):
         self.job_id = job_id
+        # Pre-warmed browser sessions; without a pool each applicant creates its own
+        self.session_pool = session_pool
         self.resume_path = resume_path
+        # Resolved once per job and passed to every applicant
+        self.resume = ResumeArtifact.from_path(resume_path)
+        # Applicant profile for this job (None uses user_info.json); compiled once when the job starts
+        self.profile_data = profile_data
+        self.profile: Optional[ProfileArtifact] = None
         self.urls = urls
         self.status = {}  # url -> status (pending, running, completed, failed)
         self.logs = {}    # url -> execution logs
         self.session_ids = {} # url -> browserbase session id
+        self.warm_task: Optional[asyncio.Task] = None
         self.live_view_urls = {} # url -> live view url
         
         for url in urls:
             self.status[url] = "pending"
             self.logs[url] = []
 
+    def _record_session(self, url: str, applicant):
+        """Remember the Browserbase session and live view URL of an applicant, if it has one."""
+        if not (hasattr(applicant, 'session') and applicant.session):
+            return
+        self.session_ids[url] = applicant.session.id
+        print(f"[{self.job_id}] Browserbase session created: {applicant.session.id}")
+        
+        # Fetch live view URL
+        try:
+            # applicant.bb is the Browserbase client instance
+            debug_info = applicant.bb.sessions.debug(applicant.session.id)
+            # debug_info is a SessionDebugUrlResponse which has debugger_fullscreen_url
+            if hasattr(debug_info, 'debugger_fullscreen_url'):
+                self.live_view_urls[url] = debug_info.debugger_fullscreen_url
+                print(f"[{self.job_id}] Live view URL: {self.live_view_urls[url]}")
+        except Exception as e:
+            print(f"[{self.job_id}] Error fetching live view URL: {e}")
+
     async def process_url(self, url: str):
         self.status[url] = "running"
         print(f"[{self.job_id}] processing {url}...")
         
         try:
-            # Set the context variable for this task
-            token = current_resume_path.set(self.resume_path)
-            
-            # Run the OnePagerApplicant in a thread to avoid blocking the event loop
-            # since Playwright sync API is used in OnePagerApplicant
-            def run_applicant():
-                # Capture stdout/stderr? ideally we'd want to capture logs
-                # Capture stdout/stderr? ideally we'd want to capture logs
-                # For now just run it.
-                if "myworkdayjobs.com" in url:
-                    print(f"[{self.job_id}] Detected Workday URL, using WorkdayPager")
-                    applicant = WorkdayPager(
-                        url=url,
-                        headless=True,
-                        production=True, # Enable Browserbase
-                        debug_menu=False
-                    )
-                    
-                    # WorkdayPager.run() is async, but we are inside a blocking thread via to_thread
-                    # This is tricky because asyncio.to_thread runs in a separate thread, but we need an event loop there
-                    # OR we can just run it directly if process_url allows.
-                    # Actually process_url IS async. So we can just await applicant.run() directly for WorkdayPager?
-                    # But then we need to handle the fact that OnePagerApplicant is sync.
-                    
-                    # Refactor plan:
-                    # If Workday -> await applicant.run()
-                    # If OnePager -> await asyncio.to_thread(applicant.run)
-                    
-                    # Wait, we are inside 'run_applicant' which is passed to asyncio.to_thread.
-                    # WorkdayPager being async means we can't run it inside this sync wrapper easily without a new loop.
-                    
-                    # Better approach: Move the dispatch OUTSIDE run_applicant wrapper.
-                    pass 
-                else:
+            if "myworkdayjobs.com" in url:
+                print(f"[{self.job_id}] Detected Workday URL, using WorkdayPager")
+                # WorkdayPager.run() is async, so it is awaited directly on the event loop
+                WorkdayPager = await asyncio.to_thread(resolve, "pager", "workday")
+                applicant = WorkdayPager(
+                    url=url,
+                    headless=True,
+                    production=True, # Enable Browserbase
+                    debug_menu=False
+                )
+                self._record_session(url, applicant)
+                await applicant.run()
+            else:
+                # A warm session (live view URL included) is taken from the pool, off the critical path
+                session = None
+                if self.session_pool is not None:
+                    try:
+                        session = await self.session_pool.acquire()
+                    except RuntimeError as e:
+                        # The applicant creates its own session instead
+                        print(f"[{self.job_id}] No pooled browser session, creating one per application: {e}")
+                if session is not None:
+                    self.session_ids[url] = session.id
+                    if session.live_view_url:
+                        self.live_view_urls[url] = session.live_view_url
+                    print(f"[{self.job_id}] Using browser session {session.id} (use {session.uses})")
+                
+                # OnePagerApplicant uses the Playwright sync API, so it runs in a thread
+                # (including its first import) to avoid blocking the event loop
+                def run_applicant():
+                    OnePagerApplicant = resolve("pager", "one_pager")
                     applicant = OnePagerApplicant(
                         url=url,
                         headless=True,  # Run headless for backend workers
                         production=True, # Enable Browserbase
                         slow_mode=False,
-                        debug_menu=False
+                        debug_menu=False,
+                        resume=self.resume,
+                        profile=self.profile,
+                        session=session
                     )
-                
-                    # Capture session ID if available (only in production mode)
-                    if hasattr(applicant, 'session') and applicant.session:
-                        self.session_ids[url] = applicant.session.id
-                        print(f"[{self.job_id}] Browserbase session created: {applicant.session.id}")
-                        
-                        # Fetch live view URL
-                        try:
-                            # applicant.bb is the Browserbase client instance
-                            debug_info = applicant.bb.sessions.debug(applicant.session.id)
-                            # debug_info is a SessionDebugUrlResponse which has debugger_fullscreen_url
-                            if hasattr(debug_info, 'debugger_fullscreen_url'):
-                                self.live_view_urls[url] = debug_info.debugger_fullscreen_url
-                                print(f"[{self.job_id}] Live view URL: {self.live_view_urls[url]}")
-                        except Exception as e:
-                            print(f"[{self.job_id}] Error fetching live view URL: {e}")
-                    
+                    if session is None:
+                        self._record_session(url, applicant)
                     applicant.run()
-            
-            # Using asyncio.to_thread to run the sync blocking code
-            # We need to restructure this to handle async WorkdayPager vs sync OnePagerApplicant
-            if "myworkdayjobs.com" in url:
-                 applicant = WorkdayPager(
-                    url=url,
-                    headless=True,
-                    production=True, 
-                    debug_menu=False
-                )
-                 # WorkdayPager sets self.session in __init__ just like OnePagerApplicant?
-                 # Checking WorkdayPager source: yes, uses self.bb.sessions.create
-                 if hasattr(applicant, 'session') and applicant.session:
-                     self.session_ids[url] = applicant.session.id
-                     print(f"[{self.job_id}] Browserbase session created: {applicant.session.id}")
-                     
-                     # Fetch live view URL
-                     try:
-                         # applicant.bb is the Browserbase client instance
-                         debug_info = applicant.bb.sessions.debug(applicant.session.id)
-                         if hasattr(debug_info, 'debugger_fullscreen_url'):
-                             self.live_view_urls[url] = debug_info.debugger_fullscreen_url
-                             print(f"[{self.job_id}] Live view URL: {self.live_view_urls[url]}")
-                     except Exception as e:
-                         print(f"[{self.job_id}] Error fetching live view URL: {e}")
-
-                 await applicant.run()
-            else:
-                 await asyncio.to_thread(run_applicant)
+                
+                healthy = False
+                try:
+                    await asyncio.to_thread(run_applicant)
+                    healthy = True
+                finally:
+                    if session is not None:
+                        await self.session_pool.release(session, healthy=healthy)
             
             self.status[url] = "completed"
             
@@ -153,12 +120,27 @@ class JobWorker:
             print(f"[{self.job_id}] Error processing {url}: {e}")
             self.status[url] = "failed"
             self.logs[url].append(str(e))
-        finally:
-            # Clean up context var (not strictly necessary as context is local to task)
-            # current_resume_path.reset(token) 
-            pass
+
+    def _compile_profile(self) -> ProfileArtifact:
+        if self.profile_data is not None:
+            return ProfileArtifact.from_dict(self.profile_data, source=f"job {self.job_id}")
+        return load_profile()
 
     async def run(self, semaphore: asyncio.Semaphore):
+        # Start creating browser sessions while the profile compiles (referenced so it is not garbage collected)
+        if self.session_pool is not None:
+            self.warm_task = asyncio.create_task(self.session_pool.warm(len(self.urls)))
+        
+        # Parse the profile and render its system prompt once, shared by every URL of the job
+        try:
+            self.profile = await asyncio.to_thread(self._compile_profile)
+        except Exception as e:
+            print(f"[{self.job_id}] Error compiling profile: {e}")
+            for url in self.urls:
+                self.status[url] = "failed"
+                self.logs[url].append(f"Profile error: {e}")
+            return
+        
         tasks = []
         for url in self.urls:
             # Create a wrapper coroutine that acquires the semaphore
@@ -169,6 +151,8 @@ class JobWorker:
             tasks.append(asyncio.create_task(protected_process()))
         
         await asyncio.gather(*tasks)
+        if self.warm_task is not None:
+            await self.warm_task
 
 # Global job store (in-memory)
 jobs: Dict[str, JobWorker] = {}
@@ -0,0 +1,135 @@
+"""
+Flat, array-backed representation of the AgentQL accessibility tree.
+
+The tree returned by `page.get_last_accessibility_tree()` is a nested structure of
+dicts and lists. Walking it recursively for every element (and allocating an empty
+`attributes` dict on every `.get('attributes', {})`) gets expensive once a page has
+thousands of nodes. `FlatAccessibilityTree` converts it once into parallel arrays
+so every search below is a plain iterative scan over integer indexes.
+"""
+
+from typing import Any, Dict, List, Optional
+
+NO_NODE = -1
+
+
+class FlatAccessibilityTree:
+    """Node table for an accessibility tree using parallel arrays.
+
+    Each node is an integer index into the arrays below. Children are linked through
+    `first_child` / `next_sibling`, so no per-node lists are kept.
+    """
+
+    __slots__ = ("role", "name", "tf623_id", "parent", "first_child", "next_sibling", "_id_index")
+
+    def __init__(self) -> None:
+        self.role: List[str] = []
+        self.name: List[str] = []
+        self.tf623_id: List[Optional[str]] = []
+        self.parent: List[int] = []
+        self.first_child: List[int] = []
+        self.next_sibling: List[int] = []
+        self._id_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_tree(cls, tree_data: Any) -> "FlatAccessibilityTree":
+        """Convert a nested accessibility tree (dict or list of dicts) into a node table.
+
+        Nodes are stored in pre-order, so the first node with a given tf623_id is the
+        same node a recursive depth-first search would have found.
+
+        Args:
+            tree_data: The accessibility tree from the page
+
+        Returns:
+            The flattened tree
+        """
+        tree = cls()
+        if tree_data is None:
+            return tree
+
+        if isinstance(tree_data, list):
+            # A list at the top level becomes the children of a synthetic root
+            tree._add_node({}, NO_NODE)
+            roots = [(tree_data, 0)]
+        else:
+            roots = [([tree_data], NO_NODE)]
+
+        # Stack of (remaining children reversed, parent index) so siblings keep document order
+        stack = [(list(reversed(children)), parent) for children, parent in roots]
+        last_child: Dict[int, int] = {}
+
+        while stack:
+            pending, parent = stack[-1]
+            if not pending:
+                stack.pop()
+                continue
+
+            node = pending.pop()
+            if not isinstance(node, dict):
+                continue
+
+            index = tree._add_node(node, parent)
+            if parent != NO_NODE:
+                previous = last_child.get(parent, NO_NODE)
+                if previous == NO_NODE:
+                    tree.first_child[parent] = index
+                else:
+                    tree.next_sibling[previous] = index
+                last_child[parent] = index
+
+            children = node.get("children")
+            if isinstance(children, list) and children:
+                stack.append((list(reversed(children)), index))
+
+        return tree
+
+    def _add_node(self, node: Dict[str, Any], parent: int) -> int:
+        index = len(self.role)
+        attributes = node.get("attributes")
+        raw_id = attributes.get("tf623_id") if isinstance(attributes, dict) else None
+        node_id = str(raw_id) if raw_id is not None else None
+        name = node.get("name")
+
+        self.role.append(node.get("role") or "")
+        self.name.append(name.strip() if isinstance(name, str) else "")
+        self.tf623_id.append(node_id)
+        self.parent.append(parent)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+
+        if node_id is not None and node_id not in self._id_index:
+            self._id_index[node_id] = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self.role)
+
+    def find_by_tf623_id(self, tf623_id: Any) -> int:
+        """Return the node index with the given tf623_id, or NO_NODE if absent."""
+        if tf623_id is None:
+            return NO_NODE
+        return self._id_index.get(str(tf623_id), NO_NODE)
+
+    def children(self, index: int) -> List[int]:
+        """Return the child indexes of a node in document order."""
+        result = []
+        child = self.first_child[index]
+        while child != NO_NODE:
+            result.append(child)
+            child = self.next_sibling[child]
+        return result
+
+    def find_name_in_subtree(self, index: int, max_depth: int = 5) -> Optional[str]:
+        """Return the first non-empty name in pre-order within `max_depth` levels of a node."""
+        stack = [(index, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if self.name[node]:
+                return self.name[node]
+            if depth >= max_depth:
+                continue
+            # Push children reversed so the left-most child is visited first
+            for child in reversed(self.children(node)):
+                stack.append((child, depth + 1))
+        return None
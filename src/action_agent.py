@@ -1,10 +1,26 @@
-import os
-from typing import Dict, List
-from pathlib import Path
-from dual_model_question_agent import DualModelApplicationQuestionAgent as ApplicationQuestionAgent
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from models import QuestionResponse
 from elements import QuestionElement, WebElement
-import time
+from resume_artifact import ResumeArtifact, resolve_default_resume
+from profile_artifact import ProfileArtifact
+from fill_executor import BatchFillExecutor
+from streaming_fill import StreamingFill
+from fill_scheduler import ANSWER_CONCURRENCY, AutofillWatcher, autofill_matches, schedule
+from narrative_router import ROUTE_CREATIVE, classify_question
+from option_matcher import relevant_options, resolve_option
+from providers import resolve
+
+if TYPE_CHECKING:
+    from dual_model_question_agent import DualModelApplicationQuestionAgent as ApplicationQuestionAgent
+
+# Returns the (value, text) pairs of a native <select>, or null for any other element
+NATIVE_SELECT_OPTIONS_SCRIPT = """
+(el) => el instanceof HTMLSelectElement
+    ? Array.from(el.options).map((o) => ({ value: o.value, text: o.text }))
+    : null
+"""
 
 class ApplicationActionAgent:
     """
@@ -12,58 +28,162 @@ class ApplicationActionAgent:
     based on question types. Uses the existing ApplicationQuestionAgent for LLM guidance.
     """
     
-    def __init__(self, question_element_mapping: Dict[QuestionElement, List[WebElement]] = None):
+    def __init__(self, question_element_mapping: Dict[QuestionElement, List[WebElement]] = None, resume: Optional[ResumeArtifact] = None, question_agent: Optional["ApplicationQuestionAgent"] = None, profile: Optional[ProfileArtifact] = None):
         """
         Initialize the ActionAgent with the question-element mapping.
         
         Args:
             question_element_mapping: Dictionary mapping QuestionElement to list of WebElement objects
+            resume: The resume to upload for this application. Defaults to the first resume
+                    in the resume folder.
+            question_agent: Agent used to answer questions. Defaults to one built on the
+                            shared client registry.
+            profile: The applicant profile to answer with. Defaults to user_info.json.
         """
         self.question_element_mapping = question_element_mapping or {}
-        self.question_agent = ApplicationQuestionAgent()
+        self.resume = resume
+        self.fill_executor = BatchFillExecutor()
+        self.streaming_fill = StreamingFill()
+        self.question_agent = question_agent or resolve("question_agent", "dual_model")(profile=profile)
     
     def process_all_questions(self):
         """
         Process all questions in the mapping and perform actions based on their types.
+        
+        The resume is uploaded first while all answers are generated concurrently; fields
+        that the upload's autofill already filled with the same answer are skipped.
         """
         print("Starting to process all questions...")
         print(f"Total questions to process: {len(self.question_element_mapping)}")
         
-        question_count = 0
-        for question_element, web_elements in self.question_element_mapping.items():
-            question_count += 1
-            print(f"\n[{question_count}/{len(self.question_element_mapping)}] Processing question: {question_element.question}")
-            
-            # Build extra context with dropdown options if available
-            extra_context = f"Question type: {question_element.question_type}\nElements: {[str(elem) for elem in web_elements]}"
-            if question_element.question_type == "dropdown_question" and hasattr(question_element, 'options') and question_element.options:
-                extra_context += f"\nAvailable options: {question_element.options}"
+        uploads, others = schedule(self.question_element_mapping)
+        
+        with ThreadPoolExecutor(max_workers=ANSWER_CONCURRENCY, thread_name_prefix="answer") as executor:
+            # Prompts are built on the page thread; only the LLM calls run in the pool
+            pending = []
+            for question_element, web_elements in others:
+                extra_context = self._build_extra_context(question_element, web_elements)
+                multiline = self._is_multiline(question_element, web_elements)
+                element_names = [str(elem) for elem in web_elements]
+                
+                # Narrative answers stream in the background while the rest of the form is filled
+                if self._start_streaming_answer(question_element, web_elements, extra_context, multiline, element_names):
+                    continue
+                
+                future = executor.submit(
+                    self.question_agent.answer_question,
+                    question=question_element.question,
+                    extra_context=extra_context,
+                    question_type=question_element.question_type,
+                    multiline=multiline,
+                    element_names=element_names,
+                )
+                pending.append((question_element, web_elements, future))
             
-            # Get LLM guidance for this question
-            llm_response = self.question_agent.answer_question(
-                question=question_element.question,
-                extra_context=extra_context
-            )
+            # Upload the resume while the answers generate, then wait only as long as autofill is active
+            autofilled = self._upload_resumes(uploads, others)
             
-            print(f"LLM Response: {llm_response.response}")
-            print(f"Creative Mode: {llm_response.creative_mode}")
-            print(f"Reasoning: {llm_response.reasoning}")
-            print(f"Question type: {question_element.question_type}")
-            print(f"Associated elements: {[str(elem) for elem in web_elements]}")
-            if question_element.question_type == "dropdown_question" and hasattr(question_element, 'options') and question_element.options:
-                print(f"Available options: {question_element.options}")
+            for question_count, (question_element, web_elements, future) in enumerate(pending, start=1):
+                print(f"\n[{question_count}/{len(pending)}] Processing question: {question_element.question}")
+                try:
+                    llm_response = future.result()
+                except Exception as e:
+                    print(f"Error answering question: {e}")
+                    continue
+                
+                print(f"LLM Response: {llm_response.response}")
+                print(f"Creative Mode: {llm_response.creative_mode}")
+                print(f"Reasoning: {llm_response.reasoning}")
+                print(f"Question type: {question_element.question_type}")
+                print(f"Associated elements: {[str(elem) for elem in web_elements]}")
+                if question_element.question_type == "dropdown_question" and hasattr(question_element, 'options') and question_element.options:
+                    print(f"Available options: {len(question_element.options)} total")
+                
+                # Process based on question type
+                if not llm_response.response.strip():
+                    print("No answer produced, leaving the field for review")
+                elif web_elements and autofill_matches(autofilled.get(web_elements[0].selector), llm_response.response):
+                    print(f"⏭️ Already autofilled with: {autofilled[web_elements[0].selector]}")
+                elif question_element.question_type == "input_text_question":
+                    self._handle_input_text_question(question_element, web_elements, llm_response)
+                elif question_element.question_type == "dropdown_question":
+                    self._handle_dropdown_question(question_element, web_elements, llm_response)
+                elif question_element.question_type == "radio_checkbox_question":
+                    self._handle_radio_checkbox_question(question_element, web_elements, llm_response)
+                else:
+                    print(f"Unknown question type: {question_element.question_type}")
+                
+                # Write whatever the streaming answers have produced so far
+                self.streaming_fill.pump()
+        
+        # Queue the final streamed answers, then apply all text answers in one page evaluation
+        self.streaming_fill.finish(self.fill_executor)
+        self.fill_executor.flush()
+    
+    def _build_extra_context(self, question_element: QuestionElement, web_elements: List[WebElement]) -> str:
+        """Build the context sent with a question: its type, elements and (relevant) dropdown options."""
+        extra_context = f"Question type: {question_element.question_type}\nElements: {[str(elem) for elem in web_elements]}"
+        if question_element.question_type == "dropdown_question" and hasattr(question_element, 'options') and question_element.options:
+            # The prompt gets a profile-relevant view; the full list is kept for matching during fill
+            shown_options = relevant_options(question_element.options, question_element.question, self.question_agent.user_info)
+            extra_context += f"\nAvailable options: {shown_options}"
+            if len(shown_options) < len(question_element.options):
+                extra_context += (
+                    f"\n(Showing {len(shown_options)} of {len(question_element.options)} options most relevant "
+                    "to the profile; answer with the exact option text.)"
+                )
+        return extra_context
+    
+    def _upload_resumes(self, uploads: List[Tuple[QuestionElement, List[WebElement]]], others: List[Tuple[QuestionElement, List[WebElement]]]) -> Dict[str, str]:
+        """
+        Upload the resume before anything is typed and wait for the resulting autofill.
+        
+        Args:
+            uploads: The resume questions
+            others: All other questions; their text fields are watched for autofill
             
-            # Process based on question type
-            if question_element.question_type == "input_text_question":
-                self._handle_input_text_question(question_element, web_elements, llm_response)
-            elif question_element.question_type == "dropdown_question":
-                self._handle_dropdown_question(question_element, web_elements, llm_response)
-            elif question_element.question_type == "radio_checkbox_question":
-                self._handle_radio_checkbox_question(question_element, web_elements, llm_response)
-            elif question_element.question_type == "resume_question":
-                self._handle_resume_question(question_element, web_elements, llm_response)
-            else:
-                print(f"Unknown question type: {question_element.question_type}")
+        Returns:
+            Selector -> value of the text fields autofill populated
+        """
+        if not uploads:
+            return {}
+        
+        text_fields = [wes[0] for qe, wes in others if qe.question_type == "input_text_question" and wes]
+        watcher = AutofillWatcher(text_fields)
+        watcher.snapshot()
+        
+        uploaded = False
+        for question_element, web_elements in uploads:
+            print(f"\nUploading for question: {question_element.question}")
+            uploaded = self._handle_resume_question(question_element, web_elements) or uploaded
+        
+        return watcher.wait_for_autofill() if uploaded else {}
+    
+    def _is_multiline(self, question_element: QuestionElement, web_elements: List[WebElement]) -> bool:
+        """Whether a text question is answered in a textarea, which hints at a narrative answer."""
+        if question_element.question_type != "input_text_question" or not web_elements or web_elements[0].locator is None:
+            return False
+        try:
+            return web_elements[0].locator.evaluate("(el) => el.tagName === 'TEXTAREA'")
+        except Exception:
+            return False
+    
+    def _start_streaming_answer(self, question_element: QuestionElement, web_elements: List[WebElement], extra_context: str, multiline: bool, element_names: List[str]) -> bool:
+        """
+        Start streaming the answer of a clearly narrative text question, if the agent can stream.
+        
+        Returns:
+            True if the answer is streaming and the question needs no further handling here
+        """
+        stream = getattr(self.question_agent, "stream_creative_response", None)
+        if stream is None or not web_elements or web_elements[0].locator is None:
+            return False
+        route = classify_question(question_element.question, question_element.question_type, multiline, element_names)
+        if route != ROUTE_CREATIVE:
+            return False
+        question = question_element.question
+        self.streaming_fill.start(web_elements[0], lambda: stream(question, extra_context))
+        return True
     
     def _handle_input_text_question(self, question_element: QuestionElement, web_elements: List[WebElement], llm_response: QuestionResponse):
         """
@@ -75,8 +195,11 @@ class ApplicationActionAgent:
             llm_response: QuestionResponse object containing the LLM's structured response
         """
         if web_elements and web_elements[0].locator:
-            web_elements[0].locator.fill(llm_response.response)
-            print(f"✓ Filled text input with: {llm_response.response}")
+            if self.fill_executor.add(web_elements[0], llm_response.response):
+                print(f"✓ Queued text input for batched fill: {llm_response.response}")
+            else:
+                web_elements[0].locator.fill(llm_response.response)
+                print(f"✓ Filled text input with: {llm_response.response}")
         else:
             print("No web elements found for text input handling")
         pass
@@ -91,6 +214,20 @@ class ApplicationActionAgent:
             llm_response: QuestionResponse object containing the LLM's structured response
         """
         if web_elements and web_elements[0].locator:
+            # Native <select>: pick the option directly without keyboard simulation
+            if self._try_native_select(web_elements[0].locator, llm_response.response):
+                return
+            
+            # Resolve near-miss answers to an exact option so the combobox filter matches it
+            answer = llm_response.response
+            match = resolve_option(answer, question_element.options) if question_element.options else None
+            if match:
+                if match.text != answer:
+                    print(f"Resolved dropdown answer '{answer}' to option '{match.text}' (score {match.score})")
+                answer = match.text
+            elif question_element.options:
+                print(f"Warning: '{answer}' does not match any known option, typing it as-is")
+            
             try:
                 # Click the dropdown element
                 web_elements[0].locator.click()
@@ -98,13 +235,13 @@ class ApplicationActionAgent:
                 
                 # Type the entire response using page keyboard to avoid refocusing
                 page = web_elements[0].locator.page
-                page.keyboard.type(llm_response.response)
+                page.keyboard.type(answer)
                 time.sleep(0.5)  # Wait for filtering to complete
                 
                 # Press Enter to select the filtered option
                 page.keyboard.press("Enter")
                 time.sleep(0.3)
-                print(f"✓ Selected dropdown option: {llm_response.response}")
+                print(f"✓ Selected dropdown option: {answer}")
                 
                 # Cleanup: Close dropdown by pressing Escape or clicking elsewhere
                 time.sleep(0.5)  # Wait for selection to register
@@ -127,6 +264,43 @@ class ApplicationActionAgent:
             print("No web elements found for dropdown handling")
         time.sleep(0.2)
     
+    def _try_native_select(self, locator, answer: str) -> bool:
+        """
+        Select an option on a native <select> element by value or text.
+        
+        Args:
+            locator: Locator of the dropdown element
+            answer: The option to select
+            
+        Returns:
+            True if the element is a native select and a matching option was selected,
+            False if the caller should fall back to the combobox interaction
+        """
+        try:
+            native_options = locator.evaluate(NATIVE_SELECT_OPTIONS_SCRIPT)
+        except Exception as e:
+            print(f"Could not inspect dropdown element: {e}")
+            return False
+        if native_options is None:
+            return False
+        
+        wanted = answer.strip().lower()
+        option = next((o for o in native_options if o['value'].strip().lower() == wanted), None)
+        if option is None:
+            match = resolve_option(answer, [o['text'] for o in native_options])
+            option = native_options[match.index] if match else None
+        if option is None:
+            print(f"No native select option matches: {answer}")
+            return False
+        
+        try:
+            locator.select_option(value=option['value'])
+            print(f"✓ Selected native select option: {option['text']}")
+            return True
+        except Exception as e:
+            print(f"Native select_option failed: {e}")
+            return False
+    
     def _handle_radio_checkbox_question(self, question_element: QuestionElement, web_elements: List[WebElement], llm_response: QuestionResponse):
         """
         Handle radio button and checkbox questions.
@@ -136,71 +310,56 @@ class ApplicationActionAgent:
             web_elements: List of WebElement objects associated with this question
             llm_response: QuestionResponse object containing the LLM's structured response
         """
-        # Find and click elements matching LLM response
-        for element in web_elements:
-            if element.name.lower() == llm_response.response.lower() and element.locator:
-                element.locator.click()
-                print(f"✓ Selected option: {element.name}")
-                break
+        # Find and click the element matching the LLM response
+        match = resolve_option(llm_response.response, [element.name or "" for element in web_elements])
+        if match and web_elements[match.index].locator:
+            web_elements[match.index].locator.click()
+            print(f"✓ Selected option: {match.text}")
         else:
             print(f"No matching option found for: {llm_response.response}")
-        pass
     
-    def _get_default_resume_path(self) -> str:
+    def _get_resume(self) -> Optional[ResumeArtifact]:
         """
-        Get the default resume file path.
+        Get the resume for this application.
         
         Returns:
-            Path to the default resume file
+            The injected resume, or the default resume (resolved once per process)
         """
-        # Look for resume files in the resume folder
-        resume_dir = Path(__file__).parent.parent / "resume"
-        
-        # Common resume file extensions
-        extensions = ["*.pdf", "*.doc", "*.docx", "*.txt"]
-        
-        for ext in extensions:
-            resume_files = list(resume_dir.glob(ext))
-            if resume_files:
-                return str(resume_files[0])  # Return first found resume
-        
-        # Fallback to sample resume
-        return str(resume_dir / "sample_resume.pdf")
+        return self.resume or resolve_default_resume()
 
-    def _handle_resume_question(self, question_element: QuestionElement, web_elements: List[WebElement], llm_response: QuestionResponse):
+    def _handle_resume_question(self, question_element: QuestionElement, web_elements: List[WebElement], llm_response: Optional[QuestionResponse] = None) -> bool:
         """
         Handle resume upload questions using file chooser technique.
         
         Args:
             question_element: The QuestionElement instance
             web_elements: List of WebElement objects associated with this question
-            llm_response: QuestionResponse object containing the LLM's structured response
+            llm_response: Unused; uploads need no LLM answer
+            
+        Returns:
+            True if the resume was uploaded
         """
         # Skip cover letter questions
         if "cover letter" in question_element.question.lower():
             print(f"⏭️ Skipping cover letter question: {question_element.question}")
-            return
+            return False
             
-        resume_path = self._get_default_resume_path()
-        
-        # Validate resume file exists
-        if not os.path.exists(resume_path):
-            print(f"Resume file not found at: {resume_path}")
-            return
+        resume = self._get_resume()
+        if resume is None:
+            print("No resume file available")
+            return False
         
+        resume_path = resume.path
         print(f"Using resume file: {resume_path}")
         
         # Try to upload resume using each web element
         for element in web_elements:
             if self._try_upload_with_element(element, resume_path):
                 print(f"✓ Resume uploaded successfully via: {element.name}")
-                print("Waiting for auto-fill processing...")
-                # Wait for potential auto-fill after resume upload
-                if element.locator:
-                    element.locator.page.wait_for_timeout(10000)  # Wait 10 seconds
-                return
+                return True
         
         print("❌ Failed to upload resume with any available elements")
+        return False
 
     def _try_upload_with_element(self, element: WebElement, resume_path: str) -> bool:
         """
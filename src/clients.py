@@ -0,0 +1,82 @@
+"""
+Process-wide registry of LLM clients.
+
+Agents used to build their own `genai.Client` / `OpenAI` client on every construction,
+i.e. once per application. `ClientRegistry` creates each client lazily on first use and
+hands the same instance (and its pooled HTTP connections) to every agent in the process.
+Profiles are compiled separately, once per job (see profile_artifact.py). Call `close()`
+on shutdown to release connections and provider-side prompt caches.
+"""
+
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from prompt_cache import close_prompt_cache
+from singleton import LazySingleton
+
+
+class ClientRegistry:
+    """Lazily created, lock-protected shared LLM clients."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gemini = None
+        self._openai = None
+
+    def gemini(self):
+        """Return the shared Gemini client, creating it on first use."""
+        with self._lock:
+            if self._gemini is None:
+                load_dotenv()
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY environment variable is not set.")
+                from google import genai
+                try:
+                    self._gemini = genai.Client(api_key=api_key)
+                except Exception as e:
+                    raise RuntimeError(f"Error initializing Google Gemini client: {e}")
+                print("✅ Shared Gemini client initialized")
+            return self._gemini
+
+    def openai(self):
+        """Return the shared OpenAI client, creating it on first use."""
+        with self._lock:
+            if self._openai is None:
+                load_dotenv()
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY environment variable is not set.")
+                from openai import OpenAI
+                try:
+                    self._openai = OpenAI(api_key=api_key, timeout=60.0, max_retries=2)
+                except Exception as e:
+                    raise RuntimeError(f"Error initializing OpenAI client: {e}")
+                print("✅ Shared OpenAI client initialized")
+            return self._openai
+
+    def close(self) -> None:
+        """Delete provider prompt caches and close all clients. Clients are recreated on next use."""
+        close_prompt_cache()
+
+        with self._lock:
+            clients = [self._gemini, self._openai]
+            self._gemini = None
+            self._openai = None
+        for client in clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Warning: Could not close client {type(client).__name__}: {e}")
+
+
+_registry = LazySingleton(ClientRegistry)
+
+
+def get_clients() -> ClientRegistry:
+    """Return the process-wide client registry."""
+    return _registry.get()
@@ -0,0 +1,63 @@
+"""
+Shared in-page JavaScript helpers.
+
+The extraction, caching and mutation-tracking scripts all need the same small helpers
+(whitespace cleanup, label lookup, structural paths, element stamping). They are kept here
+as JS snippets and concatenated into each script's function body, e.g.
+
+    SCRIPT = \"\"\"
+    (el) => {
+    \"\"\" + CLEAN_JS + LABEL_JS + \"\"\"
+        return directLabelOf(el);
+    }
+    \"\"\"
+"""
+
+# clean(text): collapse whitespace
+CLEAN_JS = """
+    const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+"""
+
+# directLabelOf(el): <label>, aria-label or aria-labelledby text ('' if none). Needs CLEAN_JS.
+LABEL_JS = """
+    const directLabelOf = (el) => {
+        if (el.labels && el.labels.length) return clean(el.labels[0].innerText);
+        if (el.getAttribute('aria-label')) return clean(el.getAttribute('aria-label'));
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const ref = document.getElementById(labelledBy.split(' ')[0]);
+            if (ref) return clean(ref.innerText);
+        }
+        return '';
+    };
+"""
+
+# pathParts(el, root): [{tag, index}] from root down to el, index counted among same-tag siblings
+PATH_JS = """
+    const pathParts = (el, root) => {
+        const parts = [];
+        for (let node = el; node && node !== root; node = node.parentElement) {
+            let index = 1;
+            for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+                if (sib.tagName === node.tagName) index++;
+            }
+            parts.unshift({ tag: node.tagName.toLowerCase(), index });
+        }
+        return parts;
+    };
+"""
+
+# containerById(id): the element with that tf623_id, else the first form, else the body
+CONTAINER_BY_ID_JS = """
+    const containerById = (id) => (id && document.querySelector(`[tf623_id="${CSS.escape(String(id))}"]`))
+        || document.querySelector('form') || document.body;
+"""
+
+# stamp(el): give el a data-kyro-id unique across extractions on the document and return it
+STAMP_JS = """
+    window.__kyroNextId = window.__kyroNextId || 0;
+    const stamp = (el) => {
+        if (!el.hasAttribute('data-kyro-id')) el.setAttribute('data-kyro-id', String(window.__kyroNextId++));
+        return el.getAttribute('data-kyro-id');
+    };
+"""
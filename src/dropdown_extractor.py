@@ -17,6 +17,11 @@ from typing import Dict, Any, List
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright
 import agentql
+from option_harvester import get_option_harvester
+from option_cache import get_option_cache
+
+# Extraction strategies whose results are scoped to the dropdown and safe to cache
+CACHEABLE_STRATEGIES = {"select", "scoped", "harvest", "menu"}
 
 # Load environment variables
 load_dotenv()
@@ -52,6 +57,10 @@ class DropdownExtractor:
         """Initialize with the job URL."""
         self.url = url
         self.headless = headless
+        self.harvester = get_option_harvester()
+        self.option_cache = get_option_cache()
+        # Strategy that produced the last extract_options_universal() result
+        self.last_strategy = None
         
     def run(self):
         """Main method to extract dropdown elements and their options."""
@@ -102,6 +111,36 @@ class DropdownExtractor:
             print("No dropdown elements found on the page.")
             return []
     
+    def run_with_mapping(self, page, mapping):
+        """Extract options for the dropdown questions of an existing question-element mapping.
+        
+        Reuses the locators the mapping already holds instead of querying AgentQL for the
+        dropdown trigger buttons again.
+        
+        Args:
+            page: The playwright page object
+            mapping: Dictionary mapping QuestionElement to list of WebElement objects
+            
+        Returns:
+            Dictionary mapping each dropdown QuestionElement with a located element to its option texts
+        """
+        print("\n=== Processing Mapped Dropdown Elements ===")
+        
+        options_by_question = {}
+        dropdown_questions = [
+            (question_element, elements) for question_element, elements in mapping.items()
+            if question_element.question_type == 'dropdown_question'
+        ]
+        for i, (question_element, elements) in enumerate(dropdown_questions, 1):
+            locator = next((element.locator for element in elements if element.locator is not None), None)
+            if locator is None:
+                print(f"Skipping dropdown question '{question_element.question}' - no mapped elements")
+                continue
+            _, options_by_question[question_element] = self.process_dropdown(locator, page, i)
+        
+        print(json.dumps({qe.question: options for qe, options in options_by_question.items()}, indent=2))
+        return options_by_question
+    
     def extract_dropdown_buttons(self, page):
         """Extract dropdown elements using the dropdown prompt."""
         try:
@@ -181,91 +220,9 @@ class DropdownExtractor:
                 print(f"\nFound {len(dropdown_buttons)} dropdown element(s)")
                 
                 for i, dropdown in enumerate(dropdown_buttons, 1):
-                    print(f"\n--- Dropdown {i} ---")
-                    
-                    # Get dropdown information
-                    dropdown_info_dict = {
-                        'index': i,
-                        'element_info': str(dropdown),
-                        'options': []
-                    }
-                    
-                    try:
-                        # Get the tag name
-                        tag_name = dropdown.get_attribute('tagName')
-                        print(f"Tag: {tag_name}")
-                        dropdown_info_dict['tag_name'] = tag_name
-                        
-                        # Get the name attribute if available
-                        name_attr = dropdown.get_attribute('name')
-                        if name_attr:
-                            print(f"Name: {name_attr}")
-                            dropdown_info_dict['name'] = name_attr
-                        
-                        # Get the id attribute if available
-                        id_attr = dropdown.get_attribute('id')
-                        if id_attr:
-                            print(f"ID: {id_attr}")
-                            dropdown_info_dict['id'] = id_attr
-                        
-                        # Get class attribute to identify component type
-                        class_attr = dropdown.get_attribute('class')
-                        if class_attr:
-                            print(f"Class: {class_attr}")
-                            dropdown_info_dict['class'] = class_attr
-                        
-                        # Scroll dropdown into view before extraction with aggressive scrolling
-                        try:
-                            # First try standard scroll into view
-                            dropdown.scroll_into_view_if_needed()
-                            page.wait_for_timeout(300)
-                            
-                            # Get element position and scroll more aggressively if needed
-                            bounding_box = dropdown.bounding_box()
-                            if bounding_box:
-                                # Calculate scroll position to center the element
-                                scroll_y = bounding_box['y'] + bounding_box['height']/2 - 400  # Approximate viewport center
-                                # Scroll to center the element in viewport
-                                page.evaluate(f"window.scrollTo({{ top: {scroll_y}, behavior: 'smooth' }});")
-                                page.wait_for_timeout(500)  # Wait for smooth scroll to complete
-                            
-                            print("Scrolled dropdown into view with aggressive centering")
-                        except Exception as e:
-                            print(f"Warning: Could not scroll dropdown into view: {e}")
-                        
-                        # Ensure any previous dropdowns are closed
-                        try:
-                            page.locator("body").click()
-                            page.wait_for_timeout(300)
-                        except:
-                            pass
-                        
-                        # Use universal extraction method
-                        extracted_options = self.extract_options_universal(dropdown, page)
-                        dropdown_info_dict['options'] = extracted_options
-                        
-                        print(f"Total options extracted: {len(extracted_options)}")
-                        
-                        # Check if it's a multi-select
-                        multiple_attr = dropdown.get_attribute('multiple')
-                        if multiple_attr is not None:
-                            print(f"Multiple selection: {multiple_attr}")
-                            dropdown_info_dict['multiple'] = True
-                        else:
-                            dropdown_info_dict['multiple'] = False
-                        
-                    except Exception as e:
-                        print(f"Error processing dropdown {i}: {e}")
-                        dropdown_info_dict['error'] = str(e)
-                    
+                    dropdown_info_dict, options_text = self.process_dropdown(dropdown, page, i)
                     dropdown_info.append(dropdown_info_dict)
-                    
-                    # Create simplified output with only options
-                    options_text = [opt['text'] for opt in extracted_options if opt['text'].strip()]
                     simplified_output.append(options_text)
-                    
-                    # Add a small delay between processing dropdowns
-                    time.sleep(0.5)
                 
                 # Print only the simplified JSON output
                 print(json.dumps(simplified_output, indent=2))
@@ -281,21 +238,124 @@ class DropdownExtractor:
             print(f"Error processing dropdown elements: {e}")
             return []
     
-    def limit_options(self, options):
-        """If options > 15, set the 15th option to '...' and exclude the rest."""
-        if len(options) <= 15:
-            return options
-        limited_options = options[:14]
-        limited_options.append({
-            'index': 15,
-            'value': '...',
-            'text': '...'
-        })
-        return limited_options
+    def process_dropdown(self, dropdown, page, i):
+        """
+        Extract the options of a single dropdown element.
+        
+        Args:
+            dropdown: Locator of the dropdown element
+            page: The playwright page object
+            i: 1-based position of the dropdown, for logging
+            
+        Returns:
+            Tuple of (dropdown info dict, list of non-empty option texts)
+        """
+        print(f"\n--- Dropdown {i} ---")
+        
+        # Get dropdown information
+        dropdown_info_dict = {
+            'index': i,
+            'element_info': str(dropdown),
+            'options': []
+        }
+        cached_options = None
+        extracted_options = []
+        
+        try:
+            # Get the tag name
+            tag_name = dropdown.get_attribute('tagName')
+            print(f"Tag: {tag_name}")
+            dropdown_info_dict['tag_name'] = tag_name
+            
+            # Get the name attribute if available
+            name_attr = dropdown.get_attribute('name')
+            if name_attr:
+                print(f"Name: {name_attr}")
+                dropdown_info_dict['name'] = name_attr
+            
+            # Get the id attribute if available
+            id_attr = dropdown.get_attribute('id')
+            if id_attr:
+                print(f"ID: {id_attr}")
+                dropdown_info_dict['id'] = id_attr
+            
+            # Get class attribute to identify component type
+            class_attr = dropdown.get_attribute('class')
+            if class_attr:
+                print(f"Class: {class_attr}")
+                dropdown_info_dict['class'] = class_attr
+            
+            # Known ATS fields whose probe still matches skip interactive extraction
+            cached_options = self.option_cache.lookup(dropdown, page)
+            if cached_options is not None:
+                extracted_options = cached_options
+            else:
+                # Scroll dropdown into view before extraction with aggressive scrolling
+                try:
+                    # First try standard scroll into view
+                    dropdown.scroll_into_view_if_needed()
+                    page.wait_for_timeout(300)
+                
+                    # Get element position and scroll more aggressively if needed
+                    bounding_box = dropdown.bounding_box()
+                    if bounding_box:
+                        # Calculate scroll position to center the element
+                        scroll_y = bounding_box['y'] + bounding_box['height']/2 - 400  # Approximate viewport center
+                        # Scroll to center the element in viewport
+                        page.evaluate(f"window.scrollTo({{ top: {scroll_y}, behavior: 'smooth' }});")
+                        page.wait_for_timeout(500)  # Wait for smooth scroll to complete
+                
+                    print("Scrolled dropdown into view with aggressive centering")
+                except Exception as e:
+                    print(f"Warning: Could not scroll dropdown into view: {e}")
+            
+                # Ensure any previous dropdowns are closed
+                try:
+                    page.locator("body").click()
+                    page.wait_for_timeout(300)
+                except:
+                    pass
+            
+                # Use universal extraction method
+                extracted_options = self.extract_options_universal(dropdown, page)
+                # Global and brute-force fallbacks may have read another dropdown's options
+                if self.last_strategy in CACHEABLE_STRATEGIES:
+                    self.option_cache.store(dropdown, page, extracted_options)
+            dropdown_info_dict['options'] = extracted_options
+            
+            print(f"Total options extracted: {len(extracted_options)}")
+            
+            # Check if it's a multi-select
+            multiple_attr = dropdown.get_attribute('multiple')
+            if multiple_attr is not None:
+                print(f"Multiple selection: {multiple_attr}")
+                dropdown_info_dict['multiple'] = True
+            else:
+                dropdown_info_dict['multiple'] = False
+            
+        except Exception as e:
+            print(f"Error processing dropdown {i}: {e}")
+            dropdown_info_dict['error'] = str(e)
+        
+        # Create simplified output with only options
+        options_text = [opt['text'] for opt in extracted_options if opt['text'].strip()]
+        
+        # Add a small delay between interactively processed dropdowns
+        if cached_options is None:
+            time.sleep(0.5)
+        
+        return dropdown_info_dict, options_text
     
     def extract_options_universal(self, dropdown, page):
-        """Universal method to extract options from any dropdown format."""
+        """
+        Universal method to extract options from any dropdown format.
+        
+        Returns the complete option list; prompts get a relevance-filtered view
+        (see option_matcher.relevant_options) while filling matches against all options.
+        The strategy that produced it is left in self.last_strategy (None if all failed).
+        """
         extracted_options = []
+        self.last_strategy = None
         
         # Strategy 1: Standard HTML select options
         try:
@@ -313,7 +373,8 @@ class DropdownExtractor:
                         })
                     except Exception as e:
                         print(f"Error extracting standard option {i}: {e}")
-                return self.limit_options(extracted_options)
+                self.last_strategy = "select"
+                return extracted_options
         except Exception as e:
             print(f"Standard HTML option extraction failed: {e}")
         
@@ -372,7 +433,8 @@ class DropdownExtractor:
                                 })
                         
                         if extracted_options:
-                            return self.limit_options(extracted_options)
+                            self.last_strategy = "scoped"
+                            return extracted_options
                 except Exception as e:
                     print(f"Scoped pre-existing option extraction failed for {selector}: {e}")
                     continue
@@ -401,27 +463,44 @@ class DropdownExtractor:
                 dropdown
             ]
             
-            clicked = False
-            for target in click_targets:
+            # Record option API responses triggered by opening the menu
+            capture = self.harvester.start_capture(page)
+            try:
+                clicked = False
+                for target in click_targets:
+                    try:
+                        if target.count() > 0 and target.is_visible():
+                            # Scroll element into view before clicking
+                            target.scroll_into_view_if_needed()
+                            page.wait_for_timeout(300)  # Brief pause after scrolling
+                            target.click(timeout=3000)
+                            clicked = True
+                            print(f"Successfully clicked dropdown trigger")
+                            break
+                    except Exception as e:
+                        print(f"Click attempt failed: {e}")
+                        continue
+                
+                if not clicked:
+                    print("Could not click any dropdown trigger")
+                    return extracted_options
+                
+                # Step 2: Wait for menu to appear
+                page.wait_for_timeout(800)  # Give more time for menu to render
+                
+                # Scroll virtualized menus and read async-loaded option lists within a time budget
+                harvested_options = self.harvester.harvest(dropdown, page, capture)
+            finally:
+                # Never leave the response listener attached, whatever happened above
+                capture.stop()
+            if harvested_options:
                 try:
-                    if target.count() > 0 and target.is_visible():
-                        # Scroll element into view before clicking
-                        target.scroll_into_view_if_needed()
-                        page.wait_for_timeout(300)  # Brief pause after scrolling
-                        target.click(timeout=3000)
-                        clicked = True
-                        print(f"Successfully clicked dropdown trigger")
-                        break
-                except Exception as e:
-                    print(f"Click attempt failed: {e}")
-                    continue
-            
-            if not clicked:
-                print("Could not click any dropdown trigger")
-                return extracted_options
-            
-            # Step 2: Wait for menu to appear
-            page.wait_for_timeout(800)  # Give more time for menu to render
+                    page.keyboard.press("Escape")
+                    page.wait_for_timeout(200)
+                except:
+                    pass
+                self.last_strategy = "harvest"
+                return harvested_options
             
             # Step 3: Look for menu and options - SCOPED TO SPECIFIC DROPDOWN
             menu_and_option_combinations = [
@@ -510,7 +589,8 @@ class DropdownExtractor:
                             pass
                         
                         if extracted_options:
-                            return self.limit_options(extracted_options)
+                            self.last_strategy = "menu"
+                            return extracted_options
                             
                 except Exception as e:
                     print(f"Scoped option extraction failed for {menu_selector}/{option_selector}: {e}")
@@ -563,7 +643,8 @@ class DropdownExtractor:
                             pass
                         
                         if extracted_options:
-                            return self.limit_options(extracted_options)
+                            self.last_strategy = "global"
+                            return extracted_options
                             
                 except Exception as e:
                     print(f"Global fallback extraction failed for {option_selector}: {e}")
@@ -620,14 +701,15 @@ class DropdownExtractor:
                         
                         if extracted_options:
                             print(f"Brute force found {len(extracted_options)} options with {selector}")
-                            return self.limit_options(extracted_options)
+                            self.last_strategy = "brute_force"
+                            return extracted_options
                 except:
                     continue
         except Exception as e:
             print(f"Brute force strategy failed: {e}")
         
         print("All extraction strategies failed")
-        return self.limit_options(extracted_options)
+        return extracted_options
     
     def save_dropdown_info(self, dropdown_info: List[Dict[str, Any]]):
         """Save dropdown information to a JSON file."""
@@ -1,12 +1,12 @@
-import json
-import os
-from typing import Any, Dict, Optional
+from typing import Iterable, Iterator, Optional
 
-from dotenv import load_dotenv
-from question_agent_prompt import build_system_prompt
 from creative_agent_prompt import build_creative_system_prompt
 from models import QuestionResponse
-from google import genai
+from narrative_router import answer_routed, classify_question
+from structured_output import StructuredOutputError, generate_structured, json_config
+from prompt_cache import get_prompt_cache
+from clients import get_clients
+from profile_artifact import ProfileArtifact, load_profile
 from google.genai import types
 
 
@@ -24,58 +24,119 @@ class DualModelApplicationQuestionAgent:
         user_info_path: str = "user_info.json",
         main_model: str = "gemini-2.5-pro",  # Gemini model for main responses
         creative_model: str = "gemini-2.5-flash-lite",  # Gemini model for creative responses
+        client=None,
+        profile: Optional[ProfileArtifact] = None,
     ) -> None:
-        load_dotenv()
+        """
+        Args:
+            user_info_path: Profile file, used when no profile is given
+            main_model: Gemini model for main responses
+            creative_model: Gemini model for creative responses
+            client: Gemini client to use (defaults to the shared client from the registry)
+            profile: Compiled applicant profile (defaults to the compiled user_info_path)
+        """
         self.user_info_path = user_info_path
         self.main_model = main_model
         self.creative_model = creative_model
 
-        # Initialize Gemini client for both main and creative responses
-        self.gemini_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        # Gemini client for both main and creative responses, shared across agents
+        self.gemini_client = client or get_clients().gemini()
         
-        self.user_info = self._load_user_info(user_info_path)
-        self.system_prompt = self._build_system_prompt(self.user_info)
-
-    def _load_user_info(self, path: str) -> Dict[str, Any]:
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"user_info.json not found at: {path}")
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    def _build_system_prompt(self, user_info: Dict[str, Any]) -> str:
-        """Use the imported build_system_prompt function."""
-        return build_system_prompt(user_info)
-    
-    def _generate_creative_response(self, question: str, extra_context: Optional[str] = None) -> str:
-        """Generate a creative response using gemini-2.5-flash-lite with higher temperature."""
+        # Parsed profile and rendered system prompt are compiled once per job, not per agent
+        self.profile = profile or load_profile(user_info_path)
+        self.user_info = self.profile.profile
+        self.system_prompt = self.profile.system_prompt
+        
+        # The profile-bearing system prompt is static per user, so it is cached provider-side
+        self.prompt_cache = get_prompt_cache(self.gemini_client)
+
+    def _creative_request(self, question: str, extra_context: Optional[str] = None):
+        """Build the user message and config for a creative-model call."""
         creative_prompt = build_creative_system_prompt(question, self.user_info)
         
         user_msg = (
             "Question: " + question.strip() + 
             (f"\nContext: {extra_context}" if extra_context else "")
         )
+        config = types.GenerateContentConfig(
+            system_instruction=creative_prompt,
+            temperature=0.6,
+            max_output_tokens=2048,
+        )
+        return user_msg, config
+
+    def _generate_creative_response(self, question: str, extra_context: Optional[str] = None) -> str:
+        """Generate a creative response using gemini-2.5-flash-lite with higher temperature."""
+        user_msg, config = self._creative_request(question, extra_context)
         
         try:
             response = self.gemini_client.models.generate_content(
                 model=self.creative_model,
                 contents=user_msg,
-                config=types.GenerateContentConfig(
-                    system_instruction=creative_prompt,
-                    temperature=0.6,
-                    max_output_tokens=2048,
-                ),
+                config=config,
             )
             
             if response.text is None:
-                return "Unable to generate creative response"
+                print("Creative model returned empty response")
+                return ""
             
             return response.text.strip()
             
         except Exception as e:
-            return f"Error generating creative response: {str(e)}"
+            # An empty answer leaves the field untouched instead of typing the error into it
+            print(f"Error generating creative response: {e}")
+            return ""
+
+    def stream_creative_response(self, question: str, extra_context: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream a creative response chunk by chunk, for filling long answers while they generate.
+
+        Falls back to a single non-streaming call if the stream fails before yielding any text.
 
-    def answer_question(self, question: str, extra_context: Optional[str] = None) -> QuestionResponse:
-        """Ask the LLM to answer a form question using the user profile with structured output."""
+        Yields:
+            Text chunks of the answer
+        """
+        user_msg, config = self._creative_request(question, extra_context)
+        
+        yielded = False
+        try:
+            for chunk in self.gemini_client.models.generate_content_stream(
+                model=self.creative_model,
+                contents=user_msg,
+                config=config,
+            ):
+                if chunk.text:
+                    yielded = True
+                    yield chunk.text
+            if yielded:
+                return
+        except Exception as e:
+            if yielded:
+                raise
+            print(f"Creative stream failed, retrying without streaming: {e}")
+        yield self._generate_creative_response(question, extra_context)
+
+    def answer_question(
+        self,
+        question: str,
+        extra_context: Optional[str] = None,
+        question_type: Optional[str] = None,
+        multiline: bool = False,
+        element_names: Iterable[str] = (),
+    ) -> QuestionResponse:
+        """
+        Ask the LLM to answer a form question using the user profile with structured output.
+
+        Narrative questions are routed locally (see narrative_router): clear ones go straight
+        to the creative model, likely ones start the creative call alongside the main call.
+
+        Args:
+            question: The question text
+            extra_context: Question type, elements and options shown to the model
+            question_type: The QuestionElement type, used for routing
+            multiline: Whether the answer field is a textarea
+            element_names: Names of the mapped web elements
+        """
         if not question or not question.strip():
             return QuestionResponse(
                 response="",
@@ -91,56 +152,39 @@ class DualModelApplicationQuestionAgent:
                 reasoning="Hard-coded response rule applied"
             )
         
+        route = classify_question(question, question_type, multiline, element_names)
+        return answer_routed(
+            route,
+            lambda: self._answer_with_main_model(question, extra_context),
+            lambda: self._generate_creative_response(question, extra_context),
+        )
+
+    def _answer_with_main_model(self, question: str, extra_context: Optional[str] = None) -> QuestionResponse:
+        """Ask the main model for a structured answer; creative_mode says whether a creative answer is needed."""
         user_msg = (
             "Question: " + question.strip() + 
             (f"\nContext: {extra_context}" if extra_context else "")
         )
         
         try:
-            # Use Gemini API with structured JSON output
-            response = self.gemini_client.models.generate_content(
-                model=self.main_model,
-                contents=user_msg,
-                config=types.GenerateContentConfig(
-                    system_instruction=self.system_prompt,
+            # Schema-constrained JSON output; only this question is retried if it does not parse
+            return generate_structured(
+                lambda: self.prompt_cache.generate_content(
+                    self.main_model,
+                    self.system_prompt,
+                    user_msg,
                     temperature=0.1,
                     max_output_tokens=2048,
-                    response_mime_type='application/json',
-                    response_schema=QuestionResponse,
+                    **json_config(QuestionResponse),
                 ),
+                QuestionResponse,
+            )
+        except StructuredOutputError as e:
+            return QuestionResponse(
+                response="",
+                creative_mode=False,
+                reasoning=str(e)
             )
-            
-            # Handle case where response content might be None
-            if response.text is None:
-                return QuestionResponse(
-                    response="",
-                    creative_mode=False,
-                    reasoning="LLM returned empty response"
-                )
-            
-            # Parse the structured response
-            try:
-                response_text = response.text.strip()
-                response_dict = json.loads(response_text)
-                initial_response = QuestionResponse(**response_dict)
-                
-                # If creative_mode is true, generate creative response
-                if initial_response.creative_mode:
-                    creative_text = self._generate_creative_response(question, extra_context)
-                    return QuestionResponse(
-                        response=creative_text,
-                        creative_mode=True,
-                        reasoning=f"Creative response generated: {initial_response.reasoning}"
-                    )
-                
-                return initial_response
-            except (json.JSONDecodeError, ValueError, KeyError) as e:
-                return QuestionResponse(
-                    response="Error: Unable to parse response",
-                    creative_mode=False,
-                    reasoning=f"LLM returned non-JSON response: {str(e)}"
-                )
-                
         except Exception as e:
             return QuestionResponse(
                 response="",
@@ -96,15 +96,17 @@ class QuestionElement:
 class WebElement:
     """Class to represent a web element with its name and locator."""
     
-    def __init__(self, name: str, locator: Optional[Any] = None):
+    def __init__(self, name: str, locator: Optional[Any] = None, selector: Optional[str] = None):
         """Initialize a WebElement with a name and optional locator.
         
         Args:
             name: The string representation or name of the element
             locator: Optional Playwright Locator object
+            selector: Optional CSS selector resolving to the same element, used for batched page evaluations
         """
         self.name = name
         self.locator = locator
+        self.selector = selector
     
     def __str__(self) -> str:
         """Return the string representation of the element."""
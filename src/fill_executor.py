@@ -0,0 +1,109 @@
+"""
+Batched form-fill executor for plain text inputs and textareas.
+
+`locator.fill` costs a CDP round trip plus an actionability wait per field. `BatchFillExecutor`
+collects all text answers and writes them in a single `page.evaluate` using the native value
+setter and input/change events (so React-controlled inputs pick up the value), then reads
+every value back in one more evaluation and falls back to `locator.fill` only for fields
+that did not take the value.
+"""
+
+from typing import Dict, List, Tuple
+
+from elements import WebElement
+
+FILL_SCRIPT = """
+(items) => items.map(({ selector, value }) => {
+    const el = document.querySelector(selector);
+    if (!el || !(el instanceof HTMLInputElement || el instanceof HTMLTextAreaElement) || el.disabled || el.readOnly) {
+        return false;
+    }
+    // Use the prototype setter so React's value tracker sees the change
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    el.focus();
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', { bubbles: true }));
+    el.dispatchEvent(new Event('change', { bubbles: true }));
+    el.blur();
+    return true;
+})
+"""
+
+READ_BACK_SCRIPT = """
+(selectors) => selectors.map((selector) => {
+    const el = document.querySelector(selector);
+    return el && 'value' in el ? el.value : null;
+})
+"""
+
+
+class BatchFillExecutor:
+    """Collects text answers and applies them in one page evaluation per page."""
+
+    def __init__(self):
+        self.pending: List[Tuple[WebElement, str]] = []
+
+    def add(self, web_element: WebElement, value: str) -> bool:
+        """
+        Queue a text answer for batched filling.
+
+        Args:
+            web_element: The text input or textarea element
+            value: The text to write
+
+        Returns:
+            True if queued, False if the element cannot be batched (no selector or locator)
+        """
+        if not web_element.selector or web_element.locator is None:
+            return False
+        self.pending.append((web_element, value))
+        return True
+
+    def flush(self) -> int:
+        """
+        Write all queued answers, verify them and fall back to locator.fill on mismatch.
+
+        Returns:
+            Number of fields that hold their answer afterwards
+        """
+        if not self.pending:
+            return 0
+
+        # Group by page so each page gets exactly one write and one read-back evaluation
+        by_page: Dict[int, List[Tuple[WebElement, str]]] = {}
+        pages = {}
+        for web_element, value in self.pending:
+            page = web_element.locator.page
+            by_page.setdefault(id(page), []).append((web_element, value))
+            pages[id(page)] = page
+        self.pending = []
+
+        filled = 0
+        for page_id, items in by_page.items():
+            page = pages[page_id]
+            selectors = [web_element.selector for web_element, _ in items]
+            try:
+                page.evaluate(FILL_SCRIPT, [{"selector": s, "value": v} for s, (_, v) in zip(selectors, items)])
+                values = page.evaluate(READ_BACK_SCRIPT, selectors)
+            except Exception as e:
+                print(f"Batched fill failed, falling back to per-field fill: {e}")
+                values = [None] * len(items)
+
+            # Textareas normalize line endings, so compare with \n only
+            mismatches = [
+                (web_element, value) for (web_element, value), actual in zip(items, values)
+                if actual is None or actual != value.replace("\r\n", "\n")
+            ]
+            filled += len(items) - len(mismatches)
+            print(f"✓ Batch-filled {len(items) - len(mismatches)}/{len(items)} text fields in one evaluation")
+
+            for web_element, value in mismatches:
+                try:
+                    web_element.locator.fill(value)
+                    filled += 1
+                    print(f"✓ Filled text input with fallback: {value}")
+                except Exception as e:
+                    print(f"Error filling '{web_element.name}': {e}")
+
+        return filled
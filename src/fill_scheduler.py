@@ -0,0 +1,126 @@
+"""
+Dependency-ordered filling around the resume upload.
+
+Uploading a resume makes many ATS pages autofill name, email, phone and links. Filling in
+mapping order either let that autofill overwrite answers already typed (upload last) or
+waited a blind 10 s (upload first). The action agent now:
+
+1. starts generating every answer concurrently (LLM calls only, no page access),
+2. uploads the resume first and `AutofillWatcher` waits only as long as fields keep
+   changing, instead of a fixed sleep,
+3. skips fields that autofill already filled with the answer it would have typed.
+"""
+
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from elements import QuestionElement, WebElement
+from fill_executor import READ_BACK_SCRIPT
+
+# Answers generated in parallel while the page thread uploads and fills
+ANSWER_CONCURRENCY = 6
+
+# Poll interval while watching for autofill
+POLL_INTERVAL_MS = 250
+
+# Give up on autofill if no field changed this long after the upload
+QUIET_TIMEOUT_S = 3.0
+
+# Autofill is done once no field changed for this long
+SETTLE_S = 1.0
+
+# Upper bound on the whole wait (the old fixed wait)
+MAX_WAIT_S = 10.0
+
+
+def schedule(
+    mapping: Dict[QuestionElement, List[WebElement]],
+) -> Tuple[List[Tuple[QuestionElement, List[WebElement]]], List[Tuple[QuestionElement, List[WebElement]]]]:
+    """
+    Split the mapping into uploads, which must happen first, and everything else.
+
+    Returns:
+        Tuple of (resume questions, other questions), each in mapping order
+    """
+    uploads = [(qe, wes) for qe, wes in mapping.items() if qe.question_type == "resume_question"]
+    others = [(qe, wes) for qe, wes in mapping.items() if qe.question_type != "resume_question"]
+    return uploads, others
+
+
+def normalize_value(value: str) -> str:
+    """Normalize a field value for comparing autofilled and generated answers."""
+    value = value.lower().strip()
+    # Phone numbers and URLs differ in punctuation between autofill and the profile
+    if re.fullmatch(r"[\d\s()+.\-]+", value):
+        return re.sub(r"\D", "", value)
+    value = re.sub(r"^https?://(www\.)?", "", value).rstrip("/")
+    return " ".join(value.split())
+
+
+def autofill_matches(autofilled: Optional[str], answer: str) -> bool:
+    """Whether an autofilled value already is the answer we would type."""
+    if not autofilled or not answer.strip():
+        return False
+    return normalize_value(autofilled) == normalize_value(answer)
+
+
+class AutofillWatcher:
+    """Snapshots text field values before an upload and waits for autofill to settle."""
+
+    def __init__(self, web_elements: List[WebElement]):
+        """
+        Args:
+            web_elements: Text fields that autofill may populate (only those with a selector are watched)
+        """
+        self.watched = [we for we in web_elements if we.selector and we.locator is not None]
+        self.page = self.watched[0].locator.page if self.watched else None
+        self.baseline: Dict[str, Optional[str]] = {}
+
+    def _read(self) -> Dict[str, Optional[str]]:
+        selectors = [we.selector for we in self.watched]
+        try:
+            values = self.page.evaluate(READ_BACK_SCRIPT, selectors)
+        except Exception as e:
+            print(f"Could not read field values: {e}")
+            return dict(self.baseline)
+        return dict(zip(selectors, values))
+
+    def snapshot(self) -> None:
+        """Record the field values before the upload."""
+        if self.page is not None:
+            self.baseline = self._read()
+
+    def wait_for_autofill(self) -> Dict[str, str]:
+        """
+        Wait until autofill has settled, or until it is clear none is coming.
+
+        Returns:
+            Selector -> value for every field autofill changed
+        """
+        if self.page is None:
+            return {}
+
+        start = time.time()
+        current = dict(self.baseline)
+        last_change: Optional[float] = None
+        while True:
+            self.page.wait_for_timeout(POLL_INTERVAL_MS)
+            now = time.time()
+            values = self._read()
+            if values != current:
+                current = values
+                last_change = now
+            if last_change is None and now - start >= QUIET_TIMEOUT_S:
+                break
+            if last_change is not None and now - last_change >= SETTLE_S:
+                break
+            if now - start >= MAX_WAIT_S:
+                break
+
+        changed = {
+            selector: value for selector, value in current.items()
+            if value and value != self.baseline.get(selector)
+        }
+        print(f"⏱️ Autofill settled after {time.time() - start:.1f}s, {len(changed)} field(s) populated")
+        return changed
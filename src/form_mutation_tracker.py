@@ -0,0 +1,175 @@
+"""
+DOM mutation tracking for multi-step forms.
+
+`FormMutationTracker` snapshots the fields inside the form container (one `page.evaluate`)
+and diffs consecutive snapshots, so a re-extraction only has to re-map and re-answer the
+fields that were added or changed since the previous extraction.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from dom_scripts import CLEAN_JS, CONTAINER_BY_ID_JS, LABEL_JS, PATH_JS
+
+FIELD_SELECTOR = (
+    'input:not([type="hidden"]), textarea, select, button, '
+    '[role="combobox"], [role="listbox"], [role="radio"], [role="checkbox"], [contenteditable="true"]'
+)
+
+# keyOf(el): field key that survives blocks being inserted elsewhere in the form - id, else
+# name (plus value for radios/checkboxes), else label, else structural path as a last resort.
+# Repeated keys get an occurrence suffix ("#2"), so keyOf must be called once per field in
+# document order. Needs CLEAN_JS, LABEL_JS, PATH_JS and `container`.
+FIELD_KEY_JS = """
+    const baseKeyOf = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (el.id) return `#${el.id}`;
+        if (el.name) return (el.type === 'radio' || el.type === 'checkbox') ? `${tag}[name=${el.name}][value=${el.value}]` : `${tag}[name=${el.name}]`;
+        const label = directLabelOf(el) || clean(el.getAttribute('placeholder'));
+        if (label) return `${tag}[label=${label}]`;
+        return pathParts(el, container).map((part) => `${part.tag}[${part.index}]`).join('/');
+    };
+    const keyCounts = {};
+    const keyOf = (el) => {
+        const key = baseKeyOf(el);
+        keyCounts[key] = (keyCounts[key] || 0) + 1;
+        return keyCounts[key] > 1 ? `${key}#${keyCounts[key]}` : key;
+    };
+"""
+
+SNAPSHOT_SCRIPT = """
+([containerId, fieldSelector]) => {
+""" + CLEAN_JS + LABEL_JS + PATH_JS + CONTAINER_BY_ID_JS + """
+    const container = containerById(containerId);
+""" + FIELD_KEY_JS + """
+    const labelOf = (el) => directLabelOf(el) || clean(el.getAttribute('placeholder') || el.innerText).slice(0, 200);
+
+    const fields = {};
+    container.querySelectorAll(fieldSelector).forEach((el) => {
+        const options = el.tagName === 'SELECT' ? el.options.length : 0;
+        const key = keyOf(el);
+        fields[key] = {
+            signature: [el.tagName, el.type || '', el.getAttribute('role') || '', labelOf(el), options].join('|'),
+            label: labelOf(el),
+        };
+    });
+    return fields;
+}
+"""
+
+IDS_FOR_FIELDS_SCRIPT = """
+([containerId, fieldSelector, keys, ancestorLevels]) => {
+""" + CLEAN_JS + LABEL_JS + PATH_JS + CONTAINER_BY_ID_JS + """
+    const container = containerById(containerId);
+""" + FIELD_KEY_JS + """
+    const wanted = new Set(keys);
+
+    const ids = new Set();
+    container.querySelectorAll(fieldSelector).forEach((el) => {
+        if (!wanted.has(keyOf(el))) return;
+
+        // The extracted element may be the field itself, a wrapper around it, or something inside it
+        let node = el;
+        for (let level = 0; node && node !== container && level <= ancestorLevels; level++, node = node.parentElement) {
+            const id = node.getAttribute('tf623_id');
+            if (id) ids.add(id);
+        }
+        el.querySelectorAll('[tf623_id]').forEach((child) => ids.add(child.getAttribute('tf623_id')));
+    });
+    return Array.from(ids);
+}
+"""
+
+
+@dataclass
+class FormDiff:
+    """Difference between two form snapshots, keyed by field key."""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    labels: Set[str] = field(default_factory=set)  # Labels of added or changed fields
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    @property
+    def dirty_keys(self) -> List[str]:
+        """Keys of the fields that need to be re-mapped and re-answered."""
+        return self.added + self.changed
+
+
+class FormMutationTracker:
+    """Snapshots the form container and reports which fields changed between extractions."""
+
+    def __init__(self, ancestor_levels: int = 4):
+        """
+        Args:
+            ancestor_levels: How many wrapper levels above a changed field still count as that field
+                             when matching extracted elements by tf623_id
+        """
+        self.ancestor_levels = ancestor_levels
+
+    def snapshot(self, page, container_tf623_id: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+        """
+        Take a snapshot of all fields inside the form container in one browser round trip.
+
+        Args:
+            page: The Playwright page
+            container_tf623_id: Optional tf623_id of the form container from the previous extraction
+
+        Returns:
+            Dictionary mapping field key to its signature and label (empty on failure)
+        """
+        try:
+            return page.evaluate(SNAPSHOT_SCRIPT, [container_tf623_id, FIELD_SELECTOR])
+        except Exception as e:
+            print(f"❌ Could not snapshot form container: {e}")
+            return {}
+
+    def diff(self, previous: Dict[str, Dict[str, str]], current: Dict[str, Dict[str, str]]) -> FormDiff:
+        """
+        Compare two snapshots.
+
+        Args:
+            previous: Snapshot from the previous extraction
+            current: Snapshot from the current extraction
+
+        Returns:
+            FormDiff with added, changed and removed field keys
+        """
+        form_diff = FormDiff()
+        for key, entry in current.items():
+            old_entry = previous.get(key)
+            if old_entry is None:
+                form_diff.added.append(key)
+            elif old_entry['signature'] != entry['signature']:
+                form_diff.changed.append(key)
+            else:
+                continue
+            if entry.get('label'):
+                form_diff.labels.add(entry['label'])
+
+        form_diff.removed = [key for key in previous if key not in current]
+        return form_diff
+
+    def tf623_ids_for_fields(self, page, keys: List[str], container_tf623_id: Optional[str] = None) -> Set[str]:
+        """
+        Resolve field keys to the tf623_ids stamped by the most recent AgentQL query.
+
+        Args:
+            page: The Playwright page
+            keys: Field keys from a FormDiff
+            container_tf623_id: Optional tf623_id of the form container
+
+        Returns:
+            Set of tf623_ids belonging to the fields (their wrappers and descendants included)
+        """
+        if not keys:
+            return set()
+        try:
+            ids = page.evaluate(IDS_FOR_FIELDS_SCRIPT, [container_tf623_id, FIELD_SELECTOR, keys, self.ancestor_levels])
+            return set(ids)
+        except Exception as e:
+            print(f"❌ Could not resolve changed fields to tf623_ids: {e}")
+            return set()
@@ -1,12 +1,11 @@
-import json
-import os
-from typing import Any, Dict, Optional
+from typing import Iterable, Optional
 
-from dotenv import load_dotenv
-from question_agent_prompt import build_system_prompt
 from creative_agent_prompt import build_creative_system_prompt
 from models import QuestionResponse
-from google import genai
+from narrative_router import answer_routed, classify_question
+from structured_output import StructuredOutputError, generate_structured, json_config
+from clients import get_clients
+from profile_artifact import ProfileArtifact, load_profile
 from google.genai import types
 
 
@@ -24,25 +23,25 @@ class ApplicationQuestionAgent:
         self,
         user_info_path: str = "user_info.json",
         model: str = "gemini-2.5-flash",
+        client=None,
+        profile: Optional[ProfileArtifact] = None,
     ) -> None:
-        load_dotenv()
+        """
+        Args:
+            user_info_path: Profile file, used when no profile is given
+            model: Gemini model for main responses
+            client: Gemini client to use (defaults to the shared client from the registry)
+            profile: Compiled applicant profile (defaults to the compiled user_info_path)
+        """
         self.user_info_path = user_info_path
         self.model = model
 
-        self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        self.user_info = self._load_user_info(user_info_path)
-        self.system_prompt = self._build_system_prompt(self.user_info)
+        # Shared Gemini client and a profile compiled once per job, as in the dual-model agent
+        self.client = client or get_clients().gemini()
+        self.profile = profile or load_profile(user_info_path)
+        self.user_info = self.profile.profile
+        self.system_prompt = self.profile.system_prompt
 
-    def _load_user_info(self, path: str) -> Dict[str, Any]:
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"user_info.json not found at: {path}")
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    def _build_system_prompt(self, user_info: Dict[str, Any]) -> str:
-        """Use the imported build_system_prompt function."""
-        return build_system_prompt(user_info)
-    
     def _generate_creative_response(self, question: str, extra_context: Optional[str] = None) -> str:
         """Generate a creative response using gemini-2.5-flash-lite with higher temperature."""
         creative_prompt = build_creative_system_prompt(question, self.user_info)
@@ -64,15 +63,37 @@ class ApplicationQuestionAgent:
             )
             
             if response.text is None:
-                return "Unable to generate creative response"
+                print("Creative model returned empty response")
+                return ""
             
             return response.text.strip()
             
         except Exception as e:
-            return f"Error generating creative response: {str(e)}"
+            # An empty answer leaves the field untouched instead of typing the error into it
+            print(f"Error generating creative response: {e}")
+            return ""
+
+    def answer_question(
+        self,
+        question: str,
+        extra_context: Optional[str] = None,
+        question_type: Optional[str] = None,
+        multiline: bool = False,
+        element_names: Iterable[str] = (),
+    ) -> QuestionResponse:
+        """
+        Ask the LLM to answer a form question using the user profile with structured output.
 
-    def answer_question(self, question: str, extra_context: Optional[str] = None) -> QuestionResponse:
-        """Ask the LLM to answer a form question using the user profile with structured output."""
+        Narrative questions are routed locally (see narrative_router): clear ones go straight
+        to the creative model, likely ones start the creative call alongside the main call.
+
+        Args:
+            question: The question text
+            extra_context: Question type, elements and options shown to the model
+            question_type: The QuestionElement type, used for routing
+            multiline: Whether the answer field is a textarea
+            element_names: Names of the mapped web elements
+        """
         if not question or not question.strip():
             return QuestionResponse(
                 response="",
@@ -80,67 +101,41 @@ class ApplicationQuestionAgent:
                 reasoning="Empty question provided"
             )
         
+        route = classify_question(question, question_type, multiline, element_names)
+        return answer_routed(
+            route,
+            lambda: self._answer_with_main_model(question, extra_context),
+            lambda: self._generate_creative_response(question, extra_context),
+        )
+
+    def _answer_with_main_model(self, question: str, extra_context: Optional[str] = None) -> QuestionResponse:
+        """Ask the main model for a structured answer; creative_mode says whether a creative answer is needed."""
         user_msg = (
             "Question: " + question.strip() + 
             (f"\nContext: {extra_context}" if extra_context else "")
         )
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=user_msg,
-                config=types.GenerateContentConfig(
-                    system_instruction=self.system_prompt,
-                    temperature=0.2,
-                    max_output_tokens=2048,
-                    response_schema=QuestionResponse,
+            # Schema-constrained JSON output; only this question is retried if it does not parse
+            return generate_structured(
+                lambda: self.client.models.generate_content(
+                    model=self.model,
+                    contents=user_msg,
+                    config=types.GenerateContentConfig(
+                        system_instruction=self.system_prompt,
+                        temperature=0.2,
+                        max_output_tokens=2048,
+                        **json_config(QuestionResponse),
+                    ),
                 ),
+                QuestionResponse,
+            )
+        except StructuredOutputError as e:
+            return QuestionResponse(
+                response="",
+                creative_mode=False,
+                reasoning=str(e)
             )
-            
-            # Handle case where response.text might be None
-            if response.text is None:
-                return QuestionResponse(
-                    response="",
-                    creative_mode=False,
-                    reasoning="LLM returned empty response"
-                )
-            
-            # Parse the structured response
-            try:
-                # Handle markdown code blocks if present
-                response_text = response.text.strip()
-                if response_text.startswith('```json') and response_text.endswith('```'):
-                    # Extract JSON from markdown code block
-                    json_start = response_text.find('{', response_text.find('```json'))
-                    json_end = response_text.rfind('}') + 1
-                    json_content = response_text[json_start:json_end]
-                elif response_text.startswith('```') and response_text.endswith('```'):
-                    # Handle generic code blocks
-                    lines = response_text.split('\n')
-                    json_content = '\n'.join(lines[1:-1])  # Remove first and last line
-                else:
-                    json_content = response_text
-                
-                response_dict = json.loads(json_content)
-                initial_response = QuestionResponse(**response_dict)
-                
-                # If creative_mode is true, generate creative response
-                if initial_response.creative_mode:
-                    creative_text = self._generate_creative_response(question, extra_context)
-                    return QuestionResponse(
-                        response=creative_text,
-                        creative_mode=True,
-                        reasoning=f"Creative response generated: {initial_response.reasoning}"
-                    )
-                
-                return initial_response
-            except (json.JSONDecodeError, ValueError, KeyError) as e:
-                return QuestionResponse(
-                    response="Error: Unable to parse response",
-                    creative_mode=False,
-                    reasoning=f"LLM returned non-JSON response: {str(e)}"
-                )
-                
         except Exception as e:
             return QuestionResponse(
                 response="",
@@ -1,11 +1,10 @@
-import os
 import json
 from typing import Any, Dict, List, Tuple
 
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+from clients import get_clients
+from prompt_cache import get_prompt_cache
 from models import ElementMatchResponse
+from structured_output import generate_structured, json_config
 from elements import QuestionElement, WebElement
 
 class QuestionMapperAgent:
@@ -19,29 +18,17 @@ class QuestionMapperAgent:
 
     def __init__(
         self,
+        client=None,
     ) -> None:
-        # Explicitly load environment variables
-        load_dotenv()
-        model = "gemini-2.5-flash"
-        self.model = model
-        
-        # Get Google API key
-        google_api_key = os.getenv("GEMINI_API_KEY")
-        print(f"DEBUG: GOOGLE_API_KEY is {'set' if google_api_key else 'not set'}")
-        if google_api_key:
-            print(f"DEBUG: API key length: {len(google_api_key)}, first 5 chars: {google_api_key[:5]}")
-        
-        if not google_api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable is not set.")
-        
-        try:
-            print(f"DEBUG: Initializing Google Gemini client with model={model}")
-            self.client = genai.Client(api_key=google_api_key)
-            print("DEBUG: Google Gemini client initialized successfully")
-        except Exception as e:
-            raise RuntimeError(f"Error initializing Google Gemini client: {e}")
+        """
+        Args:
+            client: Gemini client to use (defaults to the shared client from the registry)
+        """
+        self.model = "gemini-2.5-flash"
+        self.client = client or get_clients().gemini()
             
         self.system_prompt = self._build_system_prompt()
+        self.prompt_cache = get_prompt_cache(self.client)
 
     def _build_system_prompt(self) -> str:
         """
@@ -75,21 +62,17 @@ class QuestionMapperAgent:
         
         try:
             # Use Gemini's generate_content method
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=user_msg,
-                config=types.GenerateContentConfig(
+            parsed_response = generate_structured(
+                lambda: self.prompt_cache.generate_content(
+                    self.model,
+                    self.system_prompt,
+                    user_msg,
                     temperature=0.1,
-                    response_mime_type="application/json",
-                    response_schema=ElementMatchResponse,
-                    system_instruction=self.system_prompt,
-                )
+                    **json_config(ElementMatchResponse),
+                ),
+                ElementMatchResponse,
             )
             
-            # Get the parsed response
-            response_text = response.text
-            parsed_response = ElementMatchResponse.model_validate_json(response_text)
-            
             print(f"Parsed response: {parsed_response.element_for_question}, (Next Mapping: {parsed_response.next_mapping}, Reasoning: {parsed_response.reasoning})")
             return parsed_response.element_for_question, parsed_response.next_mapping
                 
@@ -1,10 +1,9 @@
-import os
 import json
 from typing import Any, Dict, List, Tuple
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from clients import get_clients
 from models import ElementMatchResponse
+from structured_output import generate_structured
 from elements import QuestionElement, WebElement
 
 class QuestionMapperAgent:
@@ -18,31 +17,14 @@ class QuestionMapperAgent:
 
     def __init__(
         self,
+        client=None,
     ) -> None:
-        # Explicitly load environment variables
-        load_dotenv()
-        model = "gpt-4.1-mini"
-        self.model = model
-        
-        # Get OpenAI API key
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        print(f"DEBUG: OPENAI_API_KEY is {'set' if openai_api_key else 'not set'}")
-        if openai_api_key:
-            print(f"DEBUG: API key length: {len(openai_api_key)}, first 5 chars: {openai_api_key[:5]}")
-        
-        if not openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is not set.")
-        
-        try:
-            print(f"DEBUG: Initializing OpenAI client with model={model}")
-            self.client = OpenAI(
-                api_key=openai_api_key,
-                timeout=60.0,  # timeout in seconds
-                max_retries=2,
-            )
-            print("DEBUG: OpenAI client initialized successfully")
-        except Exception as e:
-            raise RuntimeError(f"Error initializing OpenAI client: {e}")
+        """
+        Args:
+            client: OpenAI client to use (defaults to the shared client from the registry)
+        """
+        self.model = "gpt-4.1-mini"
+        self.client = client or get_clients().openai()
             
         self.system_prompt = self._build_system_prompt()
 
@@ -83,25 +65,24 @@ class QuestionMapperAgent:
                 {"role": "user", "content": user_msg}
             ]
             
-            # Use client.responses.parse with the ElementMatchResponse Pydantic model
-            # This automatically handles prompt caching
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_format={
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": "element_match_response",
-                        "schema": ElementMatchResponse.model_json_schema()
-                    }
-                },
-                temperature=0.1
+            # JSON-schema response format; only this element is retried if it does not parse
+            parsed_response = generate_structured(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {
+                            "name": "element_match_response",
+                            "schema": ElementMatchResponse.model_json_schema()
+                        }
+                    },
+                    temperature=0.1
+                ),
+                ElementMatchResponse,
+                text_of=lambda response: response.choices[0].message.content,
             )
             
-            # Get the parsed response
-            parsed_response = response.choices[0].message.content # Gets the json
-            parsed_response = ElementMatchResponse.model_validate_json(parsed_response) # Converts json to object
-            
             print(f"Parsed response: {parsed_response.element_for_question}, (Next Mapping: {parsed_response.next_mapping}, Reasoning: {parsed_response.reasoning})")
             return parsed_response.element_for_question, parsed_response.next_mapping
                 
@@ -0,0 +1,58 @@
+"""
+Small JSON files under .cache/ shared by the persistent caches.
+
+Files are replaced atomically (written to a temporary file, then renamed), so a crash or
+a concurrent reader never sees a half-written cache. Read and write errors are reported
+and otherwise ignored: a lost cache only costs the work it would have saved.
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+
+def load_json(path: Optional[str], description: str = "cache") -> Optional[Any]:
+    """
+    Read a JSON file.
+
+    Args:
+        path: The file (None for in-memory caches)
+        description: What the file holds, for warnings
+
+    Returns:
+        The parsed content, or None if there is no path, no file, or it could not be read
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not load {description} {path}: {e}")
+        return None
+
+
+def save_json_atomic(path: Optional[str], data: Any, description: str = "cache") -> bool:
+    """
+    Write data to a JSON file atomically, creating its directory if needed.
+
+    Args:
+        path: The file (None for in-memory caches, nothing is written)
+        data: JSON-serializable content
+        description: What the file holds, for warnings
+
+    Returns:
+        True if the file was written
+    """
+    if not path:
+        return False
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Warning: Could not save {description} {path}: {e}")
+        return False
@@ -0,0 +1,187 @@
+"""
+Local routing of narrative questions to the creative model.
+
+The answer agents ask the main model first and only call the creative model when it
+returns creative_mode=true, so every long-answer question pays two sequential LLM
+latencies. `classify_question` scores a question locally (phrasing, length, multiline
+field) and picks a route:
+
+- ROUTE_CREATIVE: clearly narrative, ask the creative model only
+- ROUTE_SPECULATIVE: narrative phrasing but a weaker overall score, start the creative
+  call alongside the main call and keep it only if the main model asks for creative mode
+- ROUTE_MAIN: the main model alone, as before
+
+`answer_routed` runs a route given the agent's main and creative calls.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from fill_scheduler import ANSWER_CONCURRENCY
+from models import QuestionResponse
+from singleton import LazySingleton
+
+ROUTE_CREATIVE = "creative"
+ROUTE_SPECULATIVE = "speculative"
+ROUTE_MAIN = "main"
+
+# Phrasings that ask for a written, personal answer
+NARRATIVE_PATTERNS = [
+    r"\bwhy (do|would) you (want|like|wish)\b",
+    r"\bwhy (are you|you're) (interested|applying|excited)\b",
+    r"\bwhy (this|our) (company|role|team|position)\b",
+    r"\btell (us|me) (a bit |more )?about\b",
+    r"\bdescribe (a|an|your|the|how|what|one)\b",
+    r"\bgive (us )?an example\b",
+    r"\bwhat (excites|interests|motivates|draws|attracts) you\b",
+    r"\bwhat makes you\b",
+    r"\bhow would you (approach|handle|describe)\b",
+    r"\b(share|explain) (a|an|your|how|why|what)\b",
+    r"\bcover letter\b",
+    r"\bin (\d+|a few|one or two) (words|sentences|paragraphs)\b",
+    r"\b(anything else|additional information) (you would like|you'd like|we should)\b",
+]
+
+# Phrasings that ask for a fact from the profile, even inside a long textarea label
+FACTUAL_PATTERNS = [
+    r"\b(first|last|full|legal|preferred) name\b",
+    r"\be-?mail\b",
+    r"\bphone\b",
+    r"\b(address|city|zip|postal|country|state|province)\b",
+    r"\b(linkedin|github|portfolio|website|url)\b",
+    r"\b(salary|compensation|pay expectations?)\b",
+    r"\byears of (professional )?experience\b",
+    r"\b(authori[sz]ed|sponsorship|visa|citizenship)\b",
+    r"\b(gender|race|ethnicity|veteran|disability|pronouns)\b",
+    r"\b(start date|notice period|available to start)\b",
+    r"\b(gpa|graduation|degree|school|university)\b",
+    r"\bhow did you hear\b",
+]
+
+_NARRATIVE = [re.compile(pattern) for pattern in NARRATIVE_PATTERNS]
+_FACTUAL = [re.compile(pattern) for pattern in FACTUAL_PATTERNS]
+
+# Score at or above which a question goes straight to the creative model
+CREATIVE_THRESHOLD = 3
+
+# Score at or above which the creative call is started speculatively (a narrative phrasing
+# match alone scores 2; a long textarea label without one never speculates)
+SPECULATIVE_THRESHOLD = 2
+
+# Labels longer than this read like prompts rather than field names
+LONG_QUESTION_CHARS = 120
+
+
+def has_narrative_phrasing(question: str) -> bool:
+    """Whether the question matches one of the NARRATIVE_PATTERNS."""
+    text = " ".join(question.lower().split())
+    return any(pattern.search(text) for pattern in _NARRATIVE)
+
+
+def narrative_score(question: str, multiline: bool = False, element_names: Iterable[str] = ()) -> int:
+    """
+    Score how strongly a question asks for a written, narrative answer.
+
+    Args:
+        question: The question text
+        multiline: Whether the answer field is a textarea
+        element_names: Names of the mapped web elements (agentql names often say "textarea")
+
+    Returns:
+        The score; negative when the question asks for a profile fact
+    """
+    text = " ".join(question.lower().split())
+    if any(pattern.search(text) for pattern in _FACTUAL):
+        return -1
+
+    score = 0
+    if has_narrative_phrasing(text):
+        score += 2
+    if multiline or any("textarea" in name.lower() for name in element_names):
+        score += 1
+    if len(text) > LONG_QUESTION_CHARS:
+        score += 1
+    if text.startswith(("why ", "how ", "what ")):
+        score += 1
+    return score
+
+
+def classify_question(
+    question: str,
+    question_type: Optional[str] = None,
+    multiline: bool = False,
+    element_names: Iterable[str] = (),
+) -> str:
+    """
+    Pick the answer route for a question.
+
+    Only free-text questions are routed to the creative model; dropdowns, radios and
+    uploads always go to the main model. The creative call is only started speculatively
+    when the question itself is phrased as a narrative prompt.
+
+    Args:
+        question: The question text
+        question_type: The QuestionElement type, if known
+        multiline: Whether the answer field is a textarea
+        element_names: Names of the mapped web elements
+
+    Returns:
+        ROUTE_CREATIVE, ROUTE_SPECULATIVE or ROUTE_MAIN
+    """
+    if not question or question_type not in (None, "input_text_question"):
+        return ROUTE_MAIN
+    score = narrative_score(question, multiline, element_names)
+    if score >= CREATIVE_THRESHOLD:
+        return ROUTE_CREATIVE
+    if score >= SPECULATIVE_THRESHOLD and has_narrative_phrasing(question):
+        return ROUTE_SPECULATIVE
+    return ROUTE_MAIN
+
+
+# Each concurrent answer thread may run one speculative creative call
+_executor = LazySingleton(lambda: ThreadPoolExecutor(max_workers=ANSWER_CONCURRENCY, thread_name_prefix="creative"))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    return _executor.get()
+
+
+def answer_routed(
+    route: str,
+    answer_main: Callable[[], QuestionResponse],
+    answer_creative: Callable[[], str],
+) -> QuestionResponse:
+    """
+    Answer a question along a route.
+
+    Args:
+        route: The route from classify_question
+        answer_main: Calls the main model; its creative_mode says whether a creative answer is needed
+        answer_creative: Calls the creative model and returns the answer text
+
+    Returns:
+        The QuestionResponse to fill
+    """
+    if route == ROUTE_CREATIVE:
+        print("🔄 Narrative question, answering with the creative model only")
+        return QuestionResponse(
+            response=answer_creative(),
+            creative_mode=True,
+            reasoning="Creative response generated: narrative question routed locally to the creative model"
+        )
+
+    creative_future = _get_executor().submit(answer_creative) if route == ROUTE_SPECULATIVE else None
+    initial_response = answer_main()
+    if not initial_response.creative_mode:
+        if creative_future is not None:
+            # Only skips the call if it is still queued; a running call completes and its answer is discarded
+            creative_future.cancel()
+        return initial_response
+
+    creative_text = creative_future.result() if creative_future is not None else answer_creative()
+    return QuestionResponse(
+        response=creative_text,
+        creative_mode=True,
+        reasoning=f"Creative response generated: {initial_response.reasoning}"
+    )
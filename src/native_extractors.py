@@ -0,0 +1,204 @@
+"""
+Native (in-page) form extraction for known ATS platforms.
+
+Greenhouse, Lever and Ashby render regular enough forms that a single `page.evaluate`
+can collect the labelled text inputs, selects/comboboxes, radio/checkbox groups and file
+inputs directly. `NativeFormExtractor` is an element source for `PageAnalyzer`: it returns
+both the element locators and the question data in one pass, replacing the two AgentQL
+queries. It returns None on unknown hosts or low-confidence results so the analyzer falls
+back to AgentQL.
+"""
+
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from dom_scripts import CLEAN_JS, LABEL_JS, STAMP_JS
+from models import JobApplicationForm
+from page_analyzer import ExtractedElements
+
+# Host suffix -> platform name
+KNOWN_PLATFORMS = {
+    "greenhouse.io": "greenhouse",
+    "lever.co": "lever",
+    "ashbyhq.com": "ashby",
+}
+
+# Form container selectors per platform, most specific first
+CONTAINER_SELECTORS = {
+    "greenhouse": ["#application-form", "form#application_form", "#application_form", "form"],
+    "lever": ["form#application-form", ".application-form form", "form"],
+    "ashby": [".ashby-application-form-container", "form"],
+}
+
+NATIVE_FORM_SCRIPT = """
+([containerSelectors]) => {
+    let container = null;
+    for (const selector of containerSelectors) {
+        container = document.querySelector(selector);
+        if (container) break;
+    }
+    if (!container) return null;
+
+""" + CLEAN_JS + LABEL_JS + STAMP_JS + """
+    const isVisible = (el) => {
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 || rect.height > 0;
+    };
+    const wrapperOf = (el) => el.closest('fieldset, .field, .application-question, [class*="fieldEntry"], [class*="field-wrapper"], li, .form-group') || el.parentElement;
+    const groupLabelOf = (el) => {
+        const fieldset = el.closest('fieldset');
+        const legend = fieldset && fieldset.querySelector('legend');
+        if (legend) return clean(legend.innerText);
+        const wrapper = wrapperOf(el);
+        const label = wrapper && wrapper.querySelector('label, .application-label, [class*="label"]');
+        return label ? clean(label.innerText) : '';
+    };
+    const labelOf = (el) => directLabelOf(el) || groupLabelOf(el) || clean(el.getAttribute('placeholder'));
+
+    const fields = [];
+    const groups = new Map();
+    const seen = new Set();
+
+    container.querySelectorAll('input, textarea, select, [role="combobox"]').forEach((el) => {
+        if (seen.has(el)) return;
+        const type = (el.getAttribute('type') || '').toLowerCase();
+        if (['hidden', 'submit', 'button', 'reset'].includes(type)) return;
+
+        if (type === 'file') {
+            // File inputs are usually hidden behind a visible upload button
+            const wrapper = wrapperOf(el);
+            const button = wrapper && wrapper.querySelector('button, [role="button"]');
+            const target = button && isVisible(button) ? button : el;
+            fields.push({ kind: 'resume', label: groupLabelOf(el) || labelOf(el), ids: [stamp(target)], names: [clean(target.innerText) || 'Upload File'] });
+            return;
+        }
+        if (!isVisible(el)) return;
+
+        if (type === 'radio' || type === 'checkbox') {
+            const fieldset = el.closest('fieldset');
+            const key = el.name || (fieldset ? stamp(fieldset) : stamp(el));
+            if (!groups.has(key)) {
+                const group = { kind: 'radio', label: groupLabelOf(el) || labelOf(el), ids: [], names: [] };
+                groups.set(key, group);
+                fields.push(group);
+            }
+            const group = groups.get(key);
+            group.ids.push(stamp(el));
+            group.names.push(el.labels && el.labels.length ? clean(el.labels[0].innerText) : clean(el.value));
+            return;
+        }
+
+        // A combobox may be the input itself or a wrapper around one
+        const combobox = el.getAttribute('role') === 'combobox' ? el : null;
+        if (combobox) combobox.querySelectorAll('input').forEach((inner) => seen.add(inner));
+        const kind = el.tagName === 'SELECT' || combobox ? 'dropdown' : 'text';
+        const label = labelOf(el);
+        fields.push({ kind, label, ids: [stamp(el)], names: [label] });
+    });
+
+    // Button groups without inputs (e.g. Ashby Yes/No questions)
+    container.querySelectorAll('fieldset').forEach((fieldset) => {
+        if (fieldset.querySelector('input, select, textarea')) return;
+        const buttons = Array.from(fieldset.querySelectorAll('button:not([type="submit"])')).filter(isVisible);
+        if (!buttons.length) return;
+        fields.push({ kind: 'radio', label: groupLabelOf(buttons[0]), ids: buttons.map(stamp), names: buttons.map((b) => clean(b.innerText)) });
+    });
+
+    const submit = container.querySelector('button[type="submit"], input[type="submit"]')
+        || document.querySelector('button[type="submit"]');
+    return {
+        fields,
+        submit_label: submit ? clean(submit.innerText || submit.value) : null,
+    };
+}
+"""
+
+
+def detect_platform(url: str) -> Optional[str]:
+    """Return the known ATS platform name for a URL, or None."""
+    host = (urlparse(url).hostname or "").lower()
+    for suffix, platform in KNOWN_PLATFORMS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return platform
+    return None
+
+
+class NativeFormExtractor:
+    """Element source that extracts forms on known ATS platforms with a local in-page script."""
+
+    def __init__(self, min_confidence: float = 0.9):
+        """
+        Args:
+            min_confidence: Minimum fraction of fields that must have a label for the result to be used
+        """
+        self.min_confidence = min_confidence
+
+    def extract(self, page) -> Optional[ExtractedElements]:
+        """
+        Extract form elements and questions in one page evaluation.
+
+        Returns:
+            ExtractedElements with names and question_data populated, or None to fall back to AgentQL
+        """
+        platform = detect_platform(page.url)
+        if platform is None:
+            return None
+
+        try:
+            snapshot = page.evaluate(NATIVE_FORM_SCRIPT, [CONTAINER_SELECTORS[platform]])
+        except Exception as e:
+            print(f"❌ Native {platform} extraction failed: {e}")
+            return None
+
+        fields = (snapshot or {}).get("fields") or []
+        if not fields:
+            print(f"❌ Native {platform} extraction found no fields, falling back to AgentQL")
+            return None
+
+        labelled = sum(1 for f in fields if f["label"] and all(f["names"]))
+        confidence = labelled / len(fields)
+        if confidence < self.min_confidence:
+            print(f"❌ Native {platform} extraction confidence {confidence:.2f} below {self.min_confidence}, falling back to AgentQL")
+            return None
+
+        print(f"✅ Native {platform} extraction: {len(fields)} fields (confidence {confidence:.2f})")
+        return self._build(page, platform, fields, snapshot.get("submit_label"))
+
+    def _build(self, page, platform: str, fields: List[Dict[str, Any]], submit_label: Optional[str]) -> ExtractedElements:
+        locate = lambda kyro_id: page.locator(f'[data-kyro-id="{kyro_id}"]')
+        by_kind = {kind: [f for f in fields if f["kind"] == kind] for kind in ("text", "dropdown", "radio", "resume")}
+
+        extracted = ExtractedElements(
+            input_text=[locate(f["ids"][0]) for f in by_kind["text"]],
+            dropdowns=[locate(f["ids"][0]) for f in by_kind["dropdown"]],
+            radio_checkbox_groups=[[locate(i) for i in f["ids"]] for f in by_kind["radio"]],
+            resume=[locate(f["ids"][0]) for f in by_kind["resume"]],
+            source=f"native:{platform}",
+        )
+
+        # Names must follow ExtractedElements.all_locators() order
+        names = []
+        for kind in ("text", "dropdown", "radio", "resume"):
+            for f in by_kind[kind]:
+                names.extend(f["names"])
+        extracted.names = names
+        extracted.selectors = [f'[data-kyro-id="{i}"]' for kind in ("text", "dropdown", "radio", "resume") for f in by_kind[kind] for i in (f["ids"] if kind == "radio" else f["ids"][:1])]
+
+        form = JobApplicationForm.model_validate({
+            "form": {
+                "application_page_title": "Application",
+                "all_application_form_questions": [{"question_name": f["label"]} for f in fields],
+                "input_text_questions": [f["label"] for f in by_kind["text"]],
+                "dropdown_questions": [f["label"] for f in by_kind["dropdown"]],
+                "radio_checkbox_questions": [f["label"] for f in by_kind["radio"]],
+                "resume_questions": [{"name": f["label"], "buttons": f["names"]} for f in by_kind["resume"]],
+            }
+        })
+        question_data = form.model_dump()
+        # Keys read by PageAnalyzer / QuestionElement (APPLICATION_FORM_QUESTIONS_PROMPT shape)
+        question_data["form"]["application_form_questions"] = [f["label"] for f in fields]
+        question_data["form"]["submit_button_question"] = submit_label
+        extracted.question_data = question_data
+        return extracted
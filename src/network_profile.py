@@ -0,0 +1,242 @@
+"""
+Request blocking profile for application pages.
+
+Job board pages pull in analytics, chat widgets, fonts, videos and hero images the agent
+never needs, all of which delay `page.goto` / `wait_for_page_ready_state` and cost
+bandwidth on the remote browser. `NetworkProfile` installs narrow routes on the Playwright
+context, so every other request is never intercepted (no round trip to Python):
+
+- tracker and widget hosts (host globs) are stubbed with an empty 200/204, so page
+  scripts waiting on them do not error,
+- font, media and image URLs (extension globs) are aborted,
+- captcha providers are never touched, and scripts/XHR from the ATS's own hosts are
+  never stubbed. Images and fonts are blocked on ATS hosts too (e.g. the ATS CDN).
+
+Stats are kept per navigation. The blocked and stubbed requests are counted per resource
+type; those counts and the navigation time are measured. Aborted responses are never
+downloaded, so their size is unknown: the bytes and download time they would have cost are
+only estimates (typical sizes per resource type at an assumed bandwidth) and are always
+reported as such. NETWORK_PROFILE=off disables blocking.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from native_extractors import detect_platform
+
+# Resource types the agent never needs
+BLOCKED_RESOURCE_TYPES = ("media", "font", "image")
+
+# URL globs routed for each blocked resource type (the handler still checks the actual type)
+RESOURCE_URL_GLOBS = {
+    "font": "**/*.{woff,woff2,ttf,otf,eot}{,?**}",
+    "media": "**/*.{mp4,webm,m3u8,ts,mov,mp3,wav,ogg}{,?**}",
+    "image": "**/*.{png,jpg,jpeg,gif,webp,avif,svg,ico}{,?**}",
+}
+
+# Analytics, ads, session recording and chat widgets (matched as host suffixes)
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googleadservices.com",
+    "facebook.net", "connect.facebook.net", "hotjar.com", "hotjar.io", "segment.com", "segment.io",
+    "mixpanel.com", "amplitude.com", "fullstory.com", "clarity.ms", "bat.bing.com",
+    "snap.licdn.com", "px.ads.linkedin.com", "ads.linkedin.com", "optimizely.com",
+    "js-agent.newrelic.com", "bam.nr-data.net", "browser-intake-datadoghq.com",
+    "intercom.io", "intercomcdn.com", "drift.com", "driftt.com", "js.hs-scripts.com",
+    "js.hs-analytics.net", "static.zdassets.com", "onetrust.com", "cookielaw.org",
+    "youtube.com", "ytimg.com", "vimeo.com", "vimeocdn.com", "wistia.com", "wistia.net",
+)
+
+# Never blocked: captcha challenges must load for the form to be submittable
+CAPTCHA_MARKERS = ("recaptcha", "hcaptcha.com", "challenges.cloudflare.com", "turnstile")
+
+# Per-ATS hosts whose scripts and XHR are never stubbed, keyed by detect_platform() name
+ATS_ALLOWLISTS: Dict[str, Tuple[str, ...]] = {
+    "greenhouse": ("greenhouse.io",),
+    "lever": ("lever.co",),
+    "ashby": ("ashbyhq.com",),
+    "workday": ("workday.com", "myworkdayjobs.com", "myworkdaysite.com"),
+}
+
+# Resource types the allowlist protects; images, fonts and media on ATS hosts are still blocked
+ALLOWLISTED_RESOURCE_TYPES = ("document", "script", "xhr", "fetch")
+
+# Per-ATS resource types that must load anyway
+ATS_REQUIRED_TYPES: Dict[str, Tuple[str, ...]] = {
+    # Workday renders checkbox and menu icons with its own fonts and images
+    "workday": ("font", "image"),
+}
+
+# Typical transfer sizes used to estimate the bytes a blocked request would have cost (not measured)
+ESTIMATED_BYTES = {"image": 80_000, "media": 1_500_000, "font": 40_000, "script": 90_000}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+# Bandwidth assumed when converting estimated bytes into download time (NETWORK_PROFILE_MBPS overrides)
+DEFAULT_BANDWIDTH_MBPS = 20.0
+
+
+def _assumed_bandwidth_mbps() -> float:
+    try:
+        mbps = float(os.getenv("NETWORK_PROFILE_MBPS", DEFAULT_BANDWIDTH_MBPS))
+    except ValueError:
+        mbps = DEFAULT_BANDWIDTH_MBPS
+    return max(mbps, 0.1)
+
+
+def _host_matches(host: str, suffixes: Iterable[str]) -> bool:
+    return any(host == suffix or host.endswith("." + suffix) for suffix in suffixes)
+
+
+def _format_counts(counts: Dict[str, int]) -> str:
+    return ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())) or "nothing"
+
+
+@dataclass
+class NetworkStats:
+    """Request counters for one navigation (or the profile's lifetime)."""
+    blocked: Dict[str, int] = field(default_factory=dict)  # resource type -> aborted requests
+    stubbed: Dict[str, int] = field(default_factory=dict)  # resource type -> tracker requests answered locally
+    allowed: int = 0  # Routed requests let through (e.g. a non-font request matching a font URL glob)
+    estimated_bytes_saved: int = 0  # Estimate from ESTIMATED_BYTES, not measured
+
+    def record(self, action: str, resource_type: str) -> None:
+        if action == "allow":
+            self.allowed += 1
+            return
+        counts = self.stubbed if action == "stub" else self.blocked
+        counts[resource_type] = counts.get(resource_type, 0) + 1
+        self.estimated_bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    @property
+    def estimated_seconds_saved(self) -> float:
+        """Estimated download time of the blocked requests at the assumed bandwidth (not measured)."""
+        return self.estimated_bytes_saved / (_assumed_bandwidth_mbps() * 1_000_000 / 8)
+
+    def summary(self) -> str:
+        return (
+            f"blocked {_format_counts(self.blocked)}; stubbed {_format_counts(self.stubbed)}; "
+            f"let through {self.allowed}; estimated, not measured: ~{self.estimated_bytes_saved / 1_000_000:.1f} MB "
+            f"not downloaded (~{self.estimated_seconds_saved:.1f}s at an assumed {_assumed_bandwidth_mbps():g} Mbps)"
+        )
+
+
+class NetworkProfile:
+    """Route-based request blocking for one application's browser context."""
+
+    def __init__(
+        self,
+        url: str,
+        block_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        tracker_hosts: Iterable[str] = TRACKER_HOSTS,
+        allow_hosts: Optional[Iterable[str]] = None,
+    ):
+        """
+        Args:
+            url: The application URL; its ATS selects the allowlist
+            block_types: Playwright resource types to abort
+            tracker_hosts: Host suffixes to stub
+            allow_hosts: Host suffixes whose scripts/XHR are never stubbed (defaults to the ATS allowlist)
+        """
+        self.url = url
+        self.platform = detect_platform(url) or ("workday" if "myworkdayjobs.com" in url else None)
+        self.block_types = frozenset(block_types) - frozenset(ATS_REQUIRED_TYPES.get(self.platform, ()))
+        self.tracker_hosts = tuple(tracker_hosts)
+        self.allow_hosts = tuple(allow_hosts) if allow_hosts is not None else ATS_ALLOWLISTS.get(self.platform, ())
+        self.total = NetworkStats()
+        self.current = NetworkStats()
+
+    @classmethod
+    def from_env(cls, url: str) -> Optional["NetworkProfile"]:
+        """Return the profile for a URL, or None when NETWORK_PROFILE=off."""
+        if os.getenv("NETWORK_PROFILE", "default").lower() == "off":
+            return None
+        return cls(url)
+
+    def decide(self, url: str, resource_type: str) -> str:
+        """
+        Decide what to do with a request.
+
+        Returns:
+            "allow", "stub" (tracker, answered locally) or "block" (aborted)
+        """
+        lowered = url.lower()
+        if lowered.startswith(("data:", "blob:")) or any(marker in lowered for marker in CAPTCHA_MARKERS):
+            return "allow"
+        host = (urlparse(url).hostname or "").lower()
+        if resource_type in ALLOWLISTED_RESOURCE_TYPES and _host_matches(host, self.allow_hosts):
+            return "allow"
+        if _host_matches(host, self.tracker_hosts):
+            return "stub"
+        if resource_type in self.block_types:
+            return "block"
+        return "allow"
+
+    def _handle(self, route) -> None:
+        request = route.request
+        action = self.decide(request.url, request.resource_type)
+        self.current.record(action, request.resource_type)
+        self.total.record(action, request.resource_type)
+        try:
+            if action == "allow":
+                route.continue_()
+            elif action == "stub":
+                if request.resource_type == "script":
+                    route.fulfill(status=200, content_type="application/javascript", body="")
+                else:
+                    route.fulfill(status=204, body="")
+            else:
+                route.abort("blockedbyclient")
+        except Exception as e:
+            # The page navigated away or closed while the request was pending
+            print(f"Could not handle route for {request.url[:80]}: {e}")
+
+    def route_globs(self) -> List[str]:
+        """URL globs of the requests this profile may stub or block; nothing else is intercepted."""
+        globs = []
+        for host in self.tracker_hosts:
+            globs.extend([f"**://{host}/**", f"**://*.{host}/**"])
+        globs.extend(RESOURCE_URL_GLOBS[kind] for kind in sorted(self.block_types) if kind in RESOURCE_URL_GLOBS)
+        return globs
+
+    def install(self, context) -> "NetworkProfile":
+        """Route the tracker hosts and blocked resource URLs of a Playwright browser context through this profile."""
+        globs = self.route_globs()
+        for glob in globs:
+            context.route(glob, self._handle)
+        print(f"🚫 Network profile installed ({self.platform or 'unknown ATS'}, {len(globs)} routes, allowlist {list(self.allow_hosts)})")
+        return self
+
+    def uninstall(self, context) -> None:
+        """Remove this profile's routes from a context, e.g. before a pooled session is reused."""
+        for glob in self.route_globs():
+            context.unroute(glob, self._handle)
+
+    @contextmanager
+    def navigation(self, label: str = "navigation"):
+        """Time one navigation and report the requests blocked during it."""
+        self.current = NetworkStats()
+        start = time.time()
+        try:
+            yield self.current
+        finally:
+            print(f"⏱️ {label} took {time.time() - start:.2f}s; {self.current.summary()}")
+
+
+def install_network_profile(context, url: str) -> Optional[NetworkProfile]:
+    """
+    Install the blocking profile for a URL on a context, unless disabled.
+
+    Returns:
+        The installed profile, or None if blocking is off or could not be installed
+    """
+    profile = NetworkProfile.from_env(url)
+    if profile is None:
+        return None
+    try:
+        return profile.install(context)
+    except Exception as e:
+        print(f"Could not install network profile: {e}")
+        return None
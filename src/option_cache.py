@@ -0,0 +1,205 @@
+"""
+Persistent cache of dropdown option lists per ATS field.
+
+EEO dropdowns (gender, race, veteran, disability) and country lists are identical across
+postings on the same ATS, so `OptionListCache` stores each extracted option list keyed by
+(ATS, field fingerprint). Before a dropdown is opened, a cheap probe is compared against
+the stored one: option count plus first/last option when the options are already in the
+DOM (native selects), otherwise the field label. On a match, interactive extraction is
+skipped entirely.
+
+A label alone does not prove the options are the same (a "Location" picker differs per
+company), so fields without a count probe are also keyed by the job board (host + company
+path segment). Entries expire after a TTL, and only options read by a reliable extraction
+strategy are stored. Writes happen outside the entry lock and concurrent stores collapse
+into one write.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from dom_scripts import CLEAN_JS, LABEL_JS
+from json_store import load_json, save_json_atomic
+from option_harvester import is_placeholder_option
+from singleton import LazySingleton
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "dropdown_options.json")
+
+# Cached option lists older than this are re-extracted
+DEFAULT_TTL_SECONDS = 14 * 24 * 3600
+
+# Identity of a dropdown field that is stable across postings on the same ATS
+FINGERPRINT_SCRIPT = """
+(el) => {
+    const field = el.closest('[data-automation-id], .field, .form-field, fieldset') || el.parentElement || el;
+    const attr = (node, name) => (node && node.getAttribute(name)) || '';
+    return [
+        el.tagName,
+        attr(el, 'name'), attr(el, 'id'), attr(el, 'aria-label'), attr(el, 'placeholder'),
+        attr(el, 'data-automation-id'), attr(field, 'data-automation-id'),
+        (el.className && el.className.baseVal === undefined ? el.className : ''),
+    ].join('|');
+}
+"""
+
+# Cheap validation probe that does not open the dropdown
+PROBE_SCRIPT = """
+(el) => {
+""" + CLEAN_JS + LABEL_JS + """
+    const select = el instanceof HTMLSelectElement ? el : el.querySelector('select');
+    const texts = select ? Array.from(select.options).map((o) => clean(o.text)) : null;
+
+    let label = directLabelOf(el);
+    if (!label) {
+        const field = el.closest('[data-automation-id], .field, .form-field, fieldset');
+        const fieldLabel = field && field.querySelector('label, legend');
+        if (fieldLabel) label = fieldLabel.innerText;
+    }
+
+    return {
+        count: texts ? texts.length : null,
+        first: texts && texts.length ? texts[0] : '',
+        last: texts && texts.length ? texts[texts.length - 1] : '',
+        label: clean(label).toLowerCase(),
+    };
+}
+"""
+
+
+def probe_matches(stored: Dict[str, Any], live: Dict[str, Any]) -> bool:
+    """
+    Check whether a live probe confirms a stored option list.
+
+    Option count and first/last option are compared when both probes have them,
+    otherwise the field labels must be equal and non-empty.
+    """
+    if stored.get("count") is not None and live.get("count") is not None:
+        return (stored["count"], stored["first"], stored["last"]) == (live["count"], live["first"], live["last"])
+    return bool(stored.get("label")) and stored.get("label") == live.get("label")
+
+
+class OptionListCache:
+    """
+    Persistent option-list cache shared by every DropdownExtractor in the process.
+
+    Thread-safe; use get_option_cache() for the process-wide instance.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Args:
+            path: JSON file used to persist option lists across runs (None keeps the cache in memory)
+            ttl_seconds: Age after which a cached option list is no longer used
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        # Serializes disk writes; versions let a write skip changes a later write already covered
+        self._save_lock = threading.Lock()
+        self._version = 0
+        self._saved_version = 0
+        self._load()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return hit/miss/invalidation counters for logging."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "fields": len(self.entries),
+        }
+
+    def _load(self) -> None:
+        self.entries = load_json(self.path, "option cache") or {}
+
+    def _save(self) -> None:
+        """Write the entries to disk. Call without holding self._lock."""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if self._saved_version == self._version:
+                    return
+                # Entries are replaced, never mutated, so a shallow copy is a consistent snapshot
+                snapshot = dict(self.entries)
+                version = self._version
+            if save_json_atomic(self.path, snapshot, "option cache"):
+                self._saved_version = version
+
+    def _key_and_probe(self, dropdown, page):
+        # Imported here: native_extractors imports page_analyzer, which imports the dropdown extractor
+        from native_extractors import detect_platform
+
+        try:
+            fingerprint = dropdown.evaluate(FINGERPRINT_SCRIPT)
+            probe = dropdown.evaluate(PROBE_SCRIPT)
+        except Exception as e:
+            print(f"Could not probe dropdown for option cache: {e}")
+            return None, None
+        parsed = urlparse(page.url)
+        host = (parsed.hostname or "").lower()
+        ats = detect_platform(page.url) or host
+        if probe.get("count") is None:
+            # Only a label to validate against: scope the entry to this job board
+            segments = [segment for segment in parsed.path.split("/") if segment]
+            board = f"{host}/{segments[0]}" if segments else host
+            return f"{ats}|{board}|{fingerprint}", probe
+        return f"{ats}|{fingerprint}", probe
+
+    def lookup(self, dropdown, page) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the cached options of a dropdown if its probe still matches.
+
+        Returns:
+            A copy of the cached option dicts, or None on a miss or failed probe
+        """
+        key, probe = self._key_and_probe(dropdown, page)
+        with self._lock:
+            entry = self.entries.get(key) if key else None
+            if entry is None:
+                self.misses += 1
+                return None
+            expired = time.time() - entry.get("stored_at", 0) > self.ttl_seconds
+            if expired or not probe_matches(entry["probe"], probe):
+                self.entries.pop(key, None)
+                self._version += 1
+                self.invalidations += 1
+                self.misses += 1
+                print(f"📦 Option cache entry invalidated - {'expired' if expired else 'probe changed'} ({self.metrics()})")
+                return None
+            self.hits += 1
+        print(f"📦 Option cache hit: {len(entry['options'])} options ({self.metrics()})")
+        return [dict(option) for option in entry["options"]]
+
+    def store(self, dropdown, page, options: List[Dict[str, Any]]) -> None:
+        """Cache the extracted options of a dropdown together with its probe."""
+        if not any(not is_placeholder_option(option.get("text") or "") for option in options):
+            # Empty or placeholder-only (still loading, type-to-search) lists are never cached
+            return
+        key, probe = self._key_and_probe(dropdown, page)
+        if not key:
+            return
+        if probe.get("count") is None and not probe.get("label"):
+            # Nothing cheap to validate against later
+            return
+        with self._lock:
+            self.entries[key] = {"probe": probe, "options": options, "stored_at": time.time()}
+            self._version += 1
+        self._save()
+
+
+_default_cache = LazySingleton(OptionListCache)
+
+
+def get_option_cache() -> OptionListCache:
+    """Return the process-wide option-list cache."""
+    return _default_cache.get()
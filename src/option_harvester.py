@@ -0,0 +1,223 @@
+"""
+Option harvesting for virtualized and asynchronously loaded comboboxes.
+
+Workday and Ashby style pickers only keep the options near the scroll position in the
+DOM, or fetch them over XHR once the menu opens, so reading the open menu once misses most
+of the list. `OptionHarvester` scrolls the open listbox step by step, deduplicating option
+texts, while capturing JSON responses that arrive after the menu was opened. Both run
+within a fixed time budget. Harvested lists are persisted per ATS field by
+`option_cache.OptionListCache`, so later applications on the same template skip harvesting.
+
+Placeholder and empty-state rows ("Select...", "Loading...", "No options") are dropped.
+Type-to-search pickers (e.g. Ashby's location field) only list options for a typed query,
+so they cannot be enumerated up front: their menu holds nothing but an empty-state row,
+harvesting returns no options, and the answer is typed into the filter at fill time.
+"""
+
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from singleton import LazySingleton
+
+# Reads the visible options of the open menu and scrolls it by one viewport
+HARVEST_STEP_SCRIPT = """
+(el) => {
+    const visible = (node) => {
+        const rect = node.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    let menu = null;
+    for (const attr of ['aria-controls', 'aria-owns']) {
+        const ref = el.getAttribute(attr) || (el.querySelector(`[${attr}]`) || { getAttribute: () => null }).getAttribute(attr);
+        const candidate = ref && document.getElementById(ref.split(' ')[0]);
+        if (candidate && visible(candidate)) { menu = candidate; break; }
+    }
+    if (!menu) {
+        const menus = Array.from(document.querySelectorAll(
+            '[role="listbox"], .select__menu-list, .react-select__menu-list, .select__menu, .react-select__menu, .dropdown-menu'
+        )).filter(visible);
+        // Prefer the menu closest to the trigger when several are open
+        const anchor = el.getBoundingClientRect();
+        menus.sort((a, b) => Math.abs(a.getBoundingClientRect().top - anchor.bottom) - Math.abs(b.getBoundingClientRect().top - anchor.bottom));
+        menu = menus[0] || null;
+    }
+    if (!menu) return null;
+
+    let options = menu.querySelectorAll('[role="option"], .select__option, .react-select__option, .dropdown-item, li');
+    if (!options.length) options = menu.children;
+    const texts = Array.from(options)
+        .map((o) => ({ text: (o.innerText || o.textContent || '').replace(/\\s+/g, ' ').trim(), value: o.getAttribute('data-value') || o.getAttribute('value') || '' }))
+        .filter((o) => o.text && o.text.length < 200);
+
+    // The scrollable element may be the menu itself or one of its ancestors/descendants
+    let scroller = menu;
+    while (scroller && scroller !== document.body && scroller.scrollHeight <= scroller.clientHeight) {
+        scroller = scroller.parentElement;
+    }
+    if (!scroller || scroller === document.body) {
+        scroller = Array.from(menu.querySelectorAll('*')).find((n) => n.scrollHeight > n.clientHeight + 1) || null;
+    }
+    if (!scroller) return { options: texts, atEnd: true };
+
+    const atEnd = scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 1;
+    scroller.scrollTop += Math.max(scroller.clientHeight - 20, 20);
+    return { options: texts, atEnd };
+}
+"""
+
+# Menu rows that are not options: placeholders and loading/empty/type-to-search hints
+PLACEHOLDER_PATTERN = re.compile(
+    r"^(\.\.\.|select( one| an option)?|please select|choose( one)?|--+"
+    r"|loading|searching|no (options|results|matches)( found| available)?"
+    r"|(start )?typ(e|ing) to search|type to filter)\W*$",
+    re.IGNORECASE,
+)
+
+
+def is_placeholder_option(text: str) -> bool:
+    """Whether a menu row is a placeholder or empty-state row rather than a selectable option."""
+    return not text.strip() or bool(PLACEHOLDER_PATTERN.match(text.strip()))
+
+
+# Keys that typically hold an option label in ATS option APIs
+LABEL_KEYS = ("label", "name", "text", "title", "displayName", "descriptor", "value")
+
+
+def _option_lists_in(payload: Any, depth: int = 0) -> List[List[str]]:
+    """Find lists of option-like objects in a JSON payload and return their labels."""
+    if depth > 6:
+        return []
+    found = []
+    if isinstance(payload, list):
+        labels = []
+        for item in payload:
+            if isinstance(item, dict):
+                label = next((item[k] for k in LABEL_KEYS if isinstance(item.get(k), str) and item[k].strip()), None)
+                if label is not None:
+                    labels.append(label.strip())
+        if len(labels) >= 2 and len(labels) >= len(payload) // 2:
+            found.append(labels)
+        for item in payload:
+            found.extend(_option_lists_in(item, depth + 1))
+    elif isinstance(payload, dict):
+        for value in payload.values():
+            found.extend(_option_lists_in(value, depth + 1))
+    return found
+
+
+class ResponseCapture:
+    """Records XHR/fetch responses of a page until stopped."""
+
+    def __init__(self, page):
+        self.page = page
+        self.responses: List[Any] = []
+        self.listening = True
+        page.on("response", self._on_response)
+
+    def _on_response(self, response) -> None:
+        if response.request.resource_type in ("xhr", "fetch"):
+            self.responses.append(response)
+
+    def stop(self) -> List[Any]:
+        """Stop recording and return the captured responses. Safe to call more than once."""
+        if self.listening:
+            self.listening = False
+            try:
+                self.page.remove_listener("response", self._on_response)
+            except Exception:
+                pass
+        return list(self.responses)
+
+
+class OptionHarvester:
+    """Collects the complete option set of an open combobox, bounded in time."""
+
+    def __init__(self, time_budget: float = 4.0, step_delay_ms: int = 150, max_stale_steps: int = 2):
+        """
+        Args:
+            time_budget: Maximum seconds spent harvesting one dropdown
+            step_delay_ms: Wait after each scroll so the virtual list can render
+            max_stale_steps: Stop after this many scrolls without new options
+        """
+        self.time_budget = time_budget
+        self.step_delay_ms = step_delay_ms
+        self.max_stale_steps = max_stale_steps
+
+    def start_capture(self, page) -> "ResponseCapture":
+        """Start recording XHR/fetch responses. Call before opening the menu."""
+        return ResponseCapture(page)
+
+    def harvest(self, dropdown, page, captured: Optional["ResponseCapture"] = None) -> List[Dict[str, Any]]:
+        """
+        Scroll the open menu of a dropdown until all options were seen or the time budget runs out.
+
+        Args:
+            dropdown: Locator of the dropdown trigger (the menu must already be open)
+            page: The playwright page object
+            captured: Capture returned by start_capture, if network capture was started (stopped here)
+
+        Returns:
+            Option dicts (index, value, text) in list order, without placeholder rows; empty if
+            no menu was found or it only held placeholder rows (e.g. a type-to-search picker)
+        """
+        start = time.time()
+        deadline = start + self.time_budget
+        seen: Dict[str, str] = {}
+        stale_steps = 0
+
+        try:
+            while time.time() < deadline:
+                step = dropdown.evaluate(HARVEST_STEP_SCRIPT)
+                if step is None:
+                    break
+                before = len(seen)
+                for option in step["options"]:
+                    if not is_placeholder_option(option["text"]):
+                        seen.setdefault(option["text"], option["value"])
+                stale_steps = stale_steps + 1 if len(seen) == before else 0
+                if step["atEnd"] or stale_steps >= self.max_stale_steps:
+                    break
+                page.wait_for_timeout(self.step_delay_ms)
+        except Exception as e:
+            print(f"Option harvesting by scrolling failed: {e}")
+
+        texts = list(seen)
+        network_texts = self._network_options(captured, max(deadline, time.time() + 1.0)) if captured else []
+
+        # Prefer the network list when it is a superset of what the menu showed
+        if network_texts and len(network_texts) > len(texts) and set(texts) <= set(network_texts):
+            print(f"Harvested {len(network_texts)} options from network responses")
+            options = [{'index': i + 1, 'value': text, 'text': text} for i, text in enumerate(network_texts)]
+        else:
+            options = [{'index': i + 1, 'value': seen[text], 'text': text} for i, text in enumerate(texts)]
+
+        print(f"⏱️ Harvested {len(options)} options in {time.time() - start:.2f}s")
+        return options
+
+    def _network_options(self, captured: "ResponseCapture", deadline: float) -> List[str]:
+        """Stop recording and return the longest option list found in captured JSON responses."""
+        best: List[str] = []
+        for response in captured.stop():
+            if time.time() >= deadline:
+                break
+            try:
+                if "json" not in (response.headers.get("content-type") or ""):
+                    continue
+                payload = json.loads(response.text())
+            except Exception:
+                continue
+            for labels in _option_lists_in(payload):
+                deduped = [label for label in dict.fromkeys(labels) if not is_placeholder_option(label)]
+                if len(deduped) > len(best):
+                    best = deduped
+        return best
+
+
+_default_harvester = LazySingleton(OptionHarvester)
+
+
+def get_option_harvester() -> OptionHarvester:
+    """Return the process-wide option harvester."""
+    return _default_harvester.get()
@@ -0,0 +1,135 @@
+"""
+Local resolution of LLM answers against the options of a dropdown or radio/checkbox group.
+
+LLM answers often differ slightly from the option text ("US" vs "United States",
+"yes" vs "Yes, I am authorized"). Typing such an answer into a combobox filter selects
+nothing, so answers are resolved to a concrete option before any page interaction.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from thefuzz import fuzz
+
+# Minimum fuzzy score (0-100) for an option to count as a match
+DEFAULT_THRESHOLD = 80
+
+# Number of options shown to the LLM for long dropdowns
+DEFAULT_PROMPT_OPTIONS = 15
+
+# Filler words ignored when scoring option relevance
+STOPWORDS = {"a", "an", "and", "am", "are", "do", "i", "in", "is", "not", "of", "or", "the", "to", "with", "my", "me"}
+
+# Placeholder entries that never count as a real option
+PLACEHOLDER_OPTIONS = {"", "...", "select", "select...", "select one", "please select", "choose", "choose..."}
+
+
+@dataclass
+class OptionMatch:
+    """The option an answer resolved to."""
+    index: int
+    text: str
+    score: int
+
+
+def normalize_option_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", text.lower())).strip()
+
+
+def resolve_option(answer: str, options: List[str], threshold: int = DEFAULT_THRESHOLD) -> Optional[OptionMatch]:
+    """
+    Resolve an answer to one of the available options.
+
+    Exact normalized matches win outright, then identical token sets, then the best
+    fuzzy score at or above the threshold.
+
+    Args:
+        answer: The LLM's answer
+        options: The option texts in page order
+        threshold: Minimum fuzzy score to accept
+
+    Returns:
+        The matched option, or None if no option is close enough
+    """
+    wanted = normalize_option_text(answer or "")
+    if not wanted:
+        return None
+
+    candidates = [
+        (i, option, normalize_option_text(option))
+        for i, option in enumerate(options)
+        if option and option.strip().lower() not in PLACEHOLDER_OPTIONS
+    ]
+
+    for i, option, normalized in candidates:
+        if normalized == wanted:
+            return OptionMatch(index=i, text=option, score=100)
+
+    wanted_tokens = set(wanted.split())
+    for i, option, normalized in candidates:
+        if set(normalized.split()) == wanted_tokens:
+            return OptionMatch(index=i, text=option, score=100)
+
+    best = None
+    for i, option, normalized in candidates:
+        # WRatio handles partial and reordered matches; plain ratio breaks ties
+        score = (fuzz.WRatio(wanted, normalized), fuzz.ratio(wanted, normalized))
+        if best is None or score > best[0]:
+            best = (score, i, option)
+
+    if best is None or best[0][0] < threshold:
+        return None
+    return OptionMatch(index=best[1], text=best[2], score=best[0][0])
+
+
+def _flatten_profile(value: Any) -> List[str]:
+    """Collect every scalar value in a nested profile as text."""
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _flatten_profile(item)]
+    if isinstance(value, (list, tuple)):
+        return [text for item in value for text in _flatten_profile(item)]
+    return [] if value is None else [str(value)]
+
+
+def relevant_options(options: List[str], question: str, profile: Any, k: int = DEFAULT_PROMPT_OPTIONS) -> List[str]:
+    """
+    Pick the options most relevant to the question and user profile for the answer prompt.
+
+    Dropdowns keep their complete option list for matching during fill; this only limits
+    what the LLM is shown. Options whose text appears verbatim in the profile rank first,
+    then options by token overlap with the profile and the question.
+
+    Args:
+        options: The complete option texts in page order
+        question: The question text
+        profile: The user profile (any JSON-like structure)
+        k: Maximum number of options to return
+
+    Returns:
+        Up to k options, in page order
+    """
+    candidates = [o for o in options if o and o.strip().lower() not in PLACEHOLDER_OPTIONS]
+    if len(candidates) <= k:
+        return candidates
+
+    profile_text = " " + " ".join(normalize_option_text(text) for text in _flatten_profile(profile)) + " "
+    profile_tokens = set(profile_text.split()) - STOPWORDS
+    question_tokens = set(normalize_option_text(question or "").split()) - STOPWORDS
+
+    scores = []
+    for position, option in enumerate(candidates):
+        normalized = normalize_option_text(option)
+        tokens = set(normalized.split()) - STOPWORDS
+        if normalized and f" {normalized} " in profile_text:
+            # Verbatim profile value; longer phrases are more specific
+            score = 2.0 + len(normalized) / 1000
+        elif tokens:
+            score = (len(tokens & profile_tokens) + 0.5 * len(tokens & question_tokens)) / len(tokens)
+        else:
+            score = 0.0
+        scores.append((score, -position))
+
+    top = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)[:k]
+    return [candidates[i] for i in sorted(top)]
@@ -0,0 +1,449 @@
+"""
+Shared page-analysis engine for the pagers.
+
+`PageAnalyzer` runs the extraction, post-extraction filtering, locator realignment,
+question extraction, question-to-element mapping and dropdown option extraction for one
+page and returns a typed `PageAnalysis`. `OnePagerApplicant`, `ManualPager` and the backend
+workers all go through it, so performance work only has to happen in one place.
+
+Element sources (caches, local extractors) can be plugged in front of the AgentQL
+element query through `element_sources`; each source is tried in order and the first
+one returning an `ExtractedElements` wins.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from post_extraction_filter import process_form_elements
+from visibility import in_frame, tf623_id_of, tf623_ids_of
+from elements import QuestionElement, WebElement
+
+WEB_ELEMENT_PROMPT = """
+{
+  form {
+    application_form_html_container
+    application_form_input_text_tags(the text input or text area elements in the application form) []
+    application_form_dropdown_questions(the dropdown elements in the application form) []
+    application_form_radio_checkbox_questions(the button, radio, and checkbox groups in the application form)[] {
+      elements(Each individual button, radio, and checkbox element in the group) []
+    }
+    application_form_resume_questions(the buttons for uploading resumes, cover letters, or transcripts) []
+  }
+}
+"""
+
+APPLICATION_FORM_QUESTIONS_PROMPT = """
+{
+  form {
+    application_form_questions(All job application form fields: text inputs, textarea, file uploads, dropdowns, buttons, and radio/checkbox groups) []
+    input_text_questions(the questions that are tied to the application form text input or text area elements) []
+    dropdown_questions(the questions that are tied to the application form dropdown elements) []
+    radio_checkbox_questions(the questions tied to button, radio, or checkbox groups) []
+    resume_questions(questions about uploading resume or cover letter) [] {
+      name
+      buttons(buttons associated to the question) []
+    }
+    submit_button_question(the label on the submit button)
+  }
+}
+"""
+
+
+@dataclass
+class ExtractedElements:
+    """Form element locators grouped by kind, independent of where they came from."""
+    input_text: List[Any] = field(default_factory=list)
+    dropdowns: List[Any] = field(default_factory=list)
+    radio_checkbox_groups: List[List[Any]] = field(default_factory=list)
+    resume: List[Any] = field(default_factory=list)
+    container: Optional[Any] = None
+    source: str = "agentql"
+    # Optional names computed by the source, parallel to all_locators()
+    names: Optional[List[str]] = None
+    # Optional CSS selectors computed by the source, parallel to all_locators()
+    selectors: Optional[List[str]] = None
+    # Optional question data in the APPLICATION_FORM_QUESTIONS_PROMPT shape
+    question_data: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_agentql(cls, response) -> Optional["ExtractedElements"]:
+        """Build from an AgentQL WEB_ELEMENT_PROMPT response."""
+        if not response or not hasattr(response, 'form'):
+            return None
+        form = response.form
+        return cls(
+            input_text=list(form.application_form_input_text_tags),
+            dropdowns=list(form.application_form_dropdown_questions),
+            radio_checkbox_groups=[list(group.elements) for group in form.application_form_radio_checkbox_questions],
+            resume=list(form.application_form_resume_questions),
+            container=getattr(form, 'application_form_html_container', None),
+        )
+
+    def all_locators(self) -> List[Any]:
+        """All locators in extraction order (inputs, dropdowns, radio/checkbox elements, resume buttons)."""
+        locators = list(self.input_text) + list(self.dropdowns)
+        for group in self.radio_checkbox_groups:
+            locators.extend(group)
+        locators.extend(self.resume)
+        return locators
+
+    def fallback_names(self) -> List[str]:
+        """Names read from element attributes, used when accessibility-tree filtering is not possible."""
+        if self.names is not None:
+            return list(self.names)
+
+        names = []
+        for item in self.input_text:
+            names.append(_read_label(item, lambda e: e.get_attribute('placeholder') or e.get_attribute('aria-label') or e.get_attribute('name')))
+        for item in self.dropdowns:
+            names.append(_read_label(item, lambda e: e.get_attribute('aria-label') or e.get_attribute('name')))
+        for group in self.radio_checkbox_groups:
+            for item in group:
+                names.append(_read_label(item, lambda e: e.text_content() or e.get_attribute('value') or e.get_attribute('aria-label')))
+        for item in self.resume:
+            names.append(_read_label(item, lambda e: e.text_content() or e.get_attribute('aria-label')))
+        return names
+
+
+def _read_label(item, reader: Callable[[Any], Optional[str]]) -> str:
+    try:
+        return reader(item) or ''
+    except Exception:
+        return ''
+
+
+@dataclass
+class PageAnalysis:
+    """Result of analyzing one application page."""
+    extracted: ExtractedElements
+    container_tf623_id: Optional[str] = None
+    elements: List[Dict[str, Any]] = field(default_factory=list)  # Filtered element dicts
+    element_names: List[str] = field(default_factory=list)
+    locators: List[Any] = field(default_factory=list)
+    selectors: List[Optional[str]] = field(default_factory=list)  # CSS selector per locator, if known
+    question_data: Dict[str, Any] = field(default_factory=dict)
+    questions: List[str] = field(default_factory=list)
+    question_elements: Optional[List[QuestionElement]] = None
+    dropdown_options: Dict[str, List[str]] = field(default_factory=dict)  # Question -> option texts
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class PageAnalyzer:
+    """Extracts, filters and maps the form on a page into a PageAnalysis."""
+
+    def __init__(self, question_mapper, slow_mode: bool = False, element_sources: Optional[List[Any]] = None, save_debug_files: bool = False):
+        """
+        Args:
+            question_mapper: The mapper agent used to map questions to elements
+            slow_mode: Use one-by-one mapping (map_questions_to_elements) instead of the one-prompt mapper
+            element_sources: Optional sources tried before AgentQL. Each has `extract(page)` returning
+                             ExtractedElements or None, and may have `on_extracted(page, extracted, analysis)`
+                             which is called after every successful filtering pass (e.g. to populate caches)
+            save_debug_files: Write the accessibility tree to accessibility_tree_debug.json
+        """
+        self.question_mapper = question_mapper
+        self.slow_mode = slow_mode
+        self.element_sources = element_sources or []
+        self.save_debug_files = save_debug_files
+
+    def analyze(
+        self,
+        page,
+        element_filter: Optional[Callable[[PageAnalysis], None]] = None,
+        question_filter: Optional[Callable[[List[str]], List[str]]] = None,
+    ) -> Optional[PageAnalysis]:
+        """
+        Analyze the form on the page.
+
+        Args:
+            page: The AgentQL-wrapped Playwright page
+            element_filter: Optional hook that narrows analysis.elements/element_names/locators/selectors in place
+            question_filter: Optional hook that narrows the extracted question list
+
+        Returns:
+            The PageAnalysis, or None if no form elements were found
+        """
+        started = time.perf_counter()
+        timings = {}
+
+        extracted = self.extract_form_elements(page)
+        timings['extract_elements'] = time.perf_counter() - started
+        if extracted is None:
+            print("No form elements found or invalid response format.")
+            return None
+
+        step = time.perf_counter()
+        analysis = PageAnalysis(extracted=extracted, timings=timings)
+        self.filter_elements(page, analysis)
+        timings['filter_elements'] = time.perf_counter() - step
+
+        for source in self.element_sources:
+            if hasattr(source, 'on_extracted'):
+                source.on_extracted(page, extracted, analysis)
+
+        if element_filter:
+            element_filter(analysis)
+        print(f"\n✓ Total raw clickable locators: {len(analysis.locators)}")
+
+        step = time.perf_counter()
+        if extracted.question_data is not None:
+            application_questions_data = extracted.question_data
+        else:
+            application_questions_data = self.extract_application_questions(page)
+        timings['extract_questions'] = time.perf_counter() - step
+        print("\n=== Application Questions ===\n")
+
+        # Process application questions
+        if application_questions_data and isinstance(application_questions_data, dict):
+            print(json.dumps(application_questions_data, indent=2))
+            analysis.question_data = application_questions_data
+            if 'form' in application_questions_data and 'application_form_questions' in application_questions_data['form']:
+                analysis.questions = application_questions_data['form']['application_form_questions'] or []
+        else:
+            print("No application questions found or invalid response format.")
+
+        if question_filter:
+            analysis.questions = question_filter(analysis.questions)
+
+        # Create question elements for mapping (if available)
+        if analysis.questions:
+            question_data_json = json.dumps(analysis.question_data, indent=2)
+            analysis.question_elements = [QuestionElement(q, question_data_json) for q in analysis.questions]
+
+        timings['total'] = time.perf_counter() - started
+        return analysis
+
+    def extract_form_elements(self, page) -> Optional[ExtractedElements]:
+        """Extract form elements from the first element source that succeeds, falling back to AgentQL."""
+        for source in self.element_sources:
+            try:
+                extracted = source.extract(page)
+            except Exception as e:
+                print(f"Element source {type(source).__name__} failed: {e}")
+                extracted = None
+            if extracted is not None:
+                print(f"✅ Form elements provided by {extracted.source}")
+                return extracted
+
+        try:
+            # Use the AgentQL query_elements method
+            result = page.query_elements(WEB_ELEMENT_PROMPT, mode="standard", include_hidden=False)
+        except Exception as e:
+            print(f"Error extracting form elements: {e}")
+            return None
+
+        print("\n=== Form Elements ===\n")
+        if result:
+            print("Raw AgentQL output from WEB_ELEMENT_PROMPT:")
+            print(json.dumps(result.to_data(), indent=2))
+            print()
+        return ExtractedElements.from_agentql(result)
+
+    def extract_application_questions(self, page) -> Dict[str, Any]:
+        """Extract application questions using the application form prompt."""
+        try:
+            # Use the AgentQL query_data method
+            return page.query_data(APPLICATION_FORM_QUESTIONS_PROMPT, mode="standard")
+        except Exception as e:
+            print(f"Error extracting application questions: {e}")
+            return {}
+
+    def filter_elements(self, page, analysis: PageAnalysis) -> None:
+        """
+        Run post-extraction filtering and realign locators with the filtered elements.
+
+        Populates analysis.container_tf623_id, elements, element_names and locators.
+        """
+        extracted = analysis.extracted
+        raw_locators = extracted.all_locators()
+
+        if extracted.container is not None:
+            try:
+                analysis.container_tf623_id = tf623_id_of(extracted.container)
+                print(f"✅ Found container tf623_id: {analysis.container_tf623_id}")
+            except Exception as e:
+                print(f"❌ Could not extract container tf623_id: {e}")
+
+        if not analysis.container_tf623_id or extracted.names is not None:
+            print("❌ No container tf623_id found, using original filtering" if extracted.names is None else "✅ Using names provided by the element source")
+            analysis.element_names = extracted.fallback_names()
+            analysis.locators = raw_locators[:len(analysis.element_names)]
+            analysis.selectors = list(extracted.selectors or [None] * len(raw_locators))[:len(analysis.element_names)]
+            return
+
+        last_accessibility_tree = page.get_last_accessibility_tree()
+        if last_accessibility_tree and self.save_debug_files:
+            with open('accessibility_tree_debug.json', 'w') as f:
+                json.dump(last_accessibility_tree, f, indent=2)
+            print(f"✅ Accessibility tree saved to accessibility_tree_debug.json")
+
+        print("\n=== POST-EXTRACTION FILTERING ===")
+        print(f"\n📋 Original raw_locators count: {len(raw_locators)} items")
+
+        filtered_elements, element_names = process_form_elements(
+            raw_locators,
+            last_accessibility_tree,
+            analysis.container_tf623_id,
+            page=page
+        )
+
+        if not filtered_elements:
+            print("❌ No valid elements found after filtering")
+            return
+
+        # Align locators with filtered elements by tf623_id, read from the selectors (no page calls)
+        locators_by_id = {}
+        for raw_locator, tf623_id in zip(raw_locators, tf623_ids_of(raw_locators)):
+            locators_by_id.setdefault(tf623_id, raw_locator)
+
+        for filtered_elem, name in zip(filtered_elements, element_names):
+            locator = locators_by_id.get(filtered_elem.get('tf623_id'))
+            if locator is None:
+                continue
+            analysis.elements.append(filtered_elem)
+            analysis.element_names.append(name)
+            analysis.locators.append(locator)
+            # Page-level selectors cannot reach into iframes; those elements are driven through their locator
+            analysis.selectors.append(None if in_frame(locator) else f'[tf623_id="{filtered_elem.get("tf623_id")}"]')
+
+        print(f"\n📋 Final element names list ({len(analysis.element_names)} items):")
+        for i, name in enumerate(analysis.element_names):
+            print(f"  {i}: '{name}'")
+
+    def map_questions(self, analysis: PageAnalysis, page, previous: Optional[Dict[QuestionElement, List[WebElement]]] = None) -> Dict[QuestionElement, List[WebElement]]:
+        """
+        Map the analysis questions to its elements, then extract options for the mapped dropdowns.
+
+        Dropdown options are read through the mapped locators, so no extra AgentQL query is
+        needed to find the dropdowns, and options are assigned per question.
+
+        Args:
+            analysis: The PageAnalysis returned by analyze
+            page: The page the analysis was made on
+            previous: An earlier mapping of the same form. Questions it already mapped are
+                      re-bound to the current elements by name instead of being sent to the mapper.
+
+        Returns:
+            Dictionary mapping QuestionElement to list of WebElement objects (empty if nothing to map)
+        """
+        if not (analysis.element_names and analysis.questions):
+            print("\nCannot create mapping: missing elements or questions.")
+            return {}
+
+        print("\n=== Mapping Questions to Form Elements ===\n")
+        step = time.perf_counter()
+        mapping = self._reuse_mapping(analysis, previous) if previous else {}
+        reused = {question_element.question for question_element in mapping}
+        questions = [q for q in analysis.questions if q not in reused]
+        question_elements = [qe for qe in analysis.question_elements if qe.question not in reused]
+        if reused:
+            print(f"♻️ Reusing the previous mapping for {len(reused)} question(s), mapping {len(questions)}")
+        if questions and self.slow_mode:
+            # Traditional one-by-one mapping
+            mapping.update(self.question_mapper.map_questions_to_elements(questions, analysis.element_names, analysis.locators, json.dumps(analysis.question_data, indent=2)))
+        elif questions:
+            # Efficient one-prompt mapping
+            mapping.update(self.question_mapper.map_all_questions_to_elements(question_elements, analysis.element_names, analysis.locators))
+        analysis.timings['mapping'] = time.perf_counter() - step
+
+        # Attach CSS selectors so actions can be batched into single page evaluations
+        selectors_by_locator = {id(locator): selector for locator, selector in zip(analysis.locators, analysis.selectors)}
+        for elements in mapping.values():
+            for element in elements:
+                if element.locator is not None and element.selector is None:
+                    element.selector = selectors_by_locator.get(id(element.locator))
+
+        # Extract options for mapped dropdowns through their locators
+        step = time.perf_counter()
+        from dropdown_extractor import DropdownExtractor
+        options_by_question = DropdownExtractor(page.url).run_with_mapping(page, mapping)
+        for question_element, options in options_by_question.items():
+            question_element.options = options
+            analysis.dropdown_options[question_element.question] = options
+            print(f"Assigned options to '{question_element.question}': {len(options)} options")
+        analysis.timings['extract_dropdowns'] = time.perf_counter() - step
+
+        # Print the mapping
+        for question_element, elements in mapping.items():
+            print(f"\n{question_element.question} (Type: {question_element.question_type}):")
+            for element in elements:
+                has_locator = element.locator is not None
+                print(f"  - {element.name} {'(has Locator)' if has_locator else ''}")
+            if question_element.question_type == 'dropdown_question' and question_element.options:
+                print(f"  Options: {question_element.options}")
+
+        return mapping
+
+
+    @staticmethod
+    def _reuse_mapping(analysis: PageAnalysis, previous: Dict[QuestionElement, List[WebElement]]) -> Dict[QuestionElement, List[WebElement]]:
+        """
+        Re-bind previously mapped questions to the current elements by element name.
+
+        A question is reused only if it occurs once in both the previous mapping and the
+        current questions, and every element name it was mapped to is still present.
+        """
+        previous_by_question: Dict[str, List[List[WebElement]]] = {}
+        for question_element, elements in previous.items():
+            previous_by_question.setdefault(question_element.question, []).append(elements)
+
+        free_indices: Dict[str, List[int]] = {}
+        for i, name in enumerate(analysis.element_names):
+            free_indices.setdefault(name, []).append(i)
+
+        reused: Dict[QuestionElement, List[WebElement]] = {}
+        for question_element in analysis.question_elements:
+            candidates = previous_by_question.get(question_element.question, [])
+            if len(candidates) != 1 or analysis.questions.count(question_element.question) != 1:
+                continue
+            names = [element.name for element in candidates[0]]
+            if not names or any(len(free_indices.get(name, [])) < names.count(name) for name in set(names)):
+                continue
+            elements = []
+            for name in names:
+                i = free_indices[name].pop(0)
+                locator = analysis.locators[i] if i < len(analysis.locators) else None
+                selector = analysis.selectors[i] if i < len(analysis.selectors) else None
+                elements.append(WebElement(name=name, locator=locator, selector=selector))
+            reused[question_element] = elements
+        return reused
+
+
+def run_debug_menu(analysis: PageAnalysis) -> None:
+    """Interactive loop for clicking extracted elements by index."""
+    locators = analysis.locators
+    names = analysis.element_names
+
+    print("\n=== Interactive Element Testing ===\n")
+    print(f"You can click on any of the {len(locators)} valid elements by entering its index (0-{len(locators)-1})")
+    print("Enter 'q' or 'quit' to exit\n")
+
+    while True:
+        try:
+            user_input = input("Enter element index to click (or 'q' to quit): ").strip()
+
+            if user_input.lower() in ['q', 'quit']:
+                break
+
+            index = int(user_input)
+
+            if 0 <= index < len(locators):
+                element_name = names[index] if index < len(names) else f"element_{index}"
+                print(f"\nClicking on element [{index}]: {element_name}")
+                try:
+                    locators[index].click()
+                    print(f"✓ Successfully clicked on element [{index}]: {element_name}")
+                except Exception as e:
+                    print(f"✗ Failed to click on element [{index}]: {element_name} - {e}")
+            else:
+                print(f"Invalid index. Please enter a number between 0 and {len(locators)-1}")
+
+        except ValueError:
+            print("Invalid input. Please enter a number or 'q' to quit.")
+        except KeyboardInterrupt:
+            print("\nExiting...")
+            break
+        except Exception as e:
+            print(f"Error: {e}")
@@ -1,48 +1,27 @@
 import json
 
-def find_container_by_tf623_id(tree_data, target_id):
-    """
-    Recursively search through the accessibility tree to find
-    the container with the matching tf623_id
-    """
-    if isinstance(tree_data, dict):
-        # Check if this node has the target tf623_id (handle both string and int comparisons)
-        node_tf623_id = tree_data.get('attributes', {}).get('tf623_id')
-        if node_tf623_id is not None and str(node_tf623_id) == str(target_id):
-            return tree_data
-        
-        # Search in children if they exist
-        if 'children' in tree_data:
-            for child in tree_data['children']:
-                result = find_container_by_tf623_id(child, target_id)
-                if result:
-                    return result
-    
-    elif isinstance(tree_data, list):
-        # If it's a list, search through each item
-        for item in tree_data:
-            result = find_container_by_tf623_id(item, target_id)
-            if result:
-                return result
-    
-    return None
+from accessibility_tree import FlatAccessibilityTree, NO_NODE
+from visibility import evaluate_visibility, in_frame, tf623_id_of, UNKNOWN
+
 
 def contains_hidden(obj):
     """
-    Recursively check if an object contains the word "hidden" anywhere
-    in its structure (keys, values, or as part of larger strings)
+    Check if an object contains the word "hidden" anywhere
+    in its structure (keys, values, or as part of larger strings).
+    Iterative and stops at the first match.
     """
-    def search_in_value(value):
+    stack = [obj]
+    while stack:
+        value = stack.pop()
         if isinstance(value, str):
-            return "hidden" in value.lower()
+            if "hidden" in value.lower():
+                return True
         elif isinstance(value, dict):
-            return any(search_in_value(k) or search_in_value(v) for k, v in value.items())
+            stack.extend(value.keys())
+            stack.extend(value.values())
         elif isinstance(value, list):
-            return any(search_in_value(item) for item in value)
-        else:
-            return False
-    
-    return search_in_value(obj)
+            stack.extend(value)
+    return False
 
 def find_hidden_indexes(tags_data):
     """
@@ -75,155 +54,60 @@ def find_hidden_indexes(tags_data):
         return [], []
 
 
-def find_container_in_hierarchy(tf623_id, container_data, path="root"):
-    """
-    Recursively search for a container with the given tf623_id in the hierarchy
-    Returns the matching container and its path if found
-    """
-    # Check if current container matches (handle both string and int comparisons)
-    container_tf623_id = container_data.get('attributes', {}).get('tf623_id')
-    if container_tf623_id is not None:
-        # Convert both to strings for comparison to handle type mismatches
-        if str(container_tf623_id) == str(tf623_id):
-            return container_data, path
-    
-    # Search in children if they exist
-    if 'children' in container_data and isinstance(container_data['children'], list):
-        for i, child in enumerate(container_data['children']):
-            result, child_path = find_container_in_hierarchy(tf623_id, child, f"{path}.children[{i}]")
-            if result:
-                return result, child_path
-    
-    return None, None
-
-
-def find_name_in_children(container, depth=0, max_depth=5):
-    """
-    Recursively search through children to find a non-empty name
-    Returns the first non-empty name found, or None if none found
-    """
-    if depth > max_depth:
-        return None
-    
-    # Check if current container has a non-empty name
-    name = container.get('name', '').strip()
-    if name:
-        return name
-    
-    # Search in children if they exist
-    children = container.get('children', [])
-    if isinstance(children, list):
-        for child in children:
-            found_name = find_name_in_children(child, depth + 1, max_depth)
-            if found_name:
-                return found_name
-    
-    return None
-
-
-def find_sibling_labels(target_container, parent_container):
+def find_sibling_labels(tree, target_index, parent_index):
     """
     Search for sibling elements that might contain labels for the target element
     This looks for text elements, labels, or other elements with names that could be field labels
     """
-    if not parent_container or 'children' not in parent_container:
+    if parent_index == NO_NODE:
         return None
     
-    target_tf623_id = target_container.get('attributes', {}).get('tf623_id')
-    children = parent_container.get('children', [])
+    target_tf623_id = tree.tf623_id[target_index]
     
     # Look for sibling elements with names that could be labels
-    for sibling in children:
-        sibling_role = sibling.get('role', '')
-        sibling_name = sibling.get('name', '').strip()
-        sibling_tf623_id = sibling.get('attributes', {}).get('tf623_id')
-        
+    sibling = tree.first_child[parent_index]
+    while sibling != NO_NODE:
         # Skip the target element itself
-        if sibling_tf623_id == target_tf623_id:
-            continue
+        if tree.tf623_id[sibling] != target_tf623_id:
+            # Any sibling with a meaningful name is treated as a label
+            if tree.name[sibling]:
+                return tree.name[sibling]
             
-        # Look for elements that are likely labels (text, label roles, or elements with meaningful names)
-        if sibling_name and (sibling_role in ['text', 'label', 'static text', 'StaticText'] or sibling_name):
-            return sibling_name
-            
-        # Also recursively search within siblings for labels
-        if 'children' in sibling:
-            found_in_sibling = find_name_in_children(sibling, 0, 2)  # Limited depth for sibling search
-            if found_in_sibling:
-                return found_in_sibling
+            # Also search within siblings for labels (limited depth)
+            if tree.first_child[sibling] != NO_NODE:
+                found_in_sibling = tree.find_name_in_subtree(sibling, 2)
+                if found_in_sibling:
+                    return found_in_sibling
+        
+        sibling = tree.next_sibling[sibling]
     
     return None
 
 
-def find_parent_container_path(tf623_id, container_data, current_path=None, parent_path=None):
+def find_name_with_inside_out_search(tf623_id, tree, max_levels=5):
     """
-    Find the parent container path for a given tf623_id
-    Returns the parent container and the path to reach it
-    """
-    if current_path is None:
-        current_path = []
-    
-    # Check if current container matches the target tf623_id (handle both string and int comparisons)
-    container_tf623_id = container_data.get('attributes', {}).get('tf623_id')
-    if container_tf623_id is not None and str(container_tf623_id) == str(tf623_id):
-        return parent_path, current_path
-    
-    # Search in children
-    if 'children' in container_data and isinstance(container_data['children'], list):
-        for i, child in enumerate(container_data['children']):
-            child_path = current_path + [i]
-            result_parent, result_path = find_parent_container_path(
-                tf623_id, child, child_path, (container_data, current_path)
-            )
-            if result_parent is not None:
-                return result_parent, result_path
-    
-    return None, None
-
-
-def get_container_at_path(container_data, path):
-    """
-    Navigate to a container using the given path
-    """
-    current = container_data
-    for index in path:
-        if 'children' in current and isinstance(current['children'], list):
-            if 0 <= index < len(current['children']):
-                current = current['children'][index]
-            else:
-                return None
-        else:
-            return None
-    return current
-
-
-def find_name_with_inside_out_search(tf623_id, container_hierarchy, max_levels=5):
-    """
-    Implement inside-out search strategy:
+    Implement inside-out search strategy over a flattened accessibility tree:
     1. First search within the immediate container
     2. Search for sibling labels at the immediate parent level
     3. If nothing found, search within parent containers level by level
     4. Stop when we reach the boundary of the overall child group
     """
-    if not tf623_id or not container_hierarchy:
-        print(f"      ❌ Invalid input: tf623_id={tf623_id}, container_hierarchy={'present' if container_hierarchy else 'missing'}")
+    if not tf623_id or not tree:
+        print(f"      ❌ Invalid input: tf623_id={tf623_id}, container_hierarchy={'present' if tree else 'missing'}")
         return None
     
     print(f"      🎯 Starting inside-out search for tf623_id={tf623_id}")
     
-    # Find the target container and its parent path
-    target_container, target_path = find_container_in_hierarchy(tf623_id, container_hierarchy)
-    
-
-    if not target_container:
+    target = tree.find_by_tf623_id(tf623_id)
+    if target == NO_NODE:
         print(f"      ❌ Target element {tf623_id} not found in accessibility tree")
         return None
     
-    print(f"      ✅ Found target element: role={target_container.get('role', 'unknown')}")
+    print(f"      ✅ Found target element: role={tree.role[target] or 'unknown'}")
 
     # Step 1: Search within the immediate container
     print(f"      🔍 Step 1: Searching within immediate container")
-    found_name = find_name_in_children(target_container)
+    found_name = tree.find_name_in_subtree(target)
     if found_name:
         print(f"        ✅ Found name in immediate container: '{found_name}'")
         return found_name
@@ -232,68 +116,38 @@ def find_name_with_inside_out_search(tf623_id, container_hierarchy, max_levels=5
 
     # Step 2: Search for sibling labels at the immediate parent level
     print(f"      🔍 Step 2: Searching for sibling labels at immediate parent level")
-    parent_info, parent_path = find_parent_container_path(tf623_id, container_hierarchy)
-    
-    if parent_info:
-        # parent_info is a tuple (parent_container, parent_path)
-        parent_container, _ = parent_info
-        print(f"        📁 Found parent container: role={parent_container.get('role', 'unknown')}")
-        sibling_label = find_sibling_labels(target_container, parent_container)
-        if sibling_label:
-            print(f"        ✅ Found sibling label: '{sibling_label}'")
-            return sibling_label
-        else:
-            print(f"        ❌ No sibling labels found")
-    else:
+    parent = tree.parent[target]
+    if parent == NO_NODE:
         print(f"        ❌ No parent container found")
-
-    # Step 3: Search outward level by level (fallback)
-    if not parent_info:
         print(f"      ❌ Cannot continue search - no parent info available")
         return None
     
-    # parent_info is a tuple (parent_container, parent_path)
-    parent_container, current_search_path = parent_info
-    current_search_path = current_search_path.copy()
-    
+    print(f"        📁 Found parent container: role={tree.role[parent] or 'unknown'}")
+    sibling_label = find_sibling_labels(tree, target, parent)
+    if sibling_label:
+        print(f"        ✅ Found sibling label: '{sibling_label}'")
+        return sibling_label
+    else:
+        print(f"        ❌ No sibling labels found")
+
+    # Step 3: Search outward level by level, stopping below the tree root
     print(f"      🔍 Step 3: Searching outward level by level (max {max_levels} levels)")
-    # Search outward up to max_levels
+    ancestor = parent
     for level in range(max_levels):
-        if not current_search_path:
+        if tree.parent[ancestor] == NO_NODE:
             print(f"        Level {level}: No more parent paths available")
             break
-            
-        print(f"        Level {level}: Searching at path depth {len(current_search_path)}")
-        # Get the container at current search level
-        search_container = get_container_at_path(container_hierarchy, current_search_path)
-        
-        if not search_container:
-            print(f"        Level {level}: Could not access container")
-            break
-        
-        # First try to find sibling labels at this level
-        if level == 0:  # Only try sibling search at the first outward level
-            print(f"        Level {level}: Checking for sibling labels")
-            sibling_label = find_sibling_labels(target_container, search_container)
-            if sibling_label:
-                print(f"        Level {level}: ✅ Found sibling label: '{sibling_label}'")
-                return sibling_label
-            else:
-                print(f"        Level {level}: No sibling labels found")
         
-        # Fallback: Search within this level's container
         print(f"        Level {level}: Searching within container for names")
-        found_name = find_name_in_children(search_container)
-        
+        found_name = tree.find_name_in_subtree(ancestor)
         if found_name:
             print(f"        Level {level}: ✅ Found name in container: '{found_name}'")
             return found_name
         else:
             print(f"        Level {level}: No names found in container")
         
-        # Move up one level (remove last path element)
-        if current_search_path:
-            current_search_path.pop()
+        # Move up one level
+        ancestor = tree.parent[ancestor]
     
     print(f"      ❌ Inside-out search completed - no suitable name found")
     return None
@@ -304,19 +158,23 @@ def find_better_names_for_empty_containers(tags_data, container_data):
     Find better names for containers with empty names using inside-out search.
     
     Args:
-        tags_data: List of tag dictionaries
-        container_data: The accessibility tree data
+        tags_data: List of tag dictionaries (or a JSON string of them)
+        container_data: The accessibility tree data, raw or already flattened
     
     Returns:
-        Tuple of (filtered_tags_data, element_names)
+        Tuple of (filtered_tags_data, element_names); renamed elements are copies, the
+        input dicts are not modified
     """
     tags_list = json.loads(tags_data) if isinstance(tags_data, str) else tags_data
     
+    # Flatten the tree once and reuse it for every element
+    tree = container_data if isinstance(container_data, FlatAccessibilityTree) else FlatAccessibilityTree.from_tree(container_data)
+    
     filtered_tags = []
     element_names = []
     elements_to_remove = []
     
-    print(f"\n🔍 Processing {len(tags_list)} elements for name finding...")
+    print(f"\n🔍 Processing {len(tags_list)} elements for name finding ({len(tree)} tree nodes)...")
     
     for i, tag in enumerate(tags_list):
         current_name = tag.get('name', '')
@@ -328,12 +186,12 @@ def find_better_names_for_empty_containers(tags_data, container_data):
         if not current_name and tf623_id:
             # Try inside-out search for a better name
             print(f"    🔎 Searching for name for empty element {tf623_id}...")
-            better_name = find_name_with_inside_out_search(tf623_id, container_data)
+            better_name = find_name_with_inside_out_search(tf623_id, tree)
             
             if better_name:
                 print(f"    ✅ Found name: '{better_name}'")
-                # Update the tag with the better name
-                tag['name'] = better_name
+                # Name a copy, so the caller's dict is left untouched
+                tag = {**tag, 'name': better_name}
                 filtered_tags.append(tag)
                 element_names.append(better_name)
             else:
@@ -349,7 +207,24 @@ def find_better_names_for_empty_containers(tags_data, container_data):
     print(f"\n📊 Summary: {len(filtered_tags)} elements kept, {len(elements_to_remove)} elements removed")
     return filtered_tags, element_names
 
-def process_form_elements(form_elements_data, accessibility_tree, container_tf623_id):
+def _locator_to_dict(element, tf623_id):
+    """Read the attributes of an AgentQL Locator one by one (slow path when batching is unavailable)."""
+    element_dict = {
+        'tf623_id': tf623_id,
+        'name': element.get_attribute('name') or '',
+        'attributes': {},  # We'll populate this with specific attributes
+        'role': element.get_attribute('role') or ''
+    }
+    
+    # Get common attributes that might indicate hidden elements
+    for attr in ['type', 'style', 'class', 'hidden', 'aria-hidden', 'display']:
+        value = element.get_attribute(attr)
+        if value:
+            element_dict['attributes'][attr] = value
+    return element_dict
+
+
+def process_form_elements(form_elements_data, accessibility_tree, container_tf623_id, page=None):
     """
     Main API function to process form elements and return fully filtered elements with names.
     
@@ -357,6 +232,8 @@ def process_form_elements(form_elements_data, accessibility_tree, container_tf62
         form_elements_data: Raw form elements data from AgentQL (list of elements)
         accessibility_tree: Accessibility tree from the page
         container_tf623_id: The tf623_id of the main container
+        page: Optional Playwright page used for batched visibility evaluation.
+              Defaults to the page of the first locator.
     
     Returns:
         tuple: (filtered_elements_list, element_names_list)
@@ -364,26 +241,22 @@ def process_form_elements(form_elements_data, accessibility_tree, container_tf62
     try:
         # Step 1: Convert AgentQL elements to dict format and filter hidden elements
         parsed_tags = []
-        hidden_indexes = []
+        locators = []  # Parallel to parsed_tags, None for non-locator elements
         
         for i, element in enumerate(form_elements_data):
             # Convert AgentQL Locator element to dict format
             try:
                 if hasattr(element, 'get_attribute'):
-                    # AgentQL Locator object
+                    # AgentQL Locator object - the id comes from its selector, attributes are read in one batch below
                     element_dict = {
-                        'tf623_id': element.get_attribute('tf623_id') or '',
-                        'name': element.get_attribute('name') or '',
-                        'attributes': {},  # We'll populate this with specific attributes
-                        'role': element.get_attribute('role') or ''
+                        'tf623_id': tf623_id_of(element) or '',
+                        'name': '',
+                        'attributes': {},
+                        'role': ''
                     }
-                    
-                    # Get common attributes that might indicate hidden elements
-                    for attr in ['type', 'style', 'class', 'hidden', 'aria-hidden', 'display']:
-                        value = element.get_attribute(attr)
-                        if value:
-                            element_dict['attributes'][attr] = value
-                            
+                    locators.append(element)
+                    if page is None:
+                        page = getattr(element, 'page', None)
                 elif hasattr(element, 'tf623_id'):
                     # Object with direct attributes
                     element_dict = {
@@ -392,27 +265,49 @@ def process_form_elements(form_elements_data, accessibility_tree, container_tf62
                         'attributes': getattr(element, 'attributes', {}),
                         'role': getattr(element, 'role', '')
                     }
+                    locators.append(None)
                 else:
                     # Already in dict format
                     element_dict = element
+                    locators.append(None)
                 
                 parsed_tags.append(element_dict)
-                
-                # Check if element is hidden
-                if contains_hidden(element_dict):
-                    hidden_indexes.append(i)
                     
             except Exception as e:
                 print(f"❌ Error processing element {i}: {e}")
                 continue
         
+        # Evaluate real visibility of every top-document locator in a single browser round trip;
+        # iframe content is out of the script's reach and goes through the per-locator fallback
+        locator_ids = [
+            tag['tf623_id'] if locator is not None and not in_frame(locator) else None
+            for tag, locator in zip(parsed_tags, locators)
+        ]
+        visibility = evaluate_visibility(page, locator_ids) if any(locator_ids) else None
+        
+        hidden_bitmap = bytearray(len(parsed_tags))
+        for i, element_dict in enumerate(parsed_tags):
+            result = visibility[i] if visibility else None
+            try:
+                if result and result['hidden'] != UNKNOWN:
+                    element_dict['name'] = result['name']
+                    element_dict['role'] = result['role']
+                    if result['type']:
+                        element_dict['attributes']['type'] = result['type']
+                    hidden_bitmap[i] = result['hidden']
+                else:
+                    # Fall back to attribute inspection for elements the browser could not resolve
+                    if locators[i] is not None:
+                        element_dict = _locator_to_dict(locators[i], element_dict['tf623_id'])
+                        parsed_tags[i] = element_dict
+                    hidden_bitmap[i] = contains_hidden(element_dict)
+            except Exception as e:
+                print(f"❌ Error evaluating visibility of element {i}: {e}")
+        
         # Create filtered list without hidden elements
-        filtered_elements = []
-        for i, element in enumerate(parsed_tags):
-            if i not in hidden_indexes:
-                filtered_elements.append(element)
+        filtered_elements = [element for i, element in enumerate(parsed_tags) if not hidden_bitmap[i]]
         
-        print(f"✅ Filtered out {len(hidden_indexes)} hidden elements")
+        print(f"✅ Filtered out {len(parsed_tags) - len(filtered_elements)} hidden elements")
         print(f"✅ Remaining elements: {len(filtered_elements)}")
         
         # Step 2: Extract names from filtered elements
@@ -425,8 +320,7 @@ def process_form_elements(form_elements_data, accessibility_tree, container_tf62
         # The inside-out search needs access to the full tree, not just a sub-container
         if accessibility_tree:
             # Step 4: Find better names for empty containers
-            filtered_tags_json = json.dumps(filtered_elements, default=str)
-            improved_elements, improved_names = find_better_names_for_empty_containers(filtered_tags_json, accessibility_tree)
+            improved_elements, improved_names = find_better_names_for_empty_containers(filtered_elements, accessibility_tree)
             
             # Step 5: Use the improved elements and names
             filtered_elements = improved_elements
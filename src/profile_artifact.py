@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict
+
+from question_agent_prompt import build_system_prompt
+
+DEFAULT_PROFILE_PATH = "user_info.json"
+
+
+def _count_tokens(text: str) -> int:
+    """Approximate prompt size with the GPT-4 encoding (same approximation as the mapper)."""
+    try:
+        import tiktoken
+        return len(tiktoken.encoding_for_model("gpt-4").encode(text))
+    except Exception:
+        # Rough estimate when tiktoken or its encoding files are unavailable
+        return len(text) // 4
+
+
+@dataclass(frozen=True)
+class ProfileArtifact:
+    """
+    An applicant profile compiled once per job and shared by every URL in it.
+
+    cache_key is the SHA-256 of the rendered system prompt, which is also what the prompt
+    cache keys provider-side cached content on.
+    """
+    profile: Dict[str, Any]
+    system_prompt: str
+    token_count: int
+    cache_key: str
+    source: str = "inline"
+
+    @classmethod
+    def from_dict(cls, profile: Dict[str, Any], source: str = "inline") -> "ProfileArtifact":
+        """
+        Compile a parsed profile into an artifact.
+
+        Args:
+            profile: The parsed user profile (treated as read-only afterwards)
+            source: Where the profile came from, for logging
+
+        Returns:
+            The ProfileArtifact
+        """
+        system_prompt = build_system_prompt(profile)
+        artifact = cls(
+            profile=profile,
+            system_prompt=system_prompt,
+            token_count=_count_tokens(system_prompt),
+            cache_key=hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            source=source,
+        )
+        print(f"📦 Compiled profile from {source}: {artifact.token_count:,} prompt tokens, key {artifact.cache_key[:12]}")
+        return artifact
+
+    @classmethod
+    def from_path(cls, path: str) -> "ProfileArtifact":
+        """
+        Load and compile a profile JSON file.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"user_info.json not found at: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), source=path)
+
+
+@lru_cache(maxsize=4)
+def _load_profile(path: str, mtime: float) -> ProfileArtifact:
+    return ProfileArtifact.from_path(path)
+
+
+def load_profile(path: str = DEFAULT_PROFILE_PATH) -> ProfileArtifact:
+    """
+    Return the compiled profile at path, compiling it once per file version.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    resolved = os.path.abspath(path)
+    if not os.path.exists(resolved):
+        raise FileNotFoundError(f"user_info.json not found at: {path}")
+    return _load_profile(resolved, os.path.getmtime(resolved))
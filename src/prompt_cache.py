@@ -0,0 +1,274 @@
+"""
+Provider-side context caching for the large static system prompts.
+
+The answer agent's system prompt embeds the full user profile and rule framework, and the
+mapper prompts are long and static; all of them used to be resent as `system_instruction`
+on every call. `PromptCacheManager` creates Gemini cached content once per
+(model, prompt version, prompt hash), refreshes its TTL before it expires, and falls back
+to a plain `system_instruction` whenever caching is unavailable (prompt below the
+provider's minimum size, quota, unsupported model). `LocalPromptCache` is an offline
+stand-in with the same interface for tests and local runs (PROMPT_CACHE=local).
+
+Provider calls (create, refresh) are made outside the manager's lock: the first caller
+for a prompt marks it in flight and concurrent callers for the same prompt wait for it
+(or keep using the still-valid cache while it is refreshed), while other prompts proceed.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when the prompt templates change in a way the hash would not catch (e.g. model switch)
+PROMPT_CACHE_VERSION = "1"
+
+DEFAULT_TTL_SECONDS = 3600
+
+# Refresh the TTL when less than this much lifetime is left
+REFRESH_MARGIN_SECONDS = 300
+
+# After a failed create, send the prompt inline for this long before trying again
+RETRY_AFTER_SECONDS = 600
+
+
+@dataclass
+class CacheEntry:
+    """Provider cache state for one prompt."""
+    name: Optional[str]  # Provider cached-content name, None while caching is unavailable
+    expires_at: float  # Cache expiry, or the next retry time when name is None
+
+
+class PromptCacheManager:
+    """
+    Maps static system prompts to provider cached content.
+
+    Thread-safe; use get_prompt_cache() for the process-wide instance.
+    """
+
+    def __init__(self, client, ttl_seconds: int = DEFAULT_TTL_SECONDS, version: str = PROMPT_CACHE_VERSION):
+        """
+        Args:
+            client: The genai.Client used to create and refresh cached content
+            ttl_seconds: Lifetime of created cached content
+            version: Prompt version included in the cache key
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self.entries: Dict[Tuple[str, str, str], CacheEntry] = {}
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        # Keys whose cached content is being created or refreshed, set when done
+        self._in_flight: Dict[Tuple[str, str, str], threading.Event] = {}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return hit/miss/fallback counters for logging."""
+        return {"hits": self.hits, "misses": self.misses, "fallbacks": self.fallbacks, "prompts": len(self.entries)}
+
+    def _key(self, model: str, system_prompt: str) -> Tuple[str, str, str]:
+        return (model, self.version, hashlib.sha256(system_prompt.encode("utf-8")).hexdigest())
+
+    def config_for(self, model: str, system_prompt: str) -> Dict[str, Any]:
+        """
+        Return the GenerateContentConfig arguments that supply the system prompt.
+
+        Args:
+            model: The model the request goes to (cached content is model-specific)
+            system_prompt: The static system prompt
+
+        Returns:
+            {"cached_content": name} when the prompt is cached, else {"system_instruction": system_prompt}
+        """
+        key = self._key(model, system_prompt)
+        while True:
+            now = time.time()
+            with self._lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry.name is None and now < entry.expires_at:
+                    self.fallbacks += 1
+                    return {"system_instruction": system_prompt}
+
+                if entry is not None and entry.name is not None and now < entry.expires_at - REFRESH_MARGIN_SECONDS:
+                    self.hits += 1
+                    return {"cached_content": entry.name}
+
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    # This caller creates or refreshes the cache; others wait for it
+                    pending = self._in_flight[key] = threading.Event()
+                    break
+                if entry is not None and entry.name is not None and now < entry.expires_at:
+                    # Being refreshed, but still valid
+                    self.hits += 1
+                    return {"cached_content": entry.name}
+            pending.wait()
+
+        new_entry = None
+        try:
+            if entry is not None and entry.name is not None and self._refresh(entry.name):
+                new_entry = CacheEntry(name=entry.name, expires_at=now + self.ttl_seconds)
+                with self._lock:
+                    self.hits += 1
+                return {"cached_content": entry.name}
+
+            with self._lock:
+                self.misses += 1
+            name = self._create(model, system_prompt, key)
+            if name is None:
+                new_entry = CacheEntry(name=None, expires_at=now + RETRY_AFTER_SECONDS)
+                with self._lock:
+                    self.fallbacks += 1
+                return {"system_instruction": system_prompt}
+            new_entry = CacheEntry(name=name, expires_at=now + self.ttl_seconds)
+            print(f"📦 Created prompt cache {name} for {model} ({self.metrics()})")
+            return {"cached_content": name}
+        finally:
+            with self._lock:
+                if new_entry is not None:
+                    self.entries[key] = new_entry
+                del self._in_flight[key]
+            pending.set()
+
+    def invalidate(self, model: str, system_prompt: str) -> None:
+        """Forget the cached content of a prompt, e.g. after the provider rejected it."""
+        with self._lock:
+            self.entries.pop(self._key(model, system_prompt), None)
+
+    def generate_content(self, model: str, system_prompt: str, contents: Any, **config: Any):
+        """
+        Call generate_content with the system prompt supplied from the cache.
+
+        If the provider rejects the cached content (expired or deleted elsewhere), the
+        call is retried once with the prompt inline.
+
+        Args:
+            model: The model name
+            system_prompt: The static system prompt
+            contents: The request contents
+            **config: Remaining GenerateContentConfig fields (temperature, schema, ...)
+
+        Returns:
+            The provider response
+        """
+        from google.genai import types
+
+        prompt_config = self.config_for(model, system_prompt)
+        try:
+            return self.client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(**config, **prompt_config),
+            )
+        except Exception as e:
+            if "cached_content" not in prompt_config:
+                raise
+            print(f"Cached prompt rejected, retrying with inline system prompt: {e}")
+            self.invalidate(model, system_prompt)
+            return self.client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(**config, system_instruction=system_prompt),
+            )
+
+    def close(self) -> None:
+        """Delete all cached content created by this manager."""
+        with self._lock:
+            entries, self.entries = self.entries, {}
+        for entry in entries.values():
+            if entry.name is not None:
+                self._delete(entry.name)
+
+    def _create(self, model: str, system_prompt: str, key: Tuple[str, str, str]) -> Optional[str]:
+        from google.genai import types
+
+        try:
+            cached = self.client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name=f"kyro-v{key[1]}-{key[2][:12]}",
+                    system_instruction=system_prompt,
+                    ttl=f"{self.ttl_seconds}s",
+                ),
+            )
+            return cached.name
+        except Exception as e:
+            print(f"Prompt caching unavailable for {model}, sending prompt inline: {e}")
+            return None
+
+    def _refresh(self, name: str) -> bool:
+        from google.genai import types
+
+        try:
+            self.client.caches.update(
+                name=name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s"),
+            )
+        except Exception as e:
+            print(f"Could not refresh prompt cache {name}: {e}")
+            return False
+        return True
+
+    def _delete(self, name: str) -> None:
+        try:
+            self.client.caches.delete(name=name)
+        except Exception as e:
+            print(f"Could not delete prompt cache {name}: {e}")
+
+
+class LocalPromptCache(PromptCacheManager):
+    """
+    Offline stand-in for PromptCacheManager.
+
+    Tracks the same keys, TTLs and counters without provider calls and always sends the
+    prompt inline, so agents behave identically with a fake or offline client.
+    """
+
+    def config_for(self, model: str, system_prompt: str) -> Dict[str, Any]:
+        super().config_for(model, system_prompt)
+        return {"system_instruction": system_prompt}
+
+    def _create(self, model: str, system_prompt: str, key: Tuple[str, str, str]) -> Optional[str]:
+        return f"local/{key[2][:16]}"
+
+    def _refresh(self, name: str) -> bool:
+        return True
+
+    def _delete(self, name: str) -> None:
+        pass
+
+
+# One manager per client, keyed by id(client); each manager keeps its client alive
+_caches: Dict[int, PromptCacheManager] = {}
+_caches_lock = threading.Lock()
+
+
+def get_prompt_cache(client) -> PromptCacheManager:
+    """
+    Return the prompt cache for a client, creating it on first use.
+
+    Agents sharing a client share its cache. Set PROMPT_CACHE=local to use the offline
+    stand-in, or PROMPT_CACHE=off to always send prompts inline.
+    """
+    with _caches_lock:
+        cache = _caches.get(id(client))
+        if cache is None:
+            mode = os.getenv("PROMPT_CACHE", "provider").lower()
+            if mode in ("local", "off"):
+                cache = LocalPromptCache(client)
+            else:
+                cache = PromptCacheManager(client)
+            _caches[id(client)] = cache
+        return cache
+
+
+def close_prompt_cache() -> None:
+    """Delete the cached content of every client's prompt cache and forget the caches."""
+    with _caches_lock:
+        caches = list(_caches.values())
+        _caches.clear()
+    for cache in caches:
+        cache.close()
@@ -0,0 +1,67 @@
+"""
+Lazy provider layer for mapper, question-agent and pager backends.
+
+Backends are registered by name as "module:Class" strings and imported on first use, so a
+process only pays for the SDKs of the backends it actually runs: the default one-prompt
+mapper never loads the OpenAI SDK, and importing the backend worker loads no SDK at all.
+"""
+
+import importlib
+import threading
+from typing import Dict
+
+PROVIDERS: Dict[str, Dict[str, str]] = {
+    "mapper": {
+        "one_prompt": "one_prompt_gemini_question_mapper_agent:OnePromptQuestionMapperAgent",
+        "gemini": "gemini_question_mapper_agent:QuestionMapperAgent",
+        "gpt": "gpt_question_mapper_agent:QuestionMapperAgent",
+    },
+    "question_agent": {
+        "dual_model": "dual_model_question_agent:DualModelApplicationQuestionAgent",
+        "gemini": "gemini_question_agent:ApplicationQuestionAgent",
+    },
+    "pager": {
+        "one_pager": "one_pager:OnePagerApplicant",
+        "manual": "manual_pager:ManualPager",
+        "workday": "workday_pager:WorkdayPager",
+    },
+}
+
+_resolved: Dict[str, type] = {}
+_resolved_lock = threading.RLock()  # Reentrant: a backend module may resolve others on import
+
+
+def resolve(kind: str, name: str) -> type:
+    """
+    Import and return the backend class registered under kind/name.
+
+    Args:
+        kind: Provider kind ("mapper", "question_agent" or "pager")
+        name: Backend name within the kind
+
+    Returns:
+        The backend class
+
+    Raises:
+        ValueError: If no backend is registered under that name
+        ImportError: If the backend's module or class cannot be imported
+    """
+    try:
+        target = PROVIDERS[kind][name]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} provider '{name}'. Available: {sorted(PROVIDERS.get(kind, {}))}")
+
+    with _resolved_lock:
+        if target not in _resolved:
+            module_name, class_name = target.split(":")
+            try:
+                module = importlib.import_module(module_name)
+            except ModuleNotFoundError as e:
+                if e.name != module_name:
+                    raise
+                raise ImportError(f"{kind} provider '{name}' is not available: module '{module_name}' does not exist") from e
+            try:
+                _resolved[target] = getattr(module, class_name)
+            except AttributeError as e:
+                raise ImportError(f"{kind} provider '{name}' is not available: '{module_name}' has no '{class_name}'") from e
+        return _resolved[target]
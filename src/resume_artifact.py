@@ -0,0 +1,67 @@
+import mimetypes
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# Folder searched when no resume is passed in explicitly
+RESUME_DIR = Path(__file__).parent.parent / "resume"
+
+# Common resume file extensions, in order of preference
+RESUME_EXTENSIONS = ["*.pdf", "*.doc", "*.docx", "*.txt"]
+
+
+@dataclass(frozen=True)
+class ResumeArtifact:
+    """A resume file resolved once per application and passed to the action agent."""
+    path: str
+    filename: str
+    size: int
+    mime_type: Optional[str] = None
+
+    @classmethod
+    def from_path(cls, path: str) -> "ResumeArtifact":
+        """
+        Resolve a resume file into an artifact.
+
+        Args:
+            path: Path to the resume file
+
+        Returns:
+            The ResumeArtifact
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        resolved = Path(path).absolute()
+        if not resolved.is_file():
+            raise FileNotFoundError(f"Resume file not found at: {resolved}")
+        mime_type, _ = mimetypes.guess_type(resolved.name)
+        return cls(
+            path=str(resolved),
+            filename=resolved.name,
+            size=resolved.stat().st_size,
+            mime_type=mime_type,
+        )
+
+
+@lru_cache(maxsize=1)
+def resolve_default_resume() -> Optional[ResumeArtifact]:
+    """
+    Find the default resume in the resume folder.
+
+    The folder is scanned once per process; pass a ResumeArtifact explicitly when the
+    resume differs per application.
+
+    Returns:
+        The first resume found, or None if the folder has no resume
+    """
+    for ext in RESUME_EXTENSIONS:
+        for resume_file in RESUME_DIR.glob(ext):
+            if resume_file.is_file():
+                return ResumeArtifact.from_path(str(resume_file))
+
+    # Fallback to sample resume
+    sample = RESUME_DIR / "sample_resume.pdf"
+    return ResumeArtifact.from_path(str(sample)) if os.path.exists(sample) else None
@@ -0,0 +1,47 @@
+"""
+Lazily created process-wide instances.
+
+Caches, registries and pools that every applicant in the process shares are created on
+first use under a lock, so concurrent agents never build two of them:
+
+    _default_cache = LazySingleton(TemplateCache)
+
+    def get_template_cache() -> TemplateCache:
+        \"\"\"Return the process-wide template cache.\"\"\"
+        return _default_cache.get()
+"""
+
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazySingleton(Generic[T]):
+    """One instance of a factory's result per process, created on first get()."""
+
+    def __init__(self, factory: Callable[[], T]):
+        """
+        Args:
+            factory: Builds the instance; called at most once until reset()
+        """
+        self.factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Return the instance, creating it on first use."""
+        with self._lock:
+            if self._instance is None:
+                self._instance = self.factory()
+            return self._instance
+
+    def peek(self) -> Optional[T]:
+        """Return the instance if it was created, without creating it."""
+        return self._instance
+
+    def reset(self) -> Optional[T]:
+        """Forget the instance (the next get() creates a new one) and return the old one."""
+        with self._lock:
+            instance, self._instance = self._instance, None
+            return instance
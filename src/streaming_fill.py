@@ -0,0 +1,147 @@
+"""
+Streaming fill for long creative answers.
+
+A creative answer used to be generated in full and then typed, so one long textarea held
+up every field after it. `StreamingFill` consumes the model's stream on a background
+thread per answer while the action agent keeps filling the rest of the form. Only the
+page thread touches the page: `pump()` writes the text accumulated so far into each
+field between questions, and `finish()` waits for the streams and queues the final
+answers on the BatchFillExecutor, whose write + read-back is the final consistency write.
+"""
+
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+from elements import WebElement
+from fill_executor import BatchFillExecutor
+
+# Only rewrite a field once its answer has grown by this many characters
+MIN_PARTIAL_DELTA_CHARS = 80
+
+# Timeout for a partial write; a slow field just waits for the next pump
+PARTIAL_WRITE_TIMEOUT_MS = 2000
+
+
+class StreamingAnswer:
+    """One creative answer being streamed on a background thread."""
+
+    def __init__(self, web_element: WebElement, chunks: Callable[[], Iterable[str]]):
+        """
+        Args:
+            web_element: The field the answer goes into
+            chunks: Starts the stream and yields text chunks (called on the background thread)
+        """
+        self.web_element = web_element
+        self.written = ""
+        self.error: Optional[Exception] = None
+        self.started_at = time.time()
+        self._chunks: List[str] = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(chunks,), name="creative-stream", daemon=True)
+        self._thread.start()
+
+    def _run(self, chunks: Callable[[], Iterable[str]]) -> None:
+        try:
+            for chunk in chunks():
+                with self._lock:
+                    self._chunks.append(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    @property
+    def text(self) -> str:
+        """The answer accumulated so far."""
+        with self._lock:
+            return "".join(self._chunks)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the stream to end. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+
+class StreamingFill:
+    """Tracks streaming answers and writes them into their fields from the page thread."""
+
+    def __init__(self, min_delta_chars: int = MIN_PARTIAL_DELTA_CHARS):
+        self.min_delta_chars = min_delta_chars
+        self.answers: List[StreamingAnswer] = []
+
+    def start(self, web_element: WebElement, chunks: Callable[[], Iterable[str]]) -> StreamingAnswer:
+        """
+        Start streaming an answer for a field.
+
+        Args:
+            web_element: The text input or textarea to fill
+            chunks: Starts the model stream and yields text chunks
+
+        Returns:
+            The StreamingAnswer
+        """
+        answer = StreamingAnswer(web_element, chunks)
+        self.answers.append(answer)
+        print(f"🔄 Streaming creative answer for '{web_element.name}' in the background")
+        return answer
+
+    def pump(self) -> int:
+        """
+        Write the partial text of every streaming answer that has grown enough.
+
+        Must be called from the page thread.
+
+        Returns:
+            Number of fields written
+        """
+        written = 0
+        for answer in self.answers:
+            text = answer.text
+            if answer.done or len(text) - len(answer.written) < self.min_delta_chars:
+                continue
+            try:
+                answer.web_element.locator.fill(text, timeout=PARTIAL_WRITE_TIMEOUT_MS)
+                answer.written = text
+                written += 1
+            except Exception as e:
+                print(f"Partial write to '{answer.web_element.name}' skipped: {e}")
+        return written
+
+    def finish(self, fill_executor: BatchFillExecutor, timeout: float = 90.0) -> int:
+        """
+        Wait for all streams and queue their final answers for the consistency write.
+
+        Args:
+            fill_executor: Executor whose flush() writes and verifies the final answers
+            timeout: Overall time to wait for the streams, in seconds
+
+        Returns:
+            Number of answers queued or written
+        """
+        deadline = time.time() + timeout
+        completed = 0
+        for answer in self.answers:
+            if not answer.wait(max(0.0, deadline - time.time())):
+                print(f"❌ Creative answer for '{answer.web_element.name}' still streaming after {timeout:.0f}s, keeping partial text")
+            elif answer.error is not None:
+                print(f"❌ Creative stream for '{answer.web_element.name}' failed: {answer.error}")
+
+            final_text = answer.text.strip()
+            if not final_text:
+                continue
+            elapsed = time.time() - answer.started_at
+            print(f"✓ Streamed creative answer for '{answer.web_element.name}' ({len(final_text)} chars, {elapsed:.1f}s): {final_text}")
+            if not fill_executor.add(answer.web_element, final_text):
+                try:
+                    answer.web_element.locator.fill(final_text)
+                except Exception as e:
+                    print(f"Error filling '{answer.web_element.name}': {e}")
+                    continue
+            completed += 1
+        self.answers = []
+        return completed
@@ -0,0 +1,172 @@
+"""
+Shared structured-output layer for the LLM agents.
+
+Every structured call requests `response_mime_type="application/json"` with the Pydantic
+schema, and its text goes through `parse_structured`: code fences are stripped, the text is
+validated with `model_validate_json`, and JSON cut off by the output token limit is repaired
+locally before giving up. `generate_structured` retries only the call whose output could not
+be parsed, so one bad answer no longer costs a rerun of the whole form.
+"""
+
+from typing import Any, Callable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+JSON_MIME_TYPE = "application/json"
+
+# Most recent cut points tried when repairing truncated JSON
+MAX_REPAIR_CANDIDATES = 20
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a model response cannot be parsed into its schema."""
+
+    def __init__(self, message: str, raw_text: Optional[str] = None):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+
+def json_config(schema: Type[BaseModel]) -> dict:
+    """Return the GenerateContentConfig fields that constrain decoding to a schema."""
+    return {"response_mime_type": JSON_MIME_TYPE, "response_schema": schema}
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove a surrounding ```json ... ``` (or bare ```) fence, if present."""
+    text = text.strip()
+    if not text.startswith("```"):
+        return text
+    lines = text.split("\n")
+    lines = lines[1:]
+    if lines and lines[-1].strip().startswith("```"):
+        lines = lines[:-1]
+    return "\n".join(lines).strip()
+
+
+def _closers(stack: List[str]) -> str:
+    return "".join(reversed(stack))
+
+
+def repair_candidates(text: str) -> List[str]:
+    """
+    Candidate repairs of JSON that was cut off mid-output, most complete first.
+
+    The first candidate closes the open string and containers as they are (keeps a
+    truncated trailing string value such as a long reasoning); the others cut back to the
+    last complete members and close from there. Candidates are not checked for validity.
+
+    Args:
+        text: The (possibly truncated) JSON text
+
+    Returns:
+        The candidate texts
+    """
+    stack: List[str] = []
+    cut_points: List[Tuple[int, List[str]]] = []
+    in_string = False
+    escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            cut_points.append((i + 1, list(stack)))
+        elif ch == ",":
+            # Everything before a separator is a complete member
+            cut_points.append((i, list(stack)))
+
+    tail = text[:-1] if escape else text
+    candidates = [tail + ('"' if in_string else "") + _closers(stack)]
+    for position, open_stack in reversed(cut_points[-MAX_REPAIR_CANDIDATES:]):
+        candidates.append(text[:position] + _closers(open_stack))
+    return candidates
+
+
+def parse_structured(text: Optional[str], schema: Type[T]) -> T:
+    """
+    Parse model output into a schema instance.
+
+    Args:
+        text: The response text
+        schema: The Pydantic model the response was constrained to
+
+    Returns:
+        The validated schema instance
+
+    Raises:
+        StructuredOutputError: If the text is empty or cannot be parsed even after repair
+    """
+    if not text or not text.strip():
+        raise StructuredOutputError("LLM returned empty response", text)
+
+    cleaned = strip_code_fences(text)
+    try:
+        return schema.model_validate_json(cleaned)
+    except ValidationError as e:
+        error = e
+
+    # Validate every repair against the schema: the first JSON-valid one may lack required fields
+    for repaired in repair_candidates(cleaned):
+        if repaired == cleaned:
+            continue
+        try:
+            result = schema.model_validate_json(repaired)
+        except ValidationError:
+            continue
+        print(f"🔧 Repaired truncated {schema.__name__} JSON ({len(cleaned)} -> {len(repaired)} chars)")
+        return result
+    raise StructuredOutputError(f"LLM returned unparseable {schema.__name__}: {error}", text)
+
+
+def _response_text(response: Any) -> Optional[str]:
+    return getattr(response, "text", None)
+
+
+def generate_structured(
+    call: Callable[[], Any],
+    schema: Type[T],
+    retries: int = 1,
+    text_of: Callable[[Any], Optional[str]] = _response_text,
+) -> T:
+    """
+    Make a structured call and parse it, retrying only this call on unparseable output.
+
+    Args:
+        call: Makes the provider request (already configured with json_config(schema))
+        schema: The Pydantic model to parse into
+        retries: Extra attempts after an unparseable response
+        text_of: Extracts the text from a provider response (defaults to response.text)
+
+    Returns:
+        The validated schema instance
+
+    Raises:
+        StructuredOutputError: If every attempt returned unparseable output
+        Exception: Provider errors from call() are not retried here
+    """
+    last_error: Optional[StructuredOutputError] = None
+    for attempt in range(retries + 1):
+        response = call()
+        parsed = getattr(response, "parsed", None)
+        if isinstance(parsed, schema):
+            return parsed
+        try:
+            return parse_structured(text_of(response), schema)
+        except StructuredOutputError as e:
+            last_error = e
+            if attempt < retries:
+                print(f"🔄 {e}; retrying this call ({attempt + 1}/{retries})")
+    raise last_error
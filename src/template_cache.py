@@ -0,0 +1,256 @@
+"""
+Per-domain extraction template cache for AgentQL element queries.
+
+Applications on the same ATS host reuse a handful of form templates. After a successful
+AgentQL extraction, `TemplateCache` stores the selector-level result keyed by
+(host, structural fingerprint of the form container). On a later page with the same
+fingerprint, locators are rebuilt locally instead of calling `query_elements`. Entries
+whose selectors no longer resolve are invalidated automatically.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from dom_scripts import CLEAN_JS, LABEL_JS, PATH_JS, STAMP_JS
+from json_store import load_json, save_json_atomic
+from page_analyzer import ExtractedElements, PageAnalysis
+from singleton import LazySingleton
+from visibility import in_frame, tf623_ids_of
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "agentql_templates.json")
+
+# Form container and container-relative structural paths (nth-of-type CSS, persisted in the cache)
+CONTAINER_JS = CLEAN_JS + LABEL_JS + PATH_JS + """
+    const pickContainer = () => {
+        let best = null, bestCount = 0;
+        document.querySelectorAll('form, [role="form"]').forEach((form) => {
+            const count = form.querySelectorAll('input, select, textarea, [role="combobox"]').length;
+            if (count > bestCount) { best = form; bestCount = count; }
+        });
+        return best || document.body;
+    };
+    const container = pickContainer();
+    const pathOf = (el) => pathParts(el, container).map((part) => `${part.tag}:nth-of-type(${part.index})`).join(' > ');
+    const labelOf = (el) => {
+        const direct = directLabelOf(el);
+        if (direct) return direct;
+        const text = clean(el.innerText);
+        if (text && text.length < 100) return text;
+        return clean(el.getAttribute('placeholder') || el.getAttribute('name') || el.value);
+    };
+"""
+
+FINGERPRINT_SCRIPT = """
+() => {
+""" + CONTAINER_JS + """
+    // Tag/role/type skeleton of the container, without any text or ids
+    const parts = [];
+    const walk = (node, depth) => {
+        for (const child of node.children) {
+            const role = child.getAttribute('role') || '';
+            const type = child.getAttribute('type') || '';
+            parts.push(`${depth}:${child.tagName}${role ? '@' + role : ''}${type ? '#' + type : ''}`);
+            walk(child, depth + 1);
+        }
+    };
+    walk(container, 0);
+    return parts.join(',');
+}
+"""
+
+SELECTORS_SCRIPT = """
+(ids) => {
+""" + CONTAINER_JS + """
+    return ids.map((id) => {
+        const el = document.querySelector(`[tf623_id="${CSS.escape(String(id))}"]`);
+        if (!el) return null;
+        return el === container ? ':scope' : pathOf(el);
+    });
+}
+"""
+
+RESOLVE_SCRIPT = """
+(selectors) => {
+""" + CONTAINER_JS + STAMP_JS + """
+    return selectors.map((selector) => {
+        const matches = selector === ':scope' ? [container] : container.querySelectorAll(`:scope > ${selector}`);
+        if (matches.length !== 1) return { count: matches.length, id: null, label: '' };
+        const el = matches[0];
+        // Stamp the element so the Python side can build a plain attribute locator
+        return { count: 1, id: stamp(el), label: labelOf(el) };
+    });
+}
+"""
+
+
+class TemplateCache:
+    """
+    Element source that replays cached AgentQL element extractions for known form templates.
+
+    Thread-safe; a single instance is meant to be shared by every applicant in the process.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH):
+        """
+        Args:
+            path: JSON file used to persist templates across runs (None keeps the cache in memory)
+        """
+        self.path = path
+        self.templates: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        # id(page) -> (url, key) of the last miss, so on_extracted does not fingerprint the page again
+        self._miss_keys: Dict[int, Tuple[str, str]] = {}
+        self._load()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return hit/miss/invalidation counters for logging."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hit_rate, 3),
+            "templates": len(self.templates),
+        }
+
+    def _load(self) -> None:
+        self.templates = load_json(self.path, "template cache") or {}
+
+    def _save(self) -> None:
+        save_json_atomic(self.path, self.templates, "template cache")
+
+    def fingerprint(self, page) -> Optional[str]:
+        """Return the cache key (host + skeleton hash) for the form on the page."""
+        try:
+            skeleton = page.evaluate(FINGERPRINT_SCRIPT)
+        except Exception as e:
+            print(f"❌ Could not fingerprint form container: {e}")
+            return None
+        host = (urlparse(page.url).hostname or "").lower()
+        return f"{host}:{hashlib.sha1(skeleton.encode('utf-8')).hexdigest()}"
+
+    def extract(self, page) -> Optional[ExtractedElements]:
+        """
+        Rebuild form element locators from a cached template.
+
+        Returns:
+            ExtractedElements with locally computed names, or None on a miss or invalidated entry
+        """
+        key = self.fingerprint(page)
+        with self._lock:
+            template = self.templates.get(key) if key else None
+            if template is None:
+                self.misses += 1
+                if key:
+                    self._miss_keys[id(page)] = (page.url, key)
+                print(f"📦 Template cache miss ({self.metrics()})")
+                return None
+
+        groups = template["radio_checkbox_groups"]
+        selectors = template["input_text"] + template["dropdowns"] + [s for group in groups for s in group] + template["resume"]
+        try:
+            resolved = page.evaluate(RESOLVE_SCRIPT, selectors)
+        except Exception as e:
+            print(f"❌ Could not resolve cached selectors: {e}")
+            resolved = []
+
+        if len(resolved) != len(selectors) or any(r["count"] != 1 for r in resolved):
+            with self._lock:
+                self.templates.pop(key, None)
+                self.invalidations += 1
+                self.misses += 1
+                self._save()
+            print(f"📦 Template cache entry invalidated - selectors no longer resolve ({self.metrics()})")
+            return None
+
+        with self._lock:
+            self.hits += 1
+        print(f"📦 Template cache hit ({self.metrics()})")
+
+        # Rebuild locators in the same order the selectors were flattened
+        locators = iter([page.locator(f'[data-kyro-id="{r["id"]}"]') for r in resolved])
+        extracted = ExtractedElements(
+            input_text=[next(locators) for _ in template["input_text"]],
+            dropdowns=[next(locators) for _ in template["dropdowns"]],
+            radio_checkbox_groups=[[next(locators) for _ in group] for group in groups],
+            resume=[next(locators) for _ in template["resume"]],
+            source="template_cache",
+        )
+        # Names come from the live page: postings sharing a skeleton can label their questions differently
+        extracted.names = [r["label"] for r in resolved]
+        extracted.selectors = [f'[data-kyro-id="{r["id"]}"]' for r in resolved]
+        return extracted
+
+    def on_extracted(self, page, extracted: ExtractedElements, analysis: PageAnalysis) -> None:
+        """
+        Store the selectors of a successful AgentQL extraction.
+
+        Only the elements that survived post-extraction filtering are stored, so a cache hit
+        replays the filtered element set (names are always read from the live page).
+        """
+        with self._lock:
+            miss = self._miss_keys.pop(id(page), None)
+        if extracted.source != "agentql" or not analysis.locators:
+            return
+        if any(in_frame(locator) for locator in analysis.locators):
+            # Cached selectors are resolved in the top document only
+            print("📦 Not caching template - form elements inside an iframe")
+            return
+
+        # Reuse the key computed on the miss unless the page navigated since
+        key = miss[1] if miss and miss[0] == page.url else self.fingerprint(page)
+        if not key:
+            return
+
+        # tf623 ids are read from the locators' selectors, no browser round trip per element
+        filtered_ids = {tf623_id for tf623_id in tf623_ids_of(analysis.locators) if tf623_id}
+
+        def kept(locators) -> List[str]:
+            return [tf623_id for tf623_id in tf623_ids_of(locators) if tf623_id in filtered_ids]
+
+        groups = [ids for ids in (kept(group) for group in extracted.radio_checkbox_groups) if ids]
+        grouped_ids = [kept(extracted.input_text), kept(extracted.dropdowns), groups, kept(extracted.resume)]
+        ids = grouped_ids[0] + grouped_ids[1] + [i for group in groups for i in group] + grouped_ids[3]
+        if not ids:
+            return
+
+        try:
+            paths = page.evaluate(SELECTORS_SCRIPT, ids)
+        except Exception as e:
+            print(f"❌ Could not compute selectors for template cache: {e}")
+            return
+
+        if any(path is None for path in paths):
+            print("📦 Not caching template - some elements could not be located")
+            return
+
+        cursor = iter(paths)
+        template = {
+            "input_text": [next(cursor) for _ in grouped_ids[0]],
+            "dropdowns": [next(cursor) for _ in grouped_ids[1]],
+            "radio_checkbox_groups": [[next(cursor) for _ in group] for group in groups],
+            "resume": [next(cursor) for _ in grouped_ids[3]],
+        }
+
+        with self._lock:
+            self.templates[key] = template
+            self._save()
+        print(f"📦 Cached extraction template {key} ({len(ids)} filtered elements)")
+
+
+_default_cache = LazySingleton(TemplateCache)
+
+
+def get_template_cache() -> TemplateCache:
+    """Return the process-wide template cache."""
+    return _default_cache.get()
@@ -0,0 +1,118 @@
+"""
+Batched, in-browser visibility evaluation for extracted form elements.
+
+Instead of searching every extracted element's attributes for the substring "hidden"
+in Python, a single `page.evaluate` resolves each element by its tf623_id and computes
+its real visibility (computed display/visibility, aria-hidden ancestors, zero-size
+boxes and off-document positioning). The script only sees the top document, so
+elements inside iframes are reported UNKNOWN and left to the per-locator fallback.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+# AgentQL locators are built as locator("[tf623_id='<id>']"), which shows in their repr.
+# Inside an iframe the selector is "[tf623_id='<frame>'] >> internal:control=enter-frame >> [tf623_id='<id>']",
+# so the element's own id is the last match.
+LOCATOR_ID_PATTERN = re.compile(r"""\[tf623_id=['"]?([^'"\]]+)['"]?\]""")
+
+# Selector step that scopes the rest of a locator's selector to an iframe
+ENTER_FRAME = "internal:control=enter-frame"
+
+# Bitmap values returned per element
+VISIBLE = 0
+HIDDEN = 1
+UNKNOWN = -1  # Element could not be resolved in the DOM
+
+VISIBILITY_SCRIPT = """
+(ids) => {
+    const isRendered = (el) => {
+        for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+            if (node.getAttribute('aria-hidden') === 'true' || node.hasAttribute('hidden')) return false;
+            const style = window.getComputedStyle(node);
+            if (style.display === 'none') return false;
+            if (node === el && (style.visibility === 'hidden' || style.visibility === 'collapse')) return false;
+        }
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 && rect.height === 0) return false;
+        // Positioned off the document (e.g. left: -9999px) rather than just scrolled away
+        if (rect.right + window.scrollX < 0 || rect.bottom + window.scrollY < 0) return false;
+        return true;
+    };
+
+    return ids.map((id) => {
+        if (!id) return { hidden: -1 };
+        const el = document.querySelector(`[tf623_id="${CSS.escape(String(id))}"]`);
+        if (!el) return { hidden: -1 };
+
+        let visible = isRendered(el);
+        // Custom radios, checkboxes and file inputs often hide the native input behind a visible label
+        if (!visible && el.labels && el.labels.length) {
+            visible = Array.from(el.labels).some(isRendered);
+        }
+
+        return {
+            hidden: visible ? 0 : 1,
+            name: el.getAttribute('name') || '',
+            role: el.getAttribute('role') || '',
+            type: el.getAttribute('type') || '',
+        };
+    });
+}
+"""
+
+
+def _selector_text(locator) -> str:
+    # Locator repr is "<Locator frame=<Frame ...> selector='...'>"; skip the frame part (its URL is arbitrary text)
+    text = repr(locator)
+    start = text.rfind(" selector=")
+    return text[start:] if start >= 0 else text
+
+
+def in_frame(locator) -> bool:
+    """Whether a locator targets an element inside an iframe."""
+    return ENTER_FRAME in _selector_text(locator)
+
+
+def tf623_id_of(locator) -> Optional[str]:
+    """
+    Return the tf623_id an AgentQL locator targets, read from its selector without a browser round trip.
+
+    For locators inside an iframe this is the element's id, not the iframe's. Falls back to
+    reading the attribute for locators built some other way.
+    """
+    matches = LOCATOR_ID_PATTERN.findall(_selector_text(locator))
+    if matches:
+        return matches[-1]
+    try:
+        return locator.get_attribute("tf623_id")
+    except Exception:
+        return None
+
+
+def tf623_ids_of(locators: List[Any]) -> List[Optional[str]]:
+    """Return the tf623_id of each locator, in order (see tf623_id_of)."""
+    return [tf623_id_of(locator) for locator in locators]
+
+
+def evaluate_visibility(page, tf623_ids: List[Optional[str]]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Evaluate the visibility of all elements in one browser round trip.
+
+    Args:
+        page: The Playwright page the elements belong to
+        tf623_ids: The tf623_id of each element, in order (None for elements to skip, e.g. in iframes)
+
+    Returns:
+        A list (parallel to tf623_ids) of dicts with a `hidden` bitmap value (VISIBLE, HIDDEN
+        or UNKNOWN) plus the element's name, role and type attributes, or None if the
+        evaluation failed
+    """
+    if page is None or not tf623_ids:
+        return None
+
+    try:
+        return page.evaluate(VISIBILITY_SCRIPT, list(tf623_ids))
+    except Exception as e:
+        print(f"❌ Batched visibility evaluation failed: {e}")
+        return None
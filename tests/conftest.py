@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# src/ modules import each other by flat name; backend/ is imported as a package from the root
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,109 @@
+import sys
+import threading
+import time
+import types
+
+import prompt_cache
+from prompt_cache import LocalPromptCache, PromptCacheManager, REFRESH_MARGIN_SECONDS
+
+
+class FakeCaches:
+    """Stands in for client.caches; create() can be held open to simulate a slow provider."""
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.release = {}  # display-name prefix -> Event create() waits on
+
+    def create(self, model, config):
+        for prefix, event in self.release.items():
+            if config.display_name.startswith(prefix):
+                event.wait(5)
+        self.created.append(config.display_name)
+        return type("Cached", (), {"name": f"cachedContents/{len(self.created)}"})()
+
+    def update(self, name, config):
+        self.updated.append(name)
+
+
+class FakeClient:
+    def __init__(self):
+        self.caches = FakeCaches()
+
+
+class FakeTypes:
+    """Minimal google.genai.types used by PromptCacheManager."""
+
+    class CreateCachedContentConfig:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    UpdateCachedContentConfig = CreateCachedContentConfig
+
+
+def install_fake_genai(monkeypatch):
+    genai = types.ModuleType("google.genai")
+    genai.types = FakeTypes
+    google = types.ModuleType("google")
+    google.genai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.genai", genai)
+
+
+def test_local_cache_counts_miss_then_hit_and_sends_prompt_inline():
+    cache = LocalPromptCache(FakeClient())
+
+    assert cache.config_for("model", "prompt") == {"system_instruction": "prompt"}
+    assert cache.config_for("model", "prompt") == {"system_instruction": "prompt"}
+
+    assert cache.metrics() == {"hits": 1, "misses": 1, "fallbacks": 0, "prompts": 1}
+
+
+def test_local_cache_refreshes_entries_close_to_expiry():
+    cache = LocalPromptCache(FakeClient(), ttl_seconds=3600)
+    cache.config_for("model", "prompt")
+    entry = next(iter(cache.entries.values()))
+    entry.expires_at = time.time() + REFRESH_MARGIN_SECONDS / 2
+
+    cache.config_for("model", "prompt")
+
+    refreshed = next(iter(cache.entries.values()))
+    assert refreshed.name == entry.name
+    assert refreshed.expires_at > time.time() + 3000
+    assert cache.metrics()["hits"] == 1
+    assert cache.metrics()["misses"] == 1
+
+
+def test_concurrent_callers_create_one_cache_without_blocking_other_prompts(monkeypatch):
+    install_fake_genai(monkeypatch)
+    client = FakeClient()
+    cache = PromptCacheManager(client)
+    slow_key = cache._key("model", "slow prompt")
+    client.caches.release[f"kyro-v{slow_key[1]}-{slow_key[2][:12]}"] = release_slow = threading.Event()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.config_for("model", "slow prompt"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    # Another prompt is served while the slow one is still being created
+    assert cache.config_for("model", "fast prompt") == {"cached_content": "cachedContents/1"}
+
+    release_slow.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(client.caches.created) == 2
+    assert results == [{"cached_content": "cachedContents/2"}] * 4
+    assert cache.metrics()["misses"] == 2
+
+
+def test_prompt_caches_are_kept_per_client():
+    first, second = FakeClient(), FakeClient()
+    try:
+        assert prompt_cache.get_prompt_cache(first) is prompt_cache.get_prompt_cache(first)
+        assert prompt_cache.get_prompt_cache(first) is not prompt_cache.get_prompt_cache(second)
+        assert prompt_cache.get_prompt_cache(second).client is second
+    finally:
+        prompt_cache.close_prompt_cache()
+    assert prompt_cache._caches == {}
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.session_pool import EXPIRY_MARGIN_SECONDS, PooledSession, SessionPool
+
+
+class FakeProvider:
+    """Stands in for BrowserbaseProvider / LocalCDPProvider without starting browsers."""
+
+    def __init__(self, ttl_seconds: float = 900):
+        self.ttl_seconds = ttl_seconds
+        self.created = 0
+        self.released = []
+
+    def create(self) -> PooledSession:
+        self.created += 1
+        return PooledSession(
+            id=f"fake-{self.created}",
+            connect_url=f"ws://fake/{self.created}",
+            expires_at=time.time() + self.ttl_seconds,
+            reusable=True,
+        )
+
+    def release(self, session: PooledSession) -> None:
+        self.released.append(session.id)
+
+
+def test_warm_sessions_are_acquired_released_and_reused():
+    async def scenario():
+        provider = FakeProvider()
+        pool = SessionPool(provider, size=1, max_uses=2)
+
+        assert await pool.warm() == 1
+        session = await pool.acquire()
+        assert session.uses == 1
+        await pool.release(session)
+        assert pool.idle == [session]
+
+        again = await pool.acquire()
+        assert again is session and again.uses == 2
+
+        # Out of uses: released at the provider instead of recycled
+        await pool.release(again)
+        assert provider.released == [session.id]
+        assert pool.metrics() == {"idle": 0, "in_use": 0, "created": 1, "reused": 1}
+
+    asyncio.run(scenario())
+
+
+def test_sessions_close_to_expiry_are_released_instead_of_handed_out():
+    async def scenario():
+        provider = FakeProvider()
+        pool = SessionPool(provider, size=1)
+        await pool.warm()
+        stale = pool.idle[0]
+        stale.expires_at = time.time() + EXPIRY_MARGIN_SECONDS / 2
+
+        session = await pool.acquire()
+
+        assert session is not stale
+        assert provider.released == [stale.id]
+        assert provider.created == 2
+
+    asyncio.run(scenario())
+
+
+def test_unhealthy_sessions_are_not_recycled():
+    async def scenario():
+        provider = FakeProvider()
+        pool = SessionPool(provider, size=1)
+        session = await pool.acquire()
+
+        await pool.release(session, healthy=False)
+
+        assert pool.idle == []
+        assert provider.released == [session.id]
+
+    asyncio.run(scenario())
+
+
+def test_close_releases_idle_and_checked_out_sessions():
+    async def scenario():
+        provider = FakeProvider()
+        pool = SessionPool(provider, size=2)
+        await pool.warm(2)
+        checked_out = await pool.acquire()
+        idle = pool.idle[0]
+
+        await pool.close()
+
+        assert sorted(provider.released) == sorted([checked_out.id, idle.id])
+        # The applicant finishing afterwards does not release its session twice
+        await pool.release(checked_out)
+        assert len(provider.released) == 2
+        with pytest.raises(RuntimeError):
+            await pool.acquire()
+
+    asyncio.run(scenario())